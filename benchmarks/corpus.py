@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta
+
+from app.schemas.article import Article
+
+_COMPANIES = [
+    "OpenAI",
+    "Anthropic",
+    "Google DeepMind",
+    "Meta",
+    "Microsoft",
+    "NVIDIA",
+    "Mistral",
+    "Cohere",
+    "Hugging Face",
+    "Stability AI",
+    "AWS",
+    "Apple",
+    "xAI",
+    "Perplexity",
+    "Databricks",
+]
+
+_PRODUCTS = [
+    "reasoning model",
+    "multimodal model",
+    "coding agent",
+    "enterprise copilot",
+    "inference chip",
+    "open-weight model",
+    "voice assistant",
+    "agent SDK",
+    "training cluster",
+    "search API",
+]
+
+_AUDIENCES = [
+    "developers",
+    "enterprises",
+    "hospitals",
+    "banks",
+    "startups",
+    "researchers",
+    "schools",
+    "governments",
+]
+
+_TEMPLATES = [
+    "{company} launches new {product} for {audience}",
+    "{company} unveils {product} with faster inference",
+    "{company} raises ${amount}M Series {series} to scale {product}",
+    "{company} signs partnership with {other} on {product}",
+    "{company} acquires startup building {product} for {audience}",
+    "{audience} adopt {company} {product} in production",
+    "{company} releases benchmark results for its {product}",
+    "Inside {company}'s plan to ship a {product} to {audience}",
+    "{company} and {other} strike deal on {product} for {audience}",
+    "Weekly roundup: {company} {product} webinar recap",
+]
+
+
+class TitleGenerator:
+    """Seeded generator of plausible AI-news headlines."""
+
+    def __init__(self, seed: int = 7) -> None:
+        self.random = random.Random(seed)
+
+    def title(self) -> str:
+        company, other = self.random.sample(_COMPANIES, 2)
+        return self.random.choice(_TEMPLATES).format(
+            company=company,
+            other=other,
+            product=self.random.choice(_PRODUCTS),
+            audience=self.random.choice(_AUDIENCES),
+            amount=self.random.randrange(5, 900, 5),
+            series=self.random.choice("ABCD"),
+        )
+
+    def description(self, title: str) -> str:
+        return (
+            f"{title}. The company said the rollout starts this week. "
+            f"Analysts expect the move to matter for {self.random.choice(_AUDIENCES)}."
+        )
+
+
+_NEAR_DUPLICATE_EDITS = [
+    ("launches", "launches a"),
+    ("unveils", "debuts"),
+    ("new", "its new"),
+    ("for", "aimed at"),
+    ("raises", "raised"),
+]
+
+
+def _near_duplicate(generator: TitleGenerator, title: str) -> str:
+    edits = generator.random.sample(_NEAR_DUPLICATE_EDITS, len(_NEAR_DUPLICATE_EDITS))
+    for original, replacement in edits:
+        if f" {original} " in f" {title} ":
+            return f" {title} ".replace(f" {original} ", f" {replacement} ", 1).strip()
+    return f"{title} today"
+
+
+def generate_articles(
+    count: int,
+    duplicate_rate: float = 0.1,
+    near_duplicate_rate: float = 0.15,
+    sources: int = 33,
+    seed: int = 7,
+) -> list[Article]:
+    """
+    Seeded corpus of `count` articles. `duplicate_rate` of them repeat an earlier
+    URL (with tracking params) and `near_duplicate_rate` reword an earlier title.
+    """
+    generator = TitleGenerator(seed)
+    now = datetime.now(UTC)
+    articles: list[Article] = []
+
+    for index in range(count):
+        source = f"Source {generator.random.randrange(sources)}"
+        roll = generator.random.random()
+        published_at = now - timedelta(minutes=generator.random.uniform(0, 24 * 60))
+
+        if articles and roll < duplicate_rate:
+            original = generator.random.choice(articles)
+            title = original.title
+            separator = "&" if "?" in original.url else "?"
+            tracking = generator.random.choice(["rss", "x", "mail"])
+            url = f"{original.url}{separator}utm_source={tracking}"
+        elif articles and roll < duplicate_rate + near_duplicate_rate:
+            original = generator.random.choice(articles)
+            title = _near_duplicate(generator, original.title)
+            url = f"https://news{index % 97}.example.com/story/{index}"
+        else:
+            title = generator.title()
+            url = f"https://news{index % 97}.example.com/story/{index}"
+
+        articles.append(
+            Article(
+                id=f"a{index}",
+                source_name=source,
+                source_rss=f"https://{source.replace(' ', '').lower()}.example.com/feed",
+                title=title,
+                url=url,
+                published_at=published_at,
+                description=generator.description(title),
+            )
+        )
+
+    return articles
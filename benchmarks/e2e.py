@@ -0,0 +1,397 @@
+"""
+End-to-end pipeline benchmark against local stand-in services.
+
+    PYTHONPATH=src python -m benchmarks.e2e --scales 1,10,100
+    PYTHONPATH=src python -m benchmarks.e2e --scales 1,10,100 --compare benchmarks/baseline.json
+    PYTHONPATH=src python -m benchmarks.e2e --scales 1 --profiles headless,interactive
+
+Each scale multiplies the source count of `data/news-sources.yaml` and runs in
+its own subprocess so peak RSS is measured per scale. `--profiles` runs each
+scale headless and/or with the LangGraphics visualizer attached (`interactive`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from benchmarks.stand_ins import LLM_REPLY_START, StandInConfig, StandInServices
+
+_REPO_ROOT = Path(__file__).resolve().parents[1]
+_DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# Default POLL_INTERVAL_SECONDS.
+_POLL_INTERVAL = 300
+
+
+def _production_source_count() -> int:
+    with open(_REPO_ROOT / "data" / "news-sources.yaml", "r", encoding="utf-8") as source_file:
+        return len((yaml.safe_load(source_file) or {}).get("sources", []))
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes on Linux.
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return int(probe.getsockname()[1])
+
+
+def _profile_env(profile: str) -> dict[str, str]:
+    if profile == "headless":
+        return {"EXECUTION_PROFILE": "headless", "LANGGRAPHICS_ENABLED": "false"}
+    return {
+        "EXECUTION_PROFILE": "interactive",
+        "LANGGRAPHICS_ENABLED": "true",
+        "LANGGRAPHICS_OPEN_BROWSER": "false",
+        "LANGGRAPHICS_HOST": "127.0.0.1",
+        "LANGGRAPHICS_PORT": str(_free_port()),
+        "LANGGRAPHICS_WS_PORT": str(_free_port()),
+    }
+
+
+async def _run_workflow(limit: int) -> tuple[dict[str, float], dict[str, Any]]:
+    from app.config import get_settings
+    from app.graph.workflow import build_workflow
+    from app.services.extractor import shared_page_fetches
+    from app.services.http import shared_http_client
+    from app.services.metrics import collect_metrics
+
+    get_settings.cache_clear()
+    settings = get_settings()
+    workflow = build_workflow()
+    state: dict[str, Any] = {
+        "run_id": "benchmark",
+        "started_at": datetime.now(UTC).isoformat(),
+        "reference_time": datetime.now(UTC).isoformat(),
+        "dry_run": False,
+        "limit": limit,
+        "errors": [],
+    }
+
+    with collect_metrics("benchmark") as metrics, shared_page_fetches():
+        async with shared_http_client(settings):
+            final_state = await workflow.ainvoke(state)
+
+    stage_seconds = {
+        name: round(metrics.node_wall_seconds(name), 4) for name in metrics.node_seconds
+    }
+    return stage_seconds, final_state
+
+
+def run_scale(
+    scale: int,
+    items_per_feed: int,
+    limit: int,
+    profile: str = "headless",
+    slow_feeds: int = 0,
+    llm_tail_rate: float = 0.0,
+    llm_rate_limit: int = 0,
+    html_descriptions: bool = False,
+    slow_feeds_last: bool = False,
+    warm_history: bool = False,
+    quiet_feeds: int = 0,
+) -> dict[str, Any]:
+    sources = _production_source_count() * scale
+    if profile == "interactive":
+        try:
+            import langgraphics  # noqa: F401
+        except ImportError:
+            return {"scale": scale, "profile": profile, "skipped": "langgraphics is not installed"}
+
+    services = StandInServices(
+        StandInConfig(
+            sources=sources,
+            items_per_feed=items_per_feed,
+            slow_feeds=slow_feeds,
+            slow_feeds_last=slow_feeds_last,
+            llm_tail_rate=llm_tail_rate,
+            llm_requests_per_second=llm_rate_limit,
+            html_descriptions=html_descriptions,
+            quiet_feeds=quiet_feeds,
+        )
+    )
+    services.start()
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="ai-news-bench-") as workdir:
+            sources_file = Path(workdir) / "sources.yaml"
+            services.write_sources_file(sources_file)
+            os.environ.update(
+                {
+                    "SOURCES_FILE": str(sources_file),
+                    "STATE_DIR": str(Path(workdir) / "state"),
+                    "OPENROUTER_API_KEY": "benchmark",
+                    "OPENROUTER_BASE_URL": f"{services.base_url}/openrouter",
+                    "TELEGRAM_BOT_TOKEN": "benchmark",
+                    "TELEGRAM_CHAT_ID": "1",
+                    "TELEGRAM_API_BASE_URL": f"{services.base_url}/telegram",
+                    "LANGSMITH_TRACING": "false",
+                    **_profile_env(profile),
+                }
+            )
+
+            if warm_history:
+                # A run in its own state dir, keeping only the per-source history, so the
+                # timed run is planned from history but starts with an empty ledger. Its
+                # polls are moved one poll interval back, as if it ran on the previous cycle.
+                os.environ["STATE_DIR"] = str(Path(workdir) / "warmup")
+                asyncio.run(_run_workflow(limit))
+                (Path(workdir) / "state").mkdir()
+                history_file = Path(workdir) / "state" / "sources.sqlite3"
+                shutil.copy(Path(workdir) / "warmup" / "sources.sqlite3", history_file)
+                with closing(sqlite3.connect(history_file)) as connection, connection:
+                    connection.execute(
+                        "UPDATE source_polls SET polled_at = polled_at - ?", (_POLL_INTERVAL,)
+                    )
+                os.environ["STATE_DIR"] = str(Path(workdir) / "state")
+                services.request_counts.clear()
+
+            started = time.perf_counter()
+            stage_seconds, final_state = asyncio.run(_run_workflow(limit))
+            total_seconds = time.perf_counter() - started
+    finally:
+        services.stop()
+
+    raw_count = len(final_state.get("articles_raw", []))
+    return {
+        "scale": scale,
+        "profile": profile,
+        "sources": sources,
+        "slow_feeds": slow_feeds,
+        "slow_feeds_last": slow_feeds_last,
+        "warm_history": warm_history,
+        "quiet_feeds": quiet_feeds,
+        "llm_tail_rate": llm_tail_rate,
+        "llm_rate_limit": llm_rate_limit,
+        "html_descriptions": html_descriptions,
+        "items_per_feed": items_per_feed,
+        "total_seconds": round(total_seconds, 4),
+        "stage_seconds": stage_seconds,
+        "articles_raw": raw_count,
+        "articles_selected": len(final_state.get("articles_top20", [])),
+        "fallback_summaries": sum(
+            not (article.get("summary") or "").startswith(LLM_REPLY_START)
+            for article in final_state.get("articles_top20", [])
+        ),
+        "articles_per_second": round(raw_count / total_seconds, 1) if total_seconds else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "requests": dict(services.request_counts),
+    }
+
+
+def compare_to_baseline(
+    results: list[dict[str, Any]],
+    baseline: list[dict[str, Any]],
+    tolerance: float,
+) -> list[str]:
+    """Return a message for every timing or memory figure above baseline * (1 + tolerance)."""
+    by_key = {(entry["scale"], entry.get("profile", "headless")): entry for entry in baseline}
+    regressions: list[str] = []
+    for result in results:
+        reference = by_key.get((result["scale"], result.get("profile", "headless")))
+        if reference is None or "skipped" in result or "skipped" in reference:
+            continue
+
+        checks = [("total_seconds", result["total_seconds"], reference["total_seconds"])]
+        checks.extend(
+            (f"stage_seconds.{stage}", seconds, reference["stage_seconds"][stage])
+            for stage, seconds in result["stage_seconds"].items()
+            if stage in reference.get("stage_seconds", {})
+        )
+        checks.append(("peak_rss_mb", result["peak_rss_mb"], reference["peak_rss_mb"]))
+
+        for name, current, previous in checks:
+            if previous and current > previous * (1 + tolerance):
+                regressions.append(
+                    f"scale {result['scale']}x {result.get('profile', 'headless')} {name}: "
+                    f"{current} vs baseline {previous}"
+                )
+    return regressions
+
+
+def _print_results(results: list[dict[str, Any]]) -> None:
+    for result in results:
+        if "skipped" in result:
+            print(f"{result['scale']:>4}x {result['profile']}: skipped ({result['skipped']})")
+            continue
+        stages = " ".join(
+            f"{name}={seconds:.2f}s" for name, seconds in result["stage_seconds"].items()
+        )
+        requests = " ".join(f"{kind}={count}" for kind, count in sorted(result["requests"].items()))
+        print(
+            f"{result['scale']:>4}x {result['profile']} sources={result['sources']} "
+            f"raw={result['articles_raw']} "
+            f"total={result['total_seconds']:.2f}s {result['articles_per_second']}/s "
+            f"rss={result['peak_rss_mb']}MB | {stages} | {requests} "
+            f"fallback_summaries={result.get('fallback_summaries', 0)}"
+        )
+
+
+def _print_profile_overhead(results: list[dict[str, Any]]) -> None:
+    timed = {
+        (result["scale"], result["profile"]): result["total_seconds"]
+        for result in results
+        if "skipped" not in result
+    }
+    for (scale, profile), seconds in sorted(timed.items()):
+        headless = timed.get((scale, "headless"))
+        if profile != "headless" and headless:
+            print(f"{scale:>4}x {profile} vs headless: {seconds / headless:.2f}x run time")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated source multipliers")
+    parser.add_argument("--items-per-feed", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument(
+        "--profiles",
+        default="headless",
+        help="Comma-separated execution profiles to run: headless, interactive",
+    )
+    parser.add_argument(
+        "--slow-feeds",
+        type=int,
+        default=0,
+        help="Make this many feeds answer after 5 s, to measure the ingest critical path",
+    )
+    parser.add_argument(
+        "--slow-feeds-last",
+        action="store_true",
+        help="Make the last feeds in the sources file the slow ones instead of the first",
+    )
+    parser.add_argument(
+        "--warm-history",
+        action="store_true",
+        help="Record per-source history in a run one poll interval earlier, to measure "
+        "source scheduling and skipping",
+    )
+    parser.add_argument(
+        "--quiet-feeds",
+        type=int,
+        default=0,
+        help="Make the last N feeds publish every two days, like company blogs",
+    )
+    parser.add_argument(
+        "--llm-tail-rate",
+        type=float,
+        default=0.0,
+        help="Share of LLM requests that take 8 s, to measure summarize tail latency",
+    )
+    parser.add_argument(
+        "--llm-rate-limit",
+        type=int,
+        default=0,
+        help="LLM requests per second before the stand-in answers 429 (0: unlimited)",
+    )
+    parser.add_argument(
+        "--html-descriptions",
+        action="store_true",
+        help="Serve full HTML article bodies in feeds and no og:description on pages",
+    )
+    parser.add_argument("--output", default=None, help="Write results JSON to this path")
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="Overwrite the stored baseline"
+    )
+    parser.add_argument("--compare", default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--single-scale", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--single-profile", default="headless", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single_scale is not None:
+        result = run_scale(
+            args.single_scale,
+            args.items_per_feed,
+            args.limit,
+            args.single_profile,
+            args.slow_feeds,
+            args.llm_tail_rate,
+            args.llm_rate_limit,
+            args.html_descriptions,
+            args.slow_feeds_last,
+            args.warm_history,
+            args.quiet_feeds,
+        )
+        print(json.dumps(result))
+        return
+
+    profiles = [value.strip() for value in args.profiles.split(",") if value.strip()]
+    runs = [
+        (int(value), profile)
+        for value in args.scales.split(",")
+        if value.strip()
+        for profile in profiles
+    ]
+    results: list[dict[str, Any]] = []
+    for scale, profile in runs:
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.e2e",
+                "--single-scale",
+                str(scale),
+                "--items-per-feed",
+                str(args.items_per_feed),
+                "--limit",
+                str(args.limit),
+                "--single-profile",
+                profile,
+                "--slow-feeds",
+                str(args.slow_feeds),
+                "--llm-tail-rate",
+                str(args.llm_tail_rate),
+                "--llm-rate-limit",
+                str(args.llm_rate_limit),
+                *(["--html-descriptions"] if args.html_descriptions else []),
+                *(["--slow-feeds-last"] if args.slow_feeds_last else []),
+                *(["--warm-history"] if args.warm_history else []),
+                "--quiet-feeds",
+                str(args.quiet_feeds),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    _print_results(results)
+    _print_profile_overhead(results)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.save_baseline:
+        _DEFAULT_BASELINE.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
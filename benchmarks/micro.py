@@ -0,0 +1,199 @@
+"""
+Micro-benchmarks for the scoring, clustering, URL and feed parsing hot paths.
+
+    PYTHONPATH=src python -m benchmarks.micro --sizes 1000,10000,100000 --output micro.json
+
+Quadratic functions are skipped at a size once their extrapolated runtime
+exceeds `--budget-seconds`; the skip and its estimate are recorded instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import platform
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import feedparser
+
+from app.schemas.article import Article, UrlRules
+from app.services.feed_parser import FeedItemParser
+from app.services.rss_client import dedupe_articles
+from app.services.scoring import (
+    _relevance_score,
+    _title_similarity,
+    cluster_articles,
+    rank_articles,
+)
+from app.services.urls import UrlCanonicalizer
+from benchmarks.corpus import generate_articles
+
+
+def _pairs(articles: list[Article]) -> list[tuple[str, str]]:
+    return [
+        (articles[index].title, articles[(index * 7 + 1) % len(articles)].title)
+        for index in range(len(articles))
+    ]
+
+
+def _feed(articles: list[Article]) -> list[bytes]:
+    """An RSS document with one item per article, split into 16 KiB network-sized chunks."""
+    items = "".join(
+        f"<item><title>{html.escape(article.title)}</title><link>{html.escape(article.url)}</link>"
+        f"<description>{html.escape(f'<p>{article.description}</p>')}</description>"
+        f"<pubDate>Mon, 05 Jan 2026 10:00:00 +0000</pubDate></item>"
+        for article in articles
+    )
+    body = f"<?xml version='1.0'?><rss><channel><title>Feed</title>{items}</channel></rss>".encode()
+    return [body[start : start + 16384] for start in range(0, len(body), 16384)]
+
+
+def _stream_parse(chunks: list[bytes]) -> int:
+    parser = FeedItemParser()
+    count = sum(len(parser.feed(chunk)) for chunk in chunks)
+    return count + len(parser.close())
+
+
+# name -> (growth exponent, setup, timed call)
+_CASES: dict[str, tuple[int, Callable[[list[Article]], Any], Callable[[Any], Any]]] = {
+    # A fresh canonicalizer per round, so its memo cache starts cold.
+    "normalize_url": (
+        1,
+        lambda articles: (UrlCanonicalizer(UrlRules()), [article.url for article in articles]),
+        lambda setup: [setup[0].normalize(url) for url in setup[1]],
+    ),
+    "url_key": (
+        1,
+        lambda articles: (UrlCanonicalizer(UrlRules()), [article.url for article in articles]),
+        lambda setup: [setup[0].key(url) for url in setup[1]],
+    ),
+    "dedupe_articles": (
+        1,
+        lambda articles: [article.model_copy() for article in articles],
+        dedupe_articles,
+    ),
+    "_relevance_score": (
+        1,
+        lambda articles: articles,
+        lambda articles: [_relevance_score(article) for article in articles],
+    ),
+    "_title_similarity": (
+        1,
+        _pairs,
+        lambda pairs: [_title_similarity(left, right) for left, right in pairs],
+    ),
+    "feedparser.parse": (
+        1,
+        lambda articles: b"".join(_feed(articles)),
+        feedparser.parse,
+    ),
+    "FeedItemParser": (1, _feed, _stream_parse),
+    "cluster_articles": (2, lambda articles: articles, cluster_articles),
+    "rank_articles": (
+        2,
+        lambda articles: articles,
+        lambda articles: rank_articles(articles, limit=50),
+    ),
+}
+
+
+def run(
+    sizes: list[int],
+    duplicate_rate: float,
+    near_duplicate_rate: float,
+    seed: int,
+    repeat: int,
+    budget_seconds: float,
+    only: set[str] | None = None,
+) -> dict[str, Any]:
+    results: list[dict[str, Any]] = []
+    previous: dict[str, tuple[int, float]] = {}
+
+    for size in sizes:
+        corpus = generate_articles(
+            size,
+            duplicate_rate=duplicate_rate,
+            near_duplicate_rate=near_duplicate_rate,
+            seed=seed,
+        )
+        for name, (exponent, setup, call) in _CASES.items():
+            if only and name not in only:
+                continue
+
+            if name in previous:
+                last_size, last_seconds = previous[name]
+                estimate = last_seconds * (size / last_size) ** exponent
+                if estimate > budget_seconds:
+                    results.append(
+                        {
+                            "function": name,
+                            "size": size,
+                            "skipped": True,
+                            "estimate_seconds": round(estimate, 2),
+                        }
+                    )
+                    continue
+
+            rounds = repeat if size <= 10_000 else 1
+            timings: list[float] = []
+            for _ in range(rounds):
+                payload = setup(corpus)
+                started = time.perf_counter()
+                call(payload)
+                timings.append(time.perf_counter() - started)
+
+            best = min(timings)
+            previous[name] = (size, best)
+            results.append(
+                {
+                    "function": name,
+                    "size": size,
+                    "seconds": round(best, 6),
+                    "per_item_us": round(best / size * 1e6, 3),
+                    "rounds": rounds,
+                }
+            )
+            print(f"{name:>18} n={size:<7} {best:10.4f}s {best / size * 1e6:10.2f}us/item")
+
+    return {
+        "generated_at": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "seed": seed,
+        "duplicate_rate": duplicate_rate,
+        "near_duplicate_rate": near_duplicate_rate,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scoring and clustering micro-benchmarks")
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--near-duplicate-rate", type=float, default=0.15)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget-seconds", type=float, default=120.0)
+    parser.add_argument("--only", default=None, help="Comma-separated function names")
+    parser.add_argument("--output", default=None, help="Write results JSON to this path")
+    args = parser.parse_args()
+
+    report = run(
+        sizes=[int(value) for value in args.sizes.split(",") if value.strip()],
+        duplicate_rate=args.duplicate_rate,
+        near_duplicate_rate=args.near_duplicate_rate,
+        seed=args.seed,
+        repeat=args.repeat,
+        budget_seconds=args.budget_seconds,
+        only={name.strip() for name in args.only.split(",")} if args.only else None,
+    )
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
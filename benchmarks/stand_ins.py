@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import html
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from benchmarks.corpus import TitleGenerator
+
+# The stand-in model's reply, one token per word. It runs past the three sentences the
+# pipeline asks for, as real models often do.
+LLM_REPLY_START = "The company announced"
+
+_LLM_TOKENS = re.findall(
+    r"\S+\s*",
+    f"{LLM_REPLY_START} a new AI release. "
+    "It targets production workloads for large customers. "
+    "The launch signals growing competition in the market. "
+    "Analysts expect rivals to respond within weeks. "
+    "Pricing details were not disclosed.",
+)
+
+
+def _llm_usage(completion_tokens: int) -> dict[str, int]:
+    return {
+        "prompt_tokens": 180,
+        "completion_tokens": completion_tokens,
+        "total_tokens": 180 + completion_tokens,
+    }
+
+
+@dataclass
+class StandInConfig:
+    sources: int
+    items_per_feed: int = 10
+    duplicate_rate: float = 0.1
+    latency_ms: dict[str, float] = field(
+        default_factory=lambda: {"feed": 40.0, "page": 25.0, "llm": 150.0, "telegram": 30.0}
+    )
+    # "llm" above is the time to the first token; every token then takes `llm_token_ms`.
+    llm_token_ms: float = 8.0
+    # The first (or with `slow_feeds_last`, the last) `slow_feeds` feeds answer after
+    # `slow_feed_ms` instead, like a sluggish publisher.
+    slow_feeds: int = 0
+    slow_feeds_last: bool = False
+    slow_feed_ms: float = 5000.0
+    # A seeded `llm_tail_rate` share of LLM requests takes `llm_tail_ms`, like a stuck generation.
+    llm_tail_rate: float = 0.0
+    llm_tail_ms: float = 8000.0
+    # Above `llm_requests_per_second` (0: unlimited) the LLM answers 429 with Retry-After: 1.
+    llm_requests_per_second: int = 0
+    # Feeds carry the full article as HTML (and pages no og:description), so prompts are
+    # built from feed bodies. Prompt tokens add `llm_prompt_token_ms` each to the first token.
+    html_descriptions: bool = False
+    llm_prompt_token_ms: float = 0.2
+    # The last `quiet_feeds` feeds publish once every `quiet_interval_hours` (newest item
+    # still today), like a company blog, instead of several times within the last half hour.
+    quiet_feeds: int = 0
+    quiet_interval_hours: float = 48.0
+    seed: int = 7
+
+
+class StandInServices:
+    """
+    One local HTTP server standing in for every external dependency: synthetic
+    RSS feeds, article pages with OpenGraph tags, OpenRouter and the Telegram Bot API.
+    """
+
+    def __init__(self, config: StandInConfig) -> None:
+        self.config = config
+        self.request_counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._feeds: dict[str, bytes] = {}
+        self._pages: dict[str, str] = {}
+        self._message_id = 0
+        self._llm_random = random.Random(config.seed)
+        self._llm_window = (0, 0)
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        assert self._server is not None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._generate()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def write_sources_file(self, path: Path) -> None:
+        sources = [
+            {
+                "name": f"Stand-in Source {index}",
+                "url": f"{self.base_url}/sites/{index}",
+                "rss": f"{self.base_url}/feeds/{index}.xml",
+            }
+            for index in range(self.config.sources)
+        ]
+        payload = {"fetch_defaults": {"image_fallback_rss_enclosure": True}, "sources": sources}
+        path.write_text(yaml.safe_dump(payload, sort_keys=False), encoding="utf-8")
+
+    def _generate(self) -> None:
+        generator = TitleGenerator(self.config.seed)
+        now = datetime.now(UTC)
+        start_of_day = (
+            datetime.now().astimezone().replace(hour=0, minute=0, second=0, microsecond=0)
+        )
+        window = max(min((now - start_of_day).total_seconds(), 1800.0), 60.0)
+        shared: list[tuple[str, str]] = []
+
+        for source_index in range(self.config.sources):
+            quiet = source_index >= self.config.sources - self.config.quiet_feeds
+            items: list[str] = []
+            for item_index in range(self.config.items_per_feed):
+                if shared and generator.random.random() < self.config.duplicate_rate:
+                    slug, title = generator.random.choice(shared)
+                else:
+                    slug = f"{source_index}-{item_index}"
+                    title = generator.title()
+                    self._pages[slug] = self._page(slug, title, generator.description(title))
+                    shared.append((slug, title))
+
+                offset = generator.random.uniform(0, window)
+                if quiet:
+                    offset += item_index * self.config.quiet_interval_hours * 3600
+                published = format_datetime(now - timedelta(seconds=offset))
+                items.append(
+                    "<item>"
+                    f"<title>{html.escape(title)}</title>"
+                    f"<link>{self.base_url}/articles/{slug}.html?utm_source=rss</link>"
+                    f"<description>{html.escape(self._feed_description(generator, title))}</description>"
+                    f"<pubDate>{published}</pubDate>"
+                    "</item>"
+                )
+
+            self._feeds[str(source_index)] = (
+                '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>Stand-in Source {source_index}</title>{''.join(items)}"
+                "</channel></rss>"
+            ).encode()
+
+    def _feed_description(self, generator: TitleGenerator, title: str) -> str:
+        if not self.config.html_descriptions:
+            return generator.description(title)
+        paragraphs = "".join(
+            f"<p>{generator.description(generator.title())} "
+            f"<a href='{self.base_url}/related/{index}'>Related coverage</a>.</p>"
+            for index in range(12)
+        )
+        return (
+            f"<div class='entry'><p><strong>{html.escape(title)}</strong>. "
+            f"{generator.description(title)}</p>{paragraphs}"
+            f"<p>The post {html.escape(title)} appeared first on Stand-in News.</p></div>"
+        )
+
+    def _page(self, slug: str, title: str, description: str) -> str:
+        og_description = (
+            ""
+            if self.config.html_descriptions
+            else f'<meta property="og:description" content="{html.escape(description)}" />'
+        )
+        return (
+            "<html><head>"
+            f'<meta property="og:title" content="{html.escape(title)}" />'
+            f"{og_description}"
+            f'<meta property="og:image" content="{self.base_url}/images/{slug}.jpg" />'
+            f"</head><body><p>{html.escape(description)}</p></body></html>"
+        )
+
+    def _is_slow_feed(self, index: int) -> bool:
+        if self.config.slow_feeds_last:
+            return index >= self.config.sources - self.config.slow_feeds
+        return index < self.config.slow_feeds
+
+    def _sleep(self, kind: str) -> None:
+        delay = self.config.latency_ms.get(kind, 0.0)
+        if delay:
+            time.sleep(delay / 1000.0)
+
+    def _llm_rate_limited(self) -> bool:
+        limit = self.config.llm_requests_per_second
+        if not limit:
+            return False
+        with self._lock:
+            second, count = self._llm_window
+            now = int(time.monotonic())
+            count = count + 1 if now == second else 1
+            self._llm_window = (now, count)
+        return count > limit
+
+    def _sleep_llm(self, prompt_tokens: int) -> None:
+        with self._lock:
+            in_tail = self._llm_random.random() < self.config.llm_tail_rate
+            self.request_counts["llm_prompt_tokens"] += prompt_tokens
+        if in_tail:
+            time.sleep(self.config.llm_tail_ms / 1000.0)
+        else:
+            self._sleep("llm")
+        time.sleep(prompt_tokens * self.config.llm_prompt_token_ms / 1000.0)
+
+    def _count(self, kind: str) -> None:
+        with self._lock:
+            self.request_counts[kind] += 1
+
+    def _next_message_id(self) -> int:
+        with self._lock:
+            self._message_id += 1
+            return self._message_id
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+            def _send(
+                self,
+                status: int,
+                body: bytes,
+                content_type: str,
+                headers: dict[str, str] | None = None,
+            ) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream_completion(self) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                events = [{"choices": [{"delta": {"content": token}}]} for token in _LLM_TOKENS]
+                events.append({"choices": [], "usage": _llm_usage(len(_LLM_TOKENS))})
+                try:
+                    for event in events:
+                        if event["choices"]:
+                            services._count("llm_tokens")
+                            time.sleep(services.config.llm_token_ms / 1000.0)
+                        self._write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+                    self._write_chunk(b"data: [DONE]\n\n")
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client hung up early; like a real provider, stop generating.
+                    self.close_connection = True
+
+            def _write_chunk(self, data: bytes) -> None:
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self) -> None:
+                path = self.path.split("?", 1)[0]
+                if path.startswith("/feeds/"):
+                    services._count("feed")
+                    feed_key = path.removeprefix("/feeds/").removesuffix(".xml")
+                    if feed_key.isdigit() and services._is_slow_feed(int(feed_key)):
+                        time.sleep(services.config.slow_feed_ms / 1000.0)
+                    else:
+                        services._sleep("feed")
+                    feed = services._feeds.get(feed_key)
+                    if feed is None:
+                        self._send(404, b"not found", "text/plain")
+                    else:
+                        self._send(200, feed, "application/rss+xml")
+                    return
+
+                if path.startswith("/articles/"):
+                    services._count("page")
+                    services._sleep("page")
+                    page = services._pages.get(
+                        path.removeprefix("/articles/").removesuffix(".html")
+                    )
+                    if page is None:
+                        self._send(404, b"not found", "text/plain")
+                    else:
+                        self._send(200, page.encode("utf-8"), "text/html; charset=utf-8")
+                    return
+
+                self._send(404, b"not found", "text/plain")
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+
+                if self.path.endswith("/chat/completions"):
+                    services._count("llm")
+                    if services._llm_rate_limited():
+                        services._count("llm_429")
+                        error = {"error": {"code": 429, "message": "Rate limit exceeded"}}
+                        self._send(
+                            429,
+                            json.dumps(error).encode("utf-8"),
+                            "application/json",
+                            headers={"Retry-After": "1"},
+                        )
+                        return
+                    prompt_chars = sum(len(message["content"]) for message in body["messages"])
+                    services._sleep_llm(prompt_chars // 4)
+                    if body.get("stream"):
+                        self._stream_completion()
+                        return
+                    for _token in _LLM_TOKENS:
+                        services._count("llm_tokens")
+                        time.sleep(services.config.llm_token_ms / 1000.0)
+                    payload = {
+                        "choices": [
+                            {"message": {"role": "assistant", "content": "".join(_LLM_TOKENS)}}
+                        ],
+                        "usage": _llm_usage(len(_LLM_TOKENS)),
+                    }
+                    self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+                    return
+
+                if self.path.startswith("/telegram/"):
+                    services._count("telegram")
+                    services._sleep("telegram")
+                    result = {
+                        "message_id": services._next_message_id(),
+                        "chat": body.get("chat_id"),
+                    }
+                    payload = {"ok": True, "result": result}
+                    self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+                    return
+
+                self._send(404, b"not found", "text/plain")
+
+        return Handler
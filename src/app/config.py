@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import os
+import sys
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,14 +14,33 @@ class Settings(BaseSettings):
     openrouter_base_url: str = "https://openrouter.ai/api/v1"
     openrouter_site_url: str | None = None
     openrouter_app_name: str = "AI News Agent"
+    openrouter_hedge_model: str | None = None
+    openrouter_hedge_base_url: str | None = None
+    openrouter_hedge_api_key: str | None = None
+    llm_hedging_enabled: bool = True
+    llm_hedge_percentile: float = 0.9
+    llm_hedge_initial_delay_seconds: float = 5.0
+    llm_hard_timeout_seconds: float = 20.0
+    llm_streaming: bool = True
+    llm_concurrency: int = 4
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+    llm_max_retries: int = 3
+    llm_backoff_base_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 30.0
+    llm_context_max_tokens: int = 200
+    llm_summary_top_n: int = 0
 
     telegram_bot_token: str | None = None
     telegram_chat_id: str | None = None
     telegram_parse_mode: str = "HTML"
+    telegram_api_base_url: str = "https://api.telegram.org"
 
     langsmith_api_key: str | None = None
     langsmith_project: str = "ai-news-agent"
     langsmith_tracing: bool = True
+    langsmith_trace_verbosity: Literal["counts", "summary", "full"] = "summary"
+    execution_profile: Literal["auto", "headless", "interactive"] = "auto"
     langgraphics_enabled: bool = True
     langgraphics_open_browser: bool = True
     langgraphics_host: str = "localhost"
@@ -34,8 +55,27 @@ class Settings(BaseSettings):
     request_timeout_seconds: int = 20
     http_concurrency: int = 8
     max_feed_items_per_source: int = 50
+    description_max_chars: int = 1500
     max_articles_per_run: int = 50
     user_agent: str = "AINewsAgent/0.1"
+    poll_interval_seconds: int = 300
+    run_deadline_seconds: float = 0
+
+    state_dir: str = ".state"
+    ledger_enabled: bool = True
+    ledger_retention_days: int = 14
+    story_index_enabled: bool = True
+    story_index_window_hours: int = 72
+    story_repeat_policy: Literal["suppress", "demote"] = "suppress"
+    checkpoints_enabled: bool = True
+    source_scheduling_enabled: bool = True
+    source_timeout_max_seconds: float = 60.0
+    source_skipping_enabled: bool = True
+    source_skip_below_probability: float = 0.1
+    source_max_staleness_hours: float = 6.0
+
+    reports_dir: str = "reports"
+    metrics_prometheus_file: str | None = None
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -55,6 +95,18 @@ class Settings(BaseSettings):
 
         return missing
 
+    def is_headless(self) -> bool:
+        """
+        `EXECUTION_PROFILE=headless|interactive`, or `auto`: headless when neither
+        stdin nor stdout is a terminal (cron, systemd, CI, nohup).
+        """
+        if self.execution_profile == "auto":
+            return not (sys.stdin.isatty() or sys.stdout.isatty())
+        return self.execution_profile == "headless"
+
+    def visualization_enabled(self) -> bool:
+        return self.langgraphics_enabled and not self.is_headless()
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+from app.config import Settings
+from app.graph.state import AgentState
+from app.schemas.article import SourceConfig
+from app.services.deadline import run_deadline
+from app.services.extractor import shared_page_fetches
+from app.services.metrics import MetricsCollector, collect_metrics
+from app.services.rss_client import RSSClient
+
+logger = logging.getLogger(__name__)
+
+
+class SourcePoller:
+    """Tracks when each source is next due, honouring per-source poll intervals."""
+
+    def __init__(self, default_interval_seconds: int) -> None:
+        self.default_interval_seconds = max(default_interval_seconds, 1)
+        self._intervals: dict[str, int] = {}
+        self._next_due: dict[str, float] = {}
+
+    def sync(self, sources: list[SourceConfig], now: float) -> None:
+        names = {source.name for source in sources}
+        for source in sources:
+            interval = source.poll_interval_seconds or self.default_interval_seconds
+            self._intervals[source.name] = max(interval, 1)
+            self._next_due.setdefault(source.name, now)
+
+        for name in list(self._next_due):
+            if name not in names:
+                self._next_due.pop(name, None)
+                self._intervals.pop(name, None)
+
+    def due(self, now: float) -> list[str]:
+        return [name for name, due_at in self._next_due.items() if due_at <= now]
+
+    def mark_polled(self, names: list[str], now: float) -> None:
+        for name in names:
+            if name in self._next_due:
+                self._next_due[name] = now + self._intervals[name]
+
+    def seconds_until_next(self, now: float) -> float:
+        if not self._next_due:
+            return float(self.default_interval_seconds)
+        return max(min(self._next_due.values()) - now, 0.0)
+
+
+async def run_daemon(
+    settings: Settings,
+    workflow: Any,
+    build_state: Callable[[], AgentState],
+    on_cycle_complete: Callable[[AgentState, MetricsCollector], Any],
+    max_cycles: int | None = None,
+) -> None:
+    """
+    Poll sources on their own intervals against one compiled workflow, feeding
+    per-source watermarks back in so each cycle only processes new entries.
+    """
+    poller = SourcePoller(settings.poll_interval_seconds)
+    rss_client = RSSClient(settings)
+    watermarks: dict[str, str] = {}
+    cycles = 0
+
+    while max_cycles is None or cycles < max_cycles:
+        now = time.monotonic()
+        _, sources = rss_client.load_sources()
+        poller.sync(sources, now)
+
+        due = poller.due(now)
+        if not due:
+            await asyncio.sleep(poller.seconds_until_next(now))
+            continue
+
+        poller.mark_polled(due, now)
+        cycles += 1
+        logger.info("Poll cycle %s: %s due source(s)", cycles, len(due))
+
+        state = build_state()
+        state["source_names"] = due
+        state["source_watermarks"] = dict(watermarks)
+
+        with (
+            collect_metrics(state["run_id"]) as metrics,
+            shared_page_fetches(),
+            run_deadline(settings.run_deadline_seconds),
+        ):
+            try:
+                final_state = await workflow.ainvoke(state)
+            except Exception:
+                logger.exception("Poll cycle %s failed", cycles)
+                continue
+
+        watermarks.update(final_state.get("source_watermarks", {}))
+        on_cycle_complete(final_state, metrics)
@@ -1,18 +1,49 @@
 from __future__ import annotations
 
-from typing import Any, TypedDict
+from typing import Annotated, Any, TypedDict
+
+
+def merge_source_results(
+    current: dict[str, dict[str, Any]] | None,
+    update: dict[str, dict[str, Any]] | None,
+) -> dict[str, dict[str, Any]]:
+    """
+    Reducer for per-source branch results. Merging by source name keeps it
+    idempotent when later nodes hand the whole state back; `None` clears it.
+    """
+    if update is None:
+        return {}
+    return {**(current or {}), **update}
 
 
 class AgentState(TypedDict, total=False):
     run_id: str
     started_at: str
+    reference_time: str
     dry_run: bool
     limit: int
+    source_names: list[str]
+    source_watermarks: dict[str, str]
     fetch_defaults: dict[str, Any]
     sources: list[dict[str, Any]]
+    source_order: list[str]
+    source_timeouts: dict[str, float]
+    source_results: Annotated[dict[str, dict[str, Any]], merge_source_results]
     articles_raw: list[dict[str, Any]]
     articles_enriched: list[dict[str, Any]]
+    # Articles the run deadline left unenriched; deliver keeps them before the watermark.
+    enrich_deferred_ids: list[str]
     articles_ranked: list[dict[str, Any]]
     articles_top20: list[dict[str, Any]]
     delivery_results: list[dict[str, Any]]
     errors: list[str]
+
+
+class SourceBranchState(TypedDict, total=False):
+    """Input of one per-source ingest branch, sent by `fan_out_sources`."""
+
+    source: dict[str, Any]
+    fetch_defaults: dict[str, Any]
+    watermark: str | None
+    timeout_seconds: float | None
+    dry_run: bool
@@ -1,39 +1,44 @@
 from __future__ import annotations
 
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, StateGraph
 
 from app.config import get_settings
 from app.graph.state import AgentState
 from app.nodes.deliver import deliver_node
-from app.nodes.enrich import enrich_node
-from app.nodes.ingest import ingest_node
+from app.nodes.ingest import collect_node, fan_out_sources, ingest_node, source_node
 from app.nodes.rank import rank_node
 from app.nodes.summarize import summarize_node
-from app.services.langgraphics_assets import ensure_langgraphics_static_assets
+from app.services.metrics import timed_node
 
 
-def build_workflow():
+def build_workflow(checkpointer: BaseCheckpointSaver | None = None):
     settings = get_settings()
     graph = StateGraph(AgentState)
 
-    graph.add_node("ingest", ingest_node)
-    graph.add_node("enrich", enrich_node)
-    graph.add_node("rank", rank_node)
-    graph.add_node("summarize", summarize_node)
-    graph.add_node("deliver", deliver_node)
+    graph.add_node("ingest", timed_node("ingest", ingest_node))
+    graph.add_node("source", timed_node("source", source_node))
+    graph.add_node("collect", timed_node("collect", collect_node))
+    graph.add_node("rank", timed_node("rank", rank_node))
+    graph.add_node("summarize", timed_node("summarize", summarize_node))
+    graph.add_node("deliver", timed_node("deliver", deliver_node))
 
     graph.set_entry_point("ingest")
-    graph.add_edge("ingest", "enrich")
-    graph.add_edge("enrich", "rank")
+    # Each source is fetched and enriched in its own branch; `collect` waits for all of them.
+    graph.add_conditional_edges("ingest", fan_out_sources, ["source", "collect"])
+    graph.add_edge("source", "collect")
+    graph.add_edge("collect", "rank")
     graph.add_edge("rank", "summarize")
     graph.add_edge("summarize", "deliver")
     graph.add_edge("deliver", END)
 
-    compiled = graph.compile()
+    compiled = graph.compile(checkpointer=checkpointer)
 
-    if settings.langgraphics_enabled:
+    if settings.visualization_enabled():
         from langgraphics import watch
 
+        from app.services.langgraphics_assets import ensure_langgraphics_static_assets
+
         ensure_langgraphics_static_assets()
         return watch(
             compiled,
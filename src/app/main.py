@@ -3,13 +3,23 @@ from __future__ import annotations
 import argparse
 import asyncio
 import logging
+import tempfile
+from contextlib import ExitStack
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING
 from uuid import uuid4
 
-from app.config import configure_langsmith_env, get_settings
 from app.graph.state import AgentState
-from app.graph.workflow import build_workflow
 from app.logging import setup_logging
+from app.services.profiling import PROFILE_MODES
+
+# Everything heavy (LangGraph, httpx, pydantic-settings, feed/HTML parsers, langsmith)
+# is imported inside the code paths that use it, so `--help` and config errors stay fast.
+if TYPE_CHECKING:
+    import httpx
+
+    from app.config import Settings
+    from app.services.metrics import MetricsCollector
 
 logger = logging.getLogger(__name__)
 
@@ -22,26 +32,137 @@ def build_parser() -> argparse.ArgumentParser:
     run_parser.add_argument("--dry-run", action="store_true", help="Run without calling Telegram")
     run_parser.add_argument("--limit", type=int, default=None, help="Max articles to send (<=50)")
     run_parser.add_argument("--verbose", action="store_true", help="Enable debug logs")
+    run_parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Skip the LangGraphics visualizer (default when no terminal is attached)",
+    )
+    run_parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        default=None,
+        help="Time budget for the run; late stages degrade instead of overrunning",
+    )
+    run_parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        default=None,
+        help="Resume a failed run from its last checkpoint",
+    )
+    cassette_group = run_parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record",
+        metavar="DIR",
+        default=None,
+        help="Record every HTTP exchange to a cassette in DIR",
+    )
+    cassette_group.add_argument(
+        "--replay",
+        metavar="DIR",
+        default=None,
+        help="Serve HTTP responses from the cassette in DIR instead of the network",
+    )
+    run_parser.add_argument(
+        "--replay-latency",
+        metavar="MS|recorded",
+        default=None,
+        help="Simulated latency per replayed request, in ms or 'recorded'",
+    )
+    run_parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="Profile the run; output goes to REPORTS_DIR/<run_id>-profile/",
+    )
 
-    return parser
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Keep running and poll each source on its own interval",
+    )
+    serve_parser.add_argument("--dry-run", action="store_true", help="Run without calling Telegram")
+    serve_parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Max articles to send per cycle (<=50)",
+    )
+    serve_parser.add_argument("--verbose", action="store_true", help="Enable debug logs")
+    serve_parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="Skip the LangGraphics visualizer (default when no terminal is attached)",
+    )
+    serve_parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        default=None,
+        help="Time budget per poll cycle; late stages degrade instead of overrunning",
+    )
+    serve_parser.add_argument(
+        "--max-cycles",
+        type=int,
+        default=None,
+        help="Stop after this many poll cycles (default: run until interrupted)",
+    )
 
+    return parser
 
-async def run_pipeline(args: argparse.Namespace) -> int:
-    settings = get_settings()
-    configure_langsmith_env(settings)
-    dry_run = bool(args.dry_run)
 
+def _check_settings(settings: Settings, dry_run: bool) -> bool:
     missing_fields = settings.missing_required_runtime_fields(dry_run=dry_run)
     if missing_fields:
         joined = ", ".join(missing_fields)
         logger.error("Configuration error: missing required .env values: %s", joined)
         print(f"Configuration error: missing required .env values: {joined}")
-        return 2
+        return False
+    return True
+
+
+def _apply_execution_profile(args: argparse.Namespace, settings: Settings) -> None:
+    if args.headless:
+        settings.execution_profile = "headless"
+    if args.deadline is not None:
+        settings.run_deadline_seconds = args.deadline
+    logger.info(
+        "Execution profile: %s (visualizer %s)",
+        "headless" if settings.is_headless() else "interactive",
+        "on" if settings.visualization_enabled() else "off",
+    )
+
+
+def _resolve_limit(settings: Settings, requested: int | None) -> int:
+    limit = requested if requested is not None else settings.max_articles_per_run
+    return max(1, min(limit, settings.max_articles_per_run))
+
 
-    limit = args.limit if args.limit is not None else settings.max_articles_per_run
-    limit = max(1, min(limit, settings.max_articles_per_run))
+def _build_transport(
+    args: argparse.Namespace,
+    settings: Settings,
+    cleanup: ExitStack,
+) -> httpx.AsyncBaseTransport | None:
+    from app.services.cassette import RecordingTransport, ReplayTransport, parse_replay_latency
+    from app.services.http import network_transport
 
-    initial_state: AgentState = {
+    if args.record:
+        logger.info("Recording HTTP exchanges to %s", args.record)
+        return RecordingTransport(args.record, wrapped=network_transport(settings))
+    if args.replay:
+        # Replays start from an empty state dir so the live ledger and story index
+        # cannot change which recorded requests the run makes. It is removed, and
+        # the configured one restored, when the run ends.
+        cleanup.callback(setattr, settings, "state_dir", settings.state_dir)
+        settings.state_dir = cleanup.enter_context(
+            tempfile.TemporaryDirectory(prefix="ai-news-replay-")
+        )
+        logger.info("Replaying HTTP exchanges from %s", args.replay)
+        return ReplayTransport(args.replay, latency=parse_replay_latency(args.replay_latency))
+    return None
+
+
+def build_initial_state(dry_run: bool, limit: int) -> AgentState:
+    return {
         "run_id": str(uuid4()),
         "started_at": datetime.now(timezone.utc).isoformat(),
         "dry_run": dry_run,
@@ -49,21 +170,26 @@ async def run_pipeline(args: argparse.Namespace) -> int:
         "errors": [],
     }
 
-    workflow = build_workflow()
-    final_state = await workflow.ainvoke(initial_state)
 
+def report_run(
+    final_state: AgentState,
+    dry_run: bool,
+    metrics: MetricsCollector | None = None,
+) -> int:
     selected_count = len(final_state.get("articles_top20", []))
     deliveries = final_state.get("delivery_results", [])
     attempted_count = len(deliveries)
     failed_count = len([item for item in deliveries if item.get("status") == "error"])
     sent_count = len([item for item in deliveries if item.get("status") in {"sent", "dry_run"}])
+    deferred_count = len([item for item in deliveries if item.get("status") == "deferred"])
 
     logger.info(
-        "Run complete | selected=%s attempted=%s sent=%s failed=%s dry_run=%s",
+        "Run complete | selected=%s attempted=%s sent=%s failed=%s deferred=%s dry_run=%s",
         selected_count,
         attempted_count,
         sent_count,
         failed_count,
+        deferred_count,
         dry_run,
     )
     if failed_count:
@@ -78,23 +204,178 @@ async def run_pipeline(args: argparse.Namespace) -> int:
     if final_state.get("errors"):
         logger.warning("Non-fatal errors captured: %s", len(final_state["errors"]))
 
+    if metrics is not None:
+        from app.config import get_settings
+        from app.services.metrics import write_run_report
+
+        settings = get_settings()
+        summary = {
+            "selected": selected_count,
+            "attempted": attempted_count,
+            "sent": sent_count,
+            "failed": failed_count,
+            "deferred": deferred_count,
+            "dry_run": dry_run,
+            "errors": len(final_state.get("errors", [])),
+            "degraded_stages": sorted(
+                {event["stage"] for event in metrics.events if event["kind"] == "deadline_degraded"}
+            ),
+        }
+        report_path = write_run_report(
+            metrics,
+            settings.reports_dir,
+            summary=summary,
+            prometheus_file=settings.metrics_prometheus_file,
+        )
+        logger.info("Run report written to %s", report_path)
+
     print(
         f"Run complete. selected={selected_count} attempted={attempted_count} "
         f"sent={sent_count} failed={failed_count} dry_run={dry_run}"
     )
-    return 0 if failed_count == 0 else 1
+    return failed_count
+
+
+def _report_failed_run(metrics: MetricsCollector, dry_run: bool, exc: Exception) -> None:
+    """Write the run report and Prometheus file for a run the pipeline aborted."""
+    from app.config import get_settings
+    from app.services.metrics import write_run_report
+
+    settings = get_settings()
+    report_path = write_run_report(
+        metrics,
+        settings.reports_dir,
+        summary={"status": "failed", "error": repr(exc)[:300], "dry_run": dry_run},
+        prometheus_file=settings.metrics_prometheus_file,
+    )
+    logger.info("Run report written to %s", report_path)
+
+
+async def run_pipeline(args: argparse.Namespace) -> int:
+    from app.config import configure_langsmith_env, get_settings
+
+    settings = get_settings()
+    if not args.resume and not _check_settings(settings, bool(args.dry_run)):
+        return 2
+    _apply_execution_profile(args, settings)
+
+    from app.graph.workflow import build_workflow
+    from app.services.cassette import ReplayTransport
+    from app.services.checkpoints import load_checkpoint_values, open_checkpointer, run_config
+    from app.services.deadline import run_deadline
+    from app.services.extractor import shared_page_fetches
+    from app.services.http import shared_http_client
+    from app.services.metrics import collect_metrics
+    from app.services.profiling import profile_run
+    from app.services.tracing import trace_uploads
+
+    configure_langsmith_env(settings)
+    with ExitStack() as cleanup:
+        transport = _build_transport(args, settings, cleanup)
+
+        async with open_checkpointer(settings) as checkpointer:
+            run_input: AgentState | None
+            if args.resume:
+                if checkpointer is None:
+                    print("Cannot resume: checkpoints are disabled (CHECKPOINTS_ENABLED=false).")
+                    return 2
+                saved_values = await load_checkpoint_values(checkpointer, args.resume)
+                if saved_values is None:
+                    print(f"No checkpoint found for run {args.resume}.")
+                    return 2
+                run_id = args.resume
+                dry_run = bool(saved_values.get("dry_run", False))
+                if not _check_settings(settings, dry_run):
+                    return 2
+                run_input = None
+                logger.info("Resuming run %s", run_id)
+            else:
+                dry_run = bool(args.dry_run)
+                run_input = build_initial_state(dry_run, _resolve_limit(settings, args.limit))
+                run_id = run_input["run_id"]
+                logger.info("Starting run %s", run_id)
+                if isinstance(transport, ReplayTransport) and transport.recorded_at is not None:
+                    run_input["reference_time"] = transport.recorded_at.isoformat()
+
+            workflow = build_workflow(checkpointer=checkpointer)
+            config = run_config(run_id) if checkpointer is not None else None
+            try:
+                with (
+                    collect_metrics(run_id) as metrics,
+                    shared_page_fetches(),
+                    run_deadline(settings.run_deadline_seconds),
+                ):
+                    async with (
+                        trace_uploads(settings),
+                        profile_run(args.profile, metrics, settings.reports_dir),
+                        shared_http_client(settings, transport=transport),
+                    ):
+                        final_state = await workflow.ainvoke(run_input, config=config)
+            except Exception as exc:
+                logger.exception("Run %s failed", run_id)
+                _report_failed_run(metrics, dry_run, exc)
+                # A replay's checkpoints go with its temporary state dir.
+                if checkpointer is not None and not args.replay:
+                    print(f"Run failed. Resume with: python -m app.main run --resume {run_id}")
+                return 1
+
+            if checkpointer is not None:
+                await checkpointer.adelete_thread(run_id)
+
+        failed_count = report_run(final_state, dry_run, metrics=metrics)
+        return 0 if failed_count == 0 else 1
+
+
+async def serve_pipeline(args: argparse.Namespace) -> int:
+    from app.config import configure_langsmith_env, get_settings
+
+    settings = get_settings()
+    dry_run = bool(args.dry_run)
+    if not _check_settings(settings, dry_run):
+        return 2
+    _apply_execution_profile(args, settings)
+
+    from app.daemon import run_daemon
+    from app.graph.workflow import build_workflow
+    from app.services.http import shared_http_client
+    from app.services.tracing import trace_uploads
+
+    configure_langsmith_env(settings)
+
+    limit = _resolve_limit(settings, args.limit)
+    workflow = build_workflow()
+
+    async with trace_uploads(settings), shared_http_client(settings):
+        await run_daemon(
+            settings,
+            workflow,
+            build_state=lambda: build_initial_state(dry_run, limit),
+            on_cycle_complete=lambda final_state, metrics: report_run(
+                final_state,
+                dry_run,
+                metrics=metrics,
+            ),
+            max_cycles=args.max_cycles,
+        )
+    return 0
 
 
 def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
 
-    if args.command != "run":
+    if args.command not in {"run", "serve"}:
         parser.print_help()
         return
 
     setup_logging(verbose=bool(args.verbose))
-    exit_code = asyncio.run(run_pipeline(args))
+    if args.command == "serve":
+        try:
+            exit_code = asyncio.run(serve_pipeline(args))
+        except KeyboardInterrupt:
+            exit_code = 0
+    else:
+        exit_code = asyncio.run(run_pipeline(args))
     raise SystemExit(exit_code)
 
 
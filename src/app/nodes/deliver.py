@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 from app.config import get_settings
 from app.graph.state import AgentState
-from app.schemas.article import parse_articles
+from app.nodes.ingest import hold_watermarks
+from app.schemas.article import Article, parse_articles
+from app.services.ledger import ArticleStage, open_ledger
+from app.services.story_index import open_story_index
 from app.services.telegram_client import TelegramClient
 from app.services.tracing import traceable
 
@@ -17,14 +21,72 @@ async def deliver_node(state: AgentState) -> AgentState:
     dry_run = bool(state.get("dry_run", False))
 
     articles = parse_articles(state.get("articles_top20"))
-    telegram_client = TelegramClient(settings)
-    results = await telegram_client.send_articles(articles, dry_run=dry_run)
+    results: list[dict[str, Any]] = []
+
+    with open_ledger(settings) as ledger, open_story_index(settings) as story_index:
+        if ledger is not None:
+            # A resumed run picks up after the last message Telegram acknowledged.
+            acknowledged = ledger.message_ids([article.id for article in articles])
+            if acknowledged:
+                logger.info("Ledger skipped %s already delivered items", len(acknowledged))
+                results.extend(
+                    {
+                        "article_id": article_id,
+                        "status": "sent",
+                        "mode": "resumed",
+                        "message_id": message_id,
+                    }
+                    for article_id, message_id in acknowledged.items()
+                )
+                articles = [article for article in articles if article.id not in acknowledged]
+
+        def acknowledge(article: Article, result: dict[str, Any]) -> None:
+            if result.get("status") != "sent":
+                return
+            if ledger is not None:
+                message_id = result.get("message_id")
+                ledger.record(
+                    [article],
+                    ArticleStage.DELIVERED,
+                    message_ids={article.id: message_id} if message_id is not None else None,
+                )
+            if story_index is not None:
+                story_index.record([article])
+
+        telegram_client = TelegramClient(settings)
+        results.extend(
+            await telegram_client.send_articles(articles, dry_run=dry_run, on_result=acknowledge)
+        )
 
     next_state: AgentState = dict(state)
     next_state["delivery_results"] = results
+    if settings.ledger_enabled and not dry_run:
+        # Deferred, failed and deadline-unenriched articles stay ahead of the watermark
+        # so the next poll picks them up again. Articles after them that were delivered
+        # are fetched again as well, and the ledger drops those.
+        delivered = {item["article_id"] for item in results if item.get("status") == "sent"}
+        pending_ids = {
+            item["article_id"] for item in results if item.get("status") in {"deferred", "error"}
+        }
+        pending_ids.update(state.get("enrich_deferred_ids", []))
+        pending = [
+            article
+            for article in parse_articles(state.get("articles_raw"))
+            if article.id in pending_ids and article.id not in delivered
+        ]
+        next_state["source_watermarks"] = hold_watermarks(
+            state.get("source_watermarks", {}),
+            pending,
+        )
 
     failures = [item for item in results if item.get("status") == "error"]
-    logger.info("Delivery complete: %s sent, %s failed", len(results) - len(failures), len(failures))
+    deferred = [item for item in results if item.get("status") == "deferred"]
+    logger.info(
+        "Delivery complete: %s sent, %s failed, %s deferred",
+        len(results) - len(failures) - len(deferred),
+        len(failures),
+        len(deferred),
+    )
 
     if failures:
         existing_errors = list(next_state.get("errors", []))
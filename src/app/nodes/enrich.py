@@ -2,37 +2,62 @@ from __future__ import annotations
 
 import logging
 
-from app.config import get_settings
-from app.graph.state import AgentState
-from app.schemas.article import FetchRules, SourceConfig, parse_articles, serialize_articles
+from app.config import Settings
+from app.schemas.article import Article, FetchRules
 from app.services.extractor import OpenGraphExtractor
-from app.services.tracing import traceable
+from app.services.ledger import ArticleStage, open_ledger
+from app.services.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
 
-@traceable(name="enrich_node")
-async def enrich_node(state: AgentState) -> AgentState:
-    settings = get_settings()
-
-    raw_articles = parse_articles(state.get("articles_raw"))
-    source_configs = [SourceConfig.model_validate(item) for item in state.get("sources", [])]
-    defaults = FetchRules.model_validate(state.get("fetch_defaults", {}))
-
-    source_rules = {
-        source.name: source.merged_rules(defaults)
-        for source in source_configs
-    }
-
-    extractor = OpenGraphExtractor(settings)
-    enriched, errors = await extractor.enrich_articles(raw_articles, source_rules)
-
-    next_state: AgentState = dict(state)
-    next_state["articles_enriched"] = serialize_articles(enriched)
-
-    existing_errors = list(next_state.get("errors", []))
-    existing_errors.extend(errors)
-    next_state["errors"] = existing_errors
-
-    logger.info("Enrichment complete: %s items", len(enriched))
-    return next_state
+def apply_cached_enrichment(article: Article, cached: Article) -> Article:
+    enriched = article.model_copy(deep=True)
+    enriched.url = cached.url
+    enriched.og_title = cached.og_title
+    enriched.og_description = cached.og_description
+    enriched.image_url = cached.image_url
+    return enriched
+
+
+async def enrich_with_ledger(
+    settings: Settings,
+    raw_articles: list[Article],
+    source_rules: dict[str, FetchRules],
+) -> tuple[list[Article], list[str], set[str]]:
+    """
+    OpenGraph-enrich `raw_articles` in order, reusing ledger entries and
+    recording newly enriched ones. Also returns the ids the run deadline left
+    unenriched.
+    """
+    with open_ledger(settings) as ledger:
+        cached = (
+            ledger.lookup([article.id for article in raw_articles], ArticleStage.ENRICHED)
+            if ledger is not None
+            else {}
+        )
+        pending = [article for article in raw_articles if article.id not in cached]
+        metrics = get_metrics()
+        metrics.increment("cache_hits_total", len(cached), cache="ledger_enrich")
+        metrics.increment("cache_misses_total", len(pending), cache="ledger_enrich")
+
+        extractor = OpenGraphExtractor(settings)
+        fetched, errors = await extractor.enrich_articles(pending, source_rules)
+
+        if ledger is not None:
+            succeeded = [article for article in fetched if article.id not in extractor.failed_ids]
+            source_urls = {article.id: article.url for article in pending}
+            ledger.record(succeeded, ArticleStage.ENRICHED, source_urls=source_urls)
+            ledger.record_redirects({source_urls[article.id]: article.url for article in succeeded})
+
+    fetched_by_id = {article.id: article for article in fetched}
+    enriched = [
+        apply_cached_enrichment(article, cached[article.id])
+        if article.id in cached
+        else fetched_by_id[article.id]
+        for article in raw_articles
+    ]
+
+    if cached:
+        logger.debug("Enrichment reused %s ledger entries", len(cached))
+    return enriched, errors, extractor.deferred_ids
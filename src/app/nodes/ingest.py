@@ -1,33 +1,291 @@
 from __future__ import annotations
 
 import logging
+import time
+from datetime import UTC, datetime, timedelta
+
+from langgraph.types import Send
 
 from app.config import get_settings
-from app.graph.state import AgentState
-from app.schemas.article import serialize_articles
+from app.graph.state import AgentState, SourceBranchState
+from app.nodes.enrich import enrich_with_ledger
+from app.schemas.article import (
+    Article,
+    FetchRules,
+    SourceConfig,
+    parse_articles,
+    serialize_articles,
+)
+from app.services.ledger import open_ledger
+from app.services.metrics import get_metrics
 from app.services.rss_client import RSSClient, dedupe_articles
+from app.services.source_stats import (
+    open_source_stats,
+    schedule_sources,
+    source_timeouts,
+    sources_to_skip,
+)
+from app.services.story_index import apply_repeat_policy, open_story_index
 from app.services.tracing import traceable
 
 logger = logging.getLogger(__name__)
 
 
+def filter_new_articles(
+    articles: list[Article],
+    watermarks: dict[str, str],
+) -> tuple[list[Article], dict[str, str]]:
+    """
+    Drop entries at or before each source's watermark (its newest previously
+    seen `published_at`) and return the advanced watermarks.
+    """
+    parsed_marks = {name: datetime.fromisoformat(value) for name, value in watermarks.items()}
+    next_marks = dict(parsed_marks)
+
+    fresh: list[Article] = []
+    for article in articles:
+        published_at = article.published_at
+        if published_at is not None and published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=UTC)
+
+        mark = parsed_marks.get(article.source_name)
+        if mark is not None and (published_at is None or published_at <= mark):
+            continue
+
+        fresh.append(article)
+        if published_at is not None:
+            current = next_marks.get(article.source_name)
+            if current is None or published_at > current:
+                next_marks[article.source_name] = published_at
+
+    return fresh, {name: value.isoformat() for name, value in next_marks.items()}
+
+
+def hold_watermarks(watermarks: dict[str, str], pending: list[Article]) -> dict[str, str]:
+    """
+    Pull each source's watermark back to just before its oldest `pending` article,
+    so the next poll fetches that article again instead of dropping it as seen.
+    """
+    held = dict(watermarks)
+    for article in pending:
+        published_at = article.published_at
+        if published_at is None or article.source_name not in held:
+            continue
+        if published_at.tzinfo is None:
+            published_at = published_at.replace(tzinfo=UTC)
+        mark = min(
+            datetime.fromisoformat(held[article.source_name]),
+            published_at - timedelta(microseconds=1),
+        )
+        held[article.source_name] = mark.isoformat()
+    return held
+
+
 @traceable(name="ingest_node")
 async def ingest_node(state: AgentState) -> AgentState:
+    """Load the sources to poll and run per-run housekeeping before the fan-out."""
     settings = get_settings()
     rss_client = RSSClient(settings)
 
     fetch_defaults, sources = rss_client.load_sources()
-    articles, errors = await rss_client.fetch_all(sources)
-    deduped = dedupe_articles(articles)
+    source_names = state.get("source_names")
+    if source_names is not None:
+        wanted = set(source_names)
+        sources = [source for source in sources if source.name in wanted]
+
+    with open_ledger(settings) as ledger:
+        if ledger is not None:
+            compacted = ledger.compact(settings.ledger_retention_days)
+            if compacted:
+                logger.info("Ledger compaction removed %s rows", compacted)
+
+    with open_story_index(settings) as story_index:
+        if story_index is not None:
+            story_index.prune(settings.story_index_window_hours)
+
+    with open_source_stats(settings) as stats:
+        history = (
+            stats.history() if stats is not None and settings.source_scheduling_enabled else {}
+        )
+        publish_history = stats.publish_history() if stats is not None else {}
 
     next_state: AgentState = dict(state)
     next_state["fetch_defaults"] = fetch_defaults.model_dump(mode="json")
     next_state["sources"] = [source.model_dump(mode="json") for source in sources]
-    next_state["articles_raw"] = serialize_articles(deduped)
+    if settings.source_skipping_enabled:
+        skipped = set(
+            sources_to_skip(settings, next_state["sources"], publish_history, time.time())
+        )
+        get_metrics().increment("source_polls_skipped_total", len(skipped))
+        if skipped:
+            logger.info(
+                "Skipping %s sources unlikely to have new items: %s", len(skipped), sorted(skipped)
+            )
+            next_state["sources"] = [
+                source for source in next_state["sources"] if source["name"] not in skipped
+            ]
+    next_state["source_order"] = schedule_sources(next_state["sources"], history)
+    next_state["source_timeouts"] = source_timeouts(settings, history)
+    next_state["source_results"] = None  # type: ignore[typeddict-item]
+    logger.info("Ingesting %s sources", len(next_state["sources"]))
+    return next_state
+
+
+def fan_out_sources(state: AgentState) -> list[Send] | str:
+    """
+    One `source` branch per source, slowest expected first; straight to
+    `collect` when there are none.
+    """
+    watermarks = state.get("source_watermarks", {})
+    timeouts = state.get("source_timeouts", {})
+    # Branches take request slots in the order they are sent.
+    position = {name: index for index, name in enumerate(state.get("source_order", []))}
+    sources = sorted(
+        state.get("sources", []),
+        key=lambda source: position.get(source["name"], -1),
+    )
+    sends = [
+        Send(
+            "source",
+            {
+                "source": source,
+                "fetch_defaults": state.get("fetch_defaults", {}),
+                "watermark": watermarks.get(source["name"]),
+                "timeout_seconds": timeouts.get(source["name"]),
+                "dry_run": state.get("dry_run", False),
+            },
+        )
+        for source in sources
+    ]
+    return sends or "collect"
+
 
-    existing_errors = list(next_state.get("errors", []))
-    existing_errors.extend(errors)
-    next_state["errors"] = existing_errors
+@traceable(name="source_node")
+async def source_node(state: SourceBranchState) -> AgentState:
+    """
+    Fetch, parse, early-filter and enrich a single source. Branches run
+    concurrently, so a fast feed is enriched without waiting for slow ones.
+    """
+    settings = get_settings()
+    source = SourceConfig.model_validate(state["source"])
+    defaults = FetchRules.model_validate(state.get("fetch_defaults", {}))
+    watermark = state.get("watermark")
+
+    source_marks = {source.name: watermark} if watermark else {}
+    timeout = state.get("timeout_seconds")
+    rss_client = RSSClient(settings)
+    articles, errors = await rss_client.fetch_all(
+        [source],
+        source_marks,
+        defaults,
+        {source.name: timeout} if timeout else None,
+    )
+    with open_source_stats(settings) as stats:
+        if stats is not None and source.name in rss_client.fetch_seconds:
+            stats.record(
+                source.name,
+                rss_client.fetch_seconds[source.name],
+                rss_client.fetch_bytes.get(source.name, 0),
+            )
+            # Dry runs deliver nothing, so they must not make the next run skip the source.
+            if not errors and not state.get("dry_run"):
+                stats.record_poll(
+                    source.name,
+                    [
+                        article.published_at
+                        for article in articles
+                        if article.published_at is not None
+                    ],
+                )
+    articles, watermarks = filter_new_articles(articles, source_marks)
+
+    with open_ledger(settings) as ledger:
+        if ledger is not None:
+            # Links seen before go straight to their canonical URL: no redirect hop when
+            # enriching, and aggregator links dedupe against direct ones before any fetch.
+            resolved = ledger.resolve_urls([article.url for article in articles])
+            get_metrics().increment("redirect_map_hits_total", len(resolved))
+            articles = [
+                article.model_copy(update={"url": resolved[article.url]})
+                if article.url in resolved
+                else article
+                for article in articles
+            ]
+
+            fetched_count = len(articles)
+            articles = ledger.filter_delivered(articles)
+            skipped = fetched_count - len(articles)
+            get_metrics().increment("ledger_delivered_skips_total", skipped)
+            if skipped:
+                logger.debug("Ledger skipped %s delivered items from %s", skipped, source.name)
+
+    deduped = dedupe_articles(articles)
+
+    with open_story_index(settings) as story_index:
+        if story_index is not None:
+            repeats = story_index.match(deduped, settings.story_index_window_hours)
+            get_metrics().increment("story_index_repeats_total", len(repeats))
+            deduped = apply_repeat_policy(deduped, repeats, settings.story_repeat_policy)
+
+    enriched, enrich_errors, deferred_ids = await enrich_with_ledger(
+        settings,
+        deduped,
+        {source.name: source.merged_rules(defaults)},
+    )
+
+    result = {
+        "raw": serialize_articles(deduped),
+        "enriched": serialize_articles(enriched),
+        "watermark": watermarks.get(source.name),
+        "errors": [*errors, *enrich_errors],
+        "deferred_ids": sorted(deferred_ids),
+    }
+    return {"source_results": {source.name: result}}
+
+
+@traceable(name="collect_node")
+async def collect_node(state: AgentState) -> AgentState:
+    """Merge the per-source branches in source order and dedupe across sources by final URL."""
+    results = state.get("source_results") or {}
+    ordered = [
+        results[source["name"]] for source in state.get("sources", []) if source["name"] in results
+    ]
+
+    raw_by_id = {
+        article.id: article for result in ordered for article in parse_articles(result["raw"])
+    }
+    fetched = [article for result in ordered for article in parse_articles(result["enriched"])]
+
+    # Dedupe on the enriched URLs: after redirects and `rel=canonical`, an aggregator
+    # or tracking link and a direct link to the same page share one URL.
+    enriched = dedupe_articles(fetched)
+    deduped = [
+        raw_by_id[article.id].model_copy(update={"duplicate_count": article.duplicate_count})
+        for article in enriched
+    ]
+
+    watermarks = dict(state.get("source_watermarks", {}))
+    errors = list(state.get("errors", []))
+    deferred_ids: list[str] = []
+    for source_name, result in results.items():
+        if result.get("watermark"):
+            watermarks[source_name] = result["watermark"]
+    for result in ordered:
+        errors.extend(result["errors"])
+        deferred_ids.extend(result.get("deferred_ids", []))
+
+    next_state: AgentState = dict(state)
+    next_state["source_results"] = None  # type: ignore[typeddict-item]
+    next_state["articles_raw"] = serialize_articles(deduped)
+    next_state["articles_enriched"] = serialize_articles(enriched)
+    next_state["source_watermarks"] = watermarks
+    next_state["enrich_deferred_ids"] = deferred_ids
+    next_state["errors"] = errors
 
-    logger.info("Ingestion complete: %s raw items", len(deduped))
+    logger.info(
+        "Ingestion complete: %s items from %s sources (%s before cross-source dedupe)",
+        len(enriched),
+        len(ordered),
+        len(fetched),
+    )
     return next_state
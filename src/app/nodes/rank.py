@@ -43,7 +43,12 @@ async def rank_node(state: AgentState) -> AgentState:
     limit = int(state.get("limit", settings.max_articles_per_run))
     limit = max(1, min(limit, settings.max_articles_per_run))
 
-    local_now = datetime.now().astimezone()
+    reference_time = state.get("reference_time")
+    local_now = (
+        datetime.fromisoformat(reference_time).astimezone()
+        if reference_time
+        else datetime.now().astimezone()
+    )
     todays_articles = filter_articles_published_today(enriched_articles, now=local_now)
     filtered_count = len(enriched_articles) - len(todays_articles)
     if filtered_count:
@@ -54,7 +59,7 @@ async def rank_node(state: AgentState) -> AgentState:
             local_now.date().isoformat(),
         )
 
-    ranked = rank_articles(todays_articles, limit=limit)
+    ranked = rank_articles(todays_articles, limit=limit, now=local_now)
 
     next_state: AgentState = dict(state)
     next_state["articles_ranked"] = serialize_articles(ranked)
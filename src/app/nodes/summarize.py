@@ -5,6 +5,8 @@ import logging
 from app.config import get_settings
 from app.graph.state import AgentState
 from app.schemas.article import parse_articles, serialize_articles
+from app.services.ledger import ArticleStage, open_ledger
+from app.services.metrics import get_metrics
 from app.services.openrouter_client import OpenRouterClient
 from app.services.tracing import traceable
 
@@ -17,11 +19,50 @@ async def summarize_node(state: AgentState) -> AgentState:
     dry_run = bool(state.get("dry_run", False))
 
     top_articles = parse_articles(state.get("articles_top20"))
-    client = OpenRouterClient(settings)
-    summarized = await client.summarize_articles(top_articles, dry_run=dry_run)
+
+    with open_ledger(settings) as ledger:
+        cached = (
+            ledger.lookup([article.id for article in top_articles], ArticleStage.SUMMARIZED)
+            if ledger is not None
+            else {}
+        )
+        cached_summaries = {
+            article_id: article.summary for article_id, article in cached.items() if article.summary
+        }
+        pending = [article for article in top_articles if article.id not in cached_summaries]
+        metrics = get_metrics()
+        metrics.increment("cache_hits_total", len(cached_summaries), cache="ledger_summarize")
+        metrics.increment("cache_misses_total", len(pending), cache="ledger_summarize")
+
+        # Articles arrive in rank order; past the top N they are summarized locally.
+        remote_ids = (
+            {article.id for article in top_articles[: settings.llm_summary_top_n]}
+            if settings.llm_summary_top_n > 0
+            else None
+        )
+        client = OpenRouterClient(settings)
+        generated = await client.summarize_articles(pending, dry_run=dry_run, remote_ids=remote_ids)
+
+        if ledger is not None:
+            ledger.record(
+                [article for article in generated if article.id in client.generated_ids],
+                ArticleStage.SUMMARIZED,
+            )
+
+    generated_by_id = {article.id: article for article in generated}
+    summarized = []
+    for article in top_articles:
+        if article.id in cached_summaries:
+            reused = article.model_copy(deep=True)
+            reused.summary = cached_summaries[article.id]
+            summarized.append(reused)
+        else:
+            summarized.append(generated_by_id[article.id])
 
     next_state: AgentState = dict(state)
     next_state["articles_top20"] = serialize_articles(summarized)
 
+    if cached_summaries:
+        logger.info("Summarization reused %s ledger entries", len(cached_summaries))
     logger.info("Summarization complete: %s items", len(summarized))
     return next_state
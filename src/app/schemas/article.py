@@ -10,18 +10,23 @@ class FetchRules(BaseModel):
     image_fallback_rss_enclosure: bool = True
     requires_user_agent: bool = True
     blocked_domains: list[str] = Field(default_factory=list)
+    max_feed_bytes: int = 5_000_000
+    max_page_bytes: int = 1_000_000
 
 
 class SourceFetchOverrides(BaseModel):
     image_fallback_rss_enclosure: bool | None = None
     requires_user_agent: bool | None = None
     blocked_domains: list[str] | None = None
+    max_feed_bytes: int | None = None
+    max_page_bytes: int | None = None
 
 
 class SourceConfig(BaseModel):
     name: str
     url: str
     rss: str
+    poll_interval_seconds: int | None = None
     fetch_overrides: SourceFetchOverrides | None = None
 
     def merged_rules(self, defaults: FetchRules) -> FetchRules:
@@ -44,11 +49,37 @@ class SourceConfig(BaseModel):
                 if overrides.blocked_domains is not None
                 else defaults.blocked_domains
             ),
+            max_feed_bytes=(
+                overrides.max_feed_bytes
+                if overrides.max_feed_bytes is not None
+                else defaults.max_feed_bytes
+            ),
+            max_page_bytes=(
+                overrides.max_page_bytes
+                if overrides.max_page_bytes is not None
+                else defaults.max_page_bytes
+            ),
         )
 
 
+class DomainUrlRule(BaseModel):
+    domain: str
+    strip_params: list[str] = Field(default_factory=list)
+    keep_params: list[str] | None = None
+
+
+class UrlRules(BaseModel):
+    strip_params: list[str] = Field(
+        default_factory=lambda: ["utm_*", "gclid", "fbclid", "mc_cid", "mc_eid"],
+    )
+    sort_query: bool = True
+    collapse_amp: bool = True
+    domains: list[DomainUrlRule] = Field(default_factory=list)
+
+
 class SourcesFile(BaseModel):
     fetch_defaults: FetchRules = Field(default_factory=FetchRules)
+    url_rules: UrlRules = Field(default_factory=UrlRules)
     sources: list[SourceConfig]
 
 
@@ -70,6 +101,7 @@ class Article(BaseModel):
     duplicate_count: int = 1
     cluster_id: str | None = None
     cluster_size: int = 1
+    repeat_of: str | None = None
 
     @property
     def effective_title(self) -> str:
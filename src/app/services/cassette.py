@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import re
+import time
+from collections import defaultdict, deque
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+CASSETTE_FILENAME = "cassette.jsonl.gz"
+
+_BOT_TOKEN_RE = re.compile(r"/bot[^/]+/")
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def _redact_url(url: str) -> str:
+    return _BOT_TOKEN_RE.sub("/bot<redacted>/", url)
+
+
+def exchange_key(method: str, url: str, body: bytes) -> str:
+    digest = hashlib.sha1(body).hexdigest() if body else "-"
+    return f"{method.upper()} {_redact_url(url)} {digest}"
+
+
+def cassette_path(directory: str | Path) -> Path:
+    return Path(directory) / CASSETTE_FILENAME
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Pass requests through to `wrapped` and append every exchange to a gzip JSONL cassette."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        wrapped: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.wrapped = wrapped or httpx.AsyncHTTPTransport()
+        self.path = cassette_path(directory)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            self._append({"meta": {"recorded_at": datetime.now(UTC).isoformat()}})
+
+    def _append(self, entry: dict[str, Any]) -> None:
+        # Each append adds a gzip member; readers see the members as one stream, and
+        # every exchange is on disk even if the run dies before the transport closes.
+        with gzip.open(self.path, "at", encoding="utf-8") as cassette:
+            cassette.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        started = time.perf_counter()
+        response = await self.wrapped.handle_async_request(request)
+        content = await response.aread()
+        elapsed = time.perf_counter() - started
+        await response.aclose()
+
+        headers = [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in _DROPPED_HEADERS
+        ]
+        entry = {
+            "key": exchange_key(request.method, str(request.url), body),
+            "status": response.status_code,
+            "headers": headers,
+            "content": base64.b64encode(content).decode("ascii"),
+            "elapsed": round(elapsed, 4),
+        }
+        self._append(entry)
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            request=request,
+            extensions={"http_version": response.extensions.get("http_version", b"HTTP/1.1")},
+        )
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """
+    Serve recorded exchanges by method, URL and body hash. Repeated requests are
+    answered in recorded order; `latency` is a fixed delay in seconds, or
+    "recorded" to replay each exchange's original timing.
+    """
+
+    def __init__(self, directory: str | Path, latency: float | str | None = None) -> None:
+        self.latency = latency
+        self.recorded_at: datetime | None = None
+        self._exchanges: dict[str, deque[dict[str, Any]]] = defaultdict(deque)
+        self._last: dict[str, dict[str, Any]] = {}
+
+        with gzip.open(cassette_path(directory), "rt", encoding="utf-8") as cassette:
+            for line in cassette:
+                entry = json.loads(line)
+                if "meta" in entry:
+                    if self.recorded_at is None:
+                        self.recorded_at = datetime.fromisoformat(entry["meta"]["recorded_at"])
+                    continue
+                self._exchanges[entry["key"]].append(entry)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = exchange_key(request.method, str(request.url), await request.aread())
+        queue = self._exchanges.get(key)
+        if queue:
+            entry = queue.popleft()
+            self._last[key] = entry
+        elif key in self._last:
+            entry = self._last[key]
+        else:
+            raise httpx.ConnectError(f"No recorded response for {key}", request=request)
+
+        delay = entry["elapsed"] if self.latency == "recorded" else self.latency
+        if delay:
+            await asyncio.sleep(float(delay))
+
+        return httpx.Response(
+            entry["status"],
+            headers=[(name, value) for name, value in entry["headers"]],
+            content=base64.b64decode(entry["content"]),
+            request=request,
+        )
+
+
+def parse_replay_latency(value: str | None) -> float | str | None:
+    if value is None or value == "recorded":
+        return value
+    return float(value) / 1000.0
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from app.config import Settings
+from app.services.state_store import state_path
+
+
+def run_config(run_id: str) -> RunnableConfig:
+    return {"configurable": {"thread_id": run_id}}
+
+
+@asynccontextmanager
+async def open_checkpointer(settings: Settings) -> AsyncIterator[AsyncSqliteSaver | None]:
+    """Checkpoint every node's output under `run_id` so a failed run can be resumed."""
+    if not settings.checkpoints_enabled:
+        yield None
+        return
+
+    async with AsyncSqliteSaver.from_conn_string(
+        str(state_path(settings, "checkpoints.sqlite3"))
+    ) as saver:
+        yield saver
+
+
+async def load_checkpoint_values(
+    checkpointer: AsyncSqliteSaver,
+    run_id: str,
+) -> dict[str, Any] | None:
+    saved = await checkpointer.aget_tuple(run_config(run_id))
+    if saved is None:
+        return None
+    return dict(saved.checkpoint.get("channel_values", {}))
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Share of the run budget used up by the end of each stage that can degrade. The
+# cutoffs are cumulative, so time a stage leaves unused carries over to the next one.
+STAGE_CUTOFFS = {"enrich": 0.5, "summarize": 0.8, "deliver": 1.0}
+
+MISSED: Any = object()
+
+
+class RunDeadline:
+    def __init__(self, budget_seconds: float, started: float | None = None) -> None:
+        self.budget_seconds = budget_seconds
+        self.started = time.monotonic() if started is None else started
+
+    def stage_ends_at(self, stage: str) -> float:
+        return self.started + self.budget_seconds * STAGE_CUTOFFS[stage]
+
+    def remaining(self, stage: str) -> float:
+        return max(self.stage_ends_at(stage) - time.monotonic(), 0.0)
+
+
+_current: ContextVar[RunDeadline | None] = ContextVar("run_deadline", default=None)
+
+
+@contextmanager
+def run_deadline(budget_seconds: float | None) -> Iterator[RunDeadline | None]:
+    """Apply a time budget to the enclosed run; no budget when `budget_seconds` is falsy."""
+    deadline = RunDeadline(budget_seconds) if budget_seconds else None
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def stage_remaining(stage: str) -> float | None:
+    """Seconds left in `stage`'s budget, or None when the run has no deadline."""
+    deadline = _current.get()
+    return None if deadline is None else deadline.remaining(stage)
+
+
+async def gather_within(stage: str, awaitables: list[Awaitable[T]]) -> list[T]:
+    """
+    Like `asyncio.gather`, but whatever is still running when `stage`'s budget
+    runs out is cancelled and comes back as `MISSED`.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    timeout = stage_remaining(stage)
+    if timeout is None or not tasks:
+        return list(await asyncio.gather(*tasks))
+
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    return [task.result() if task in done and not task.cancelled() else MISSED for task in tasks]
+
+
+def record_degradation(stage: str, count: int, **details: Any) -> None:
+    if not count:
+        return
+    metrics = get_metrics()
+    metrics.increment("deadline_degradations_total", count, stage=stage)
+    metrics.record_event("deadline_degraded", stage=stage, articles=count, **details)
+    logger.warning("Run deadline: %s degraded for %s article(s)", stage, count)
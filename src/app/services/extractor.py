@@ -2,22 +2,86 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from typing import Any
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse
 
 import httpx
 from bs4 import BeautifulSoup
 
 from app.config import Settings
 from app.schemas.article import Article, FetchRules
-from app.services.rss_client import normalize_url
+from app.services.deadline import MISSED, gather_within, record_degradation
+from app.services.http import CappedBody, http_client, request_slots
+from app.services.metrics import get_metrics
+from app.services.text import clean_text
+from app.services.urls import normalize_url, url_key
 
 logger = logging.getLogger(__name__)
 
+_HEAD_END = re.compile(rb"</head\s*>", re.IGNORECASE)
+
+
+@dataclass
+class PageFields:
+    final_url: str
+    og_title: str | None = None
+    og_description: str | None = None
+    og_image: str | None = None
+
+
+# (url key, request headers, byte cap)
+_PageKey = tuple[str, tuple[tuple[str, str], ...], int]
+_page_fetches: ContextVar[dict[_PageKey, asyncio.Future[PageFields]] | None] = ContextVar(
+    "page_fetches",
+    default=None,
+)
+
+
+@contextmanager
+def shared_page_fetches() -> Iterator[None]:
+    """
+    Share page downloads across every extractor in this context (one run or one
+    poll cycle), so per-source branches never fetch the same URL twice.
+    """
+    token = _page_fetches.set({})
+    try:
+        yield
+    finally:
+        _page_fetches.reset(token)
+
 
 def extract_open_graph_fields(html: str) -> tuple[str | None, str | None, str | None]:
-    soup = BeautifulSoup(html, "lxml")
+    return _open_graph_fields(BeautifulSoup(html, "lxml"))
+
+
+def extract_canonical_url(soup: BeautifulSoup, page_url: str) -> str | None:
+    """
+    The page's `<link rel="canonical">` (or `og:url`), resolved against `page_url`.
+    Canonicals pointing at a site's front page are a common CMS misconfiguration
+    and are ignored.
+    """
+    link = soup.find("link", rel="canonical")
+    href = link.get("href") if link is not None else None
+    if not href:
+        meta = soup.find("meta", attrs={"property": "og:url"})
+        href = meta.get("content") if meta is not None else None
+    if not href:
+        return None
+
+    canonical = urlparse(urljoin(page_url, str(href).strip()))
+    if canonical.scheme not in ("http", "https") or not canonical.hostname:
+        return None
+    if canonical.path in ("", "/") and not canonical.query:
+        return None
+    return normalize_url(canonical.geturl())
+
 
+def _open_graph_fields(soup: BeautifulSoup) -> tuple[str | None, str | None, str | None]:
     def meta_value(*keys: str) -> str | None:
         for key in keys:
             tag = soup.find("meta", attrs={"property": key}) or soup.find("meta", attrs={"name": key})
@@ -43,31 +107,108 @@ def is_domain_blocked(url: str, blocked_domains: list[str]) -> bool:
 class OpenGraphExtractor:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self.failed_ids: set[str] = set()
+        # Left unenriched by the run deadline rather than by a failed fetch.
+        self.deferred_ids: set[str] = set()
 
     async def enrich_articles(
         self,
         articles: list[Article],
         source_rules: dict[str, FetchRules],
     ) -> tuple[list[Article], list[str]]:
-        timeout = httpx.Timeout(self.settings.request_timeout_seconds)
-        semaphore = asyncio.Semaphore(self.settings.http_concurrency)
+        semaphore = request_slots(self.settings)
 
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+        async with http_client(self.settings) as client:
             async def worker(article: Article) -> tuple[Article, str | None]:
                 async with semaphore:
                     return await self._enrich_one(client, article, source_rules.get(article.source_name, FetchRules()))
 
-            results = await asyncio.gather(*(worker(article) for article in articles))
+            results = await gather_within("enrich", [worker(article) for article in articles])
 
         enriched: list[Article] = []
         errors: list[str] = []
-        for article, maybe_error in results:
+        missed = 0
+        for original, result in zip(articles, results):
+            if result is MISSED:
+                # Out of enrichment budget: keep the feed's own fields, and leave the
+                # article out of the ledger so a later run enriches it properly.
+                rules = source_rules.get(original.source_name, FetchRules())
+                enriched.append(self._without_page(original, rules))
+                self.failed_ids.add(original.id)
+                self.deferred_ids.add(original.id)
+                missed += 1
+                continue
+            article, maybe_error = result
             enriched.append(article)
             if maybe_error:
                 errors.append(maybe_error)
+                self.failed_ids.add(article.id)
 
+        record_degradation("enrich", missed, fallback="rss_fields")
         return enriched, errors
 
+    async def _fetch_page(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict[str, str],
+        max_bytes: int,
+    ) -> PageFields:
+        pages = _page_fetches.get()
+        if pages is None:
+            return await self._download_page(client, url, headers, max_bytes)
+
+        # Single-flight per URL key: sources that link the same story, even through
+        # `www.`/AMP/trailing-slash variants, share one download, as long as they
+        # fetch it with the same headers and byte cap.
+        key = (url_key(url), tuple(sorted(headers.items())), max_bytes)
+        pending = pages.get(key)
+        if pending is None:
+            pending = pages[key] = asyncio.ensure_future(
+                self._download_page(client, url, headers, max_bytes)
+            )
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            # Waiters are only cancelled when the run aborts or the enrichment deadline
+            # passes, which applies to every branch alike; free the request slot.
+            pending.cancel()
+            raise
+
+    async def _download_page(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: dict[str, str],
+        max_bytes: int,
+    ) -> PageFields:
+        """
+        Fetch a page's `<head>`: the body is read only for HTML, stops after
+        `</head>`, and is capped at `max_bytes`.
+        """
+        async with client.stream("GET", url, headers=headers, follow_redirects=True) as response:
+            response.raise_for_status()
+            page = PageFields(final_url=normalize_url(str(response.url)))
+            if "text/html" not in response.headers.get("content-type", ""):
+                return page
+
+            html = bytearray()
+            async for chunk in CappedBody(response, max_bytes, "page").chunks():
+                html += chunk
+                # Everything the page contributes is in its head.
+                if _HEAD_END.search(html, max(len(html) - len(chunk) - len(b"</head>"), 0)):
+                    break
+            encoding = response.charset_encoding
+
+        soup = BeautifulSoup(bytes(html), "lxml", from_encoding=encoding)
+        page.og_title, og_description, page.og_image = _open_graph_fields(soup)
+        page.og_description = clean_text(og_description, self.settings.description_max_chars)
+        canonical = extract_canonical_url(soup, str(response.url))
+        if canonical is not None and canonical != page.final_url:
+            get_metrics().increment("canonical_url_rewrites_total")
+            page.final_url = canonical
+        return page
+
     async def _enrich_one(
         self,
         client: httpx.AsyncClient,
@@ -79,35 +220,34 @@ class OpenGraphExtractor:
         enriched.url = normalized_url
 
         if is_domain_blocked(normalized_url, rules.blocked_domains):
-            if rules.image_fallback_rss_enclosure and enriched.rss_image_url:
-                enriched.image_url = enriched.rss_image_url
-            return enriched, None
+            return self._without_page(article, rules), None
 
         headers: dict[str, str] = {}
         if rules.requires_user_agent:
             headers["User-Agent"] = self.settings.user_agent
 
         try:
-            response = await client.get(normalized_url, headers=headers)
-            response.raise_for_status()
+            page = await self._fetch_page(client, normalized_url, headers, rules.max_page_bytes)
         except Exception as exc:
-            if rules.image_fallback_rss_enclosure and enriched.rss_image_url:
-                enriched.image_url = enriched.rss_image_url
-            return enriched, f"Enrichment failed ({enriched.source_name}): {exc}"
-
-        enriched.url = normalize_url(str(response.url))
-
-        content_type = response.headers.get("content-type", "")
-        if "text/html" in content_type:
-            og_title, og_description, og_image = extract_open_graph_fields(response.text)
-            if og_title:
-                enriched.og_title = og_title
-            if og_description:
-                enriched.og_description = og_description
-            if og_image:
-                enriched.image_url = og_image
+            return self._without_page(article, rules), f"Enrichment failed ({enriched.source_name}): {exc}"
+
+        enriched.url = page.final_url
+        if page.og_title:
+            enriched.og_title = page.og_title
+        if page.og_description:
+            enriched.og_description = page.og_description
+        if page.og_image:
+            enriched.image_url = page.og_image
 
         if not enriched.image_url and rules.image_fallback_rss_enclosure and enriched.rss_image_url:
             enriched.image_url = enriched.rss_image_url
 
         return enriched, None
+
+    def _without_page(self, article: Article, rules: FetchRules) -> Article:
+        """The article as the feed described it, for when its page is not fetched."""
+        enriched = article.model_copy(deep=True)
+        enriched.url = normalize_url(enriched.url)
+        if rules.image_fallback_rss_enclosure and enriched.rss_image_url:
+            enriched.image_url = enriched.rss_image_url
+        return enriched
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Any
+
+from lxml import etree
+
+_ATOM = "{http://www.w3.org/2005/Atom}"
+_RSS1 = "{http://purl.org/rss/1.0/}"
+_MEDIA = "{http://search.yahoo.com/mrss/}"
+_DC = "{http://purl.org/dc/elements/1.1/}"
+_ITEM_TAGS = frozenset({"item", f"{_RSS1}item", f"{_ATOM}entry"})
+
+
+def _text(element: etree._Element | None) -> str | None:
+    if element is None:
+        return None
+    # Atom type="xhtml" content is child markup; its text is enough here.
+    text = "".join(element.itertext()).strip()
+    return text or None
+
+
+def _rss_entry(item: etree._Element, ns: str) -> dict[str, Any]:
+    link = _text(item.find(f"{ns}link"))
+    if not link:
+        guid = item.find("guid")
+        if guid is not None and guid.get("isPermaLink", "true") == "true":
+            link = _text(guid)
+    links = [
+        {"rel": "enclosure", "href": enclosure.get("url"), "type": enclosure.get("type", "")}
+        for enclosure in item.iterfind("enclosure")
+        if enclosure.get("url")
+    ]
+    return {
+        "title": _text(item.find(f"{ns}title")),
+        "link": link,
+        "summary": _text(item.find(f"{ns}description")),
+        "published": _text(item.find("pubDate")) or _text(item.find(f"{_DC}date")),
+        "links": links,
+    }
+
+
+def _atom_entry(entry: etree._Element) -> dict[str, Any]:
+    link = None
+    links = []
+    for element in entry.iterfind(f"{_ATOM}link"):
+        rel = element.get("rel", "alternate")
+        href = element.get("href")
+        if rel == "alternate" and link is None:
+            link = href
+        links.append({"rel": rel, "href": href, "type": element.get("type", "")})
+    return {
+        "title": _text(entry.find(f"{_ATOM}title")),
+        "link": link,
+        "summary": _text(entry.find(f"{_ATOM}summary")) or _text(entry.find(f"{_ATOM}content")),
+        "published": _text(entry.find(f"{_ATOM}published")),
+        "updated": _text(entry.find(f"{_ATOM}updated")),
+        "links": links,
+    }
+
+
+def _entry(element: etree._Element) -> dict[str, Any]:
+    entry = (
+        _atom_entry(element)
+        if element.tag == f"{_ATOM}entry"
+        else _rss_entry(
+            element,
+            _RSS1 if element.tag == f"{_RSS1}item" else "",
+        )
+    )
+    for key in ("content", "thumbnail"):
+        media = [
+            {"url": item.get("url")} for item in element.iter(f"{_MEDIA}{key}") if item.get("url")
+        ]
+        if media:
+            entry[f"media_{key}"] = media
+    return entry
+
+
+class FeedItemParser:
+    """
+    Incremental RSS 1.0/2.0 and Atom parser. Feed it the body chunk by chunk and
+    it returns the entries completed so far, as dicts with the feedparser keys
+    the RSS client reads. Raises `lxml.etree.XMLSyntaxError` on malformed XML.
+    """
+
+    def __init__(self) -> None:
+        self._parser = etree.XMLPullParser(
+            events=("end",),
+            tag=list(_ITEM_TAGS),
+            resolve_entities=False,
+            no_network=True,
+        )
+
+    def feed(self, chunk: bytes) -> list[dict[str, Any]]:
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> list[dict[str, Any]]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> list[dict[str, Any]]:
+        entries = []
+        for _, element in self._parser.read_events():
+            entries.append(_entry(element))
+            # Drop parsed items so memory stays flat however long the feed is.
+            element.clear()
+            parent = element.getparent()
+            while parent is not None and element.getprevious() is not None:
+                del parent[0]
+        return entries
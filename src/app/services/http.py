@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+import httpx
+
+from app.config import Settings
+from app.services.metrics import MetricsTransport, get_metrics
+
+logger = logging.getLogger(__name__)
+
+_shared_client: ContextVar[httpx.AsyncClient | None] = ContextVar(
+    "shared_http_client",
+    default=None,
+)
+_shared_slots: ContextVar[asyncio.Semaphore | None] = ContextVar(
+    "shared_request_slots",
+    default=None,
+)
+
+
+def network_transport(settings: Settings) -> httpx.AsyncHTTPTransport:
+    """The pooled network transport, with connection limits sized from HTTP_CONCURRENCY."""
+    limits = httpx.Limits(
+        max_connections=max(settings.http_concurrency * 2, 10),
+        max_keepalive_connections=max(settings.http_concurrency, 5),
+    )
+    return httpx.AsyncHTTPTransport(limits=limits)
+
+
+def build_async_client(
+    settings: Settings,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    timeout = httpx.Timeout(settings.request_timeout_seconds)
+    network = transport or network_transport(settings)
+    return httpx.AsyncClient(timeout=timeout, transport=MetricsTransport(network))
+
+
+@asynccontextmanager
+async def shared_http_client(
+    settings: Settings,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Open one pooled client and make it the default for every service client
+    created inside this context, so connections stay warm across nodes and runs.
+    """
+    async with build_async_client(settings, transport=transport) as client:
+        token = _shared_client.set(client)
+        slots_token = _shared_slots.set(asyncio.Semaphore(settings.http_concurrency))
+        try:
+            yield client
+        finally:
+            _shared_slots.reset(slots_token)
+            _shared_client.reset(token)
+
+
+def request_slots(settings: Settings) -> asyncio.Semaphore:
+    """
+    The run-wide limit of `http_concurrency` in-flight requests when inside
+    `shared_http_client`, so parallel graph branches share one budget.
+    """
+    shared = _shared_slots.get()
+    return shared if shared is not None else asyncio.Semaphore(settings.http_concurrency)
+
+
+@asynccontextmanager
+async def http_client(settings: Settings) -> AsyncIterator[httpx.AsyncClient]:
+    shared = _shared_client.get()
+    if shared is not None:
+        yield shared
+        return
+
+    async with build_async_client(settings) as client:
+        yield client
+
+
+class CappedBody:
+    """
+    Reads a streamed response's body up to `max_bytes` and drops the rest, so one
+    oversized or endless response cannot exhaust memory. Cut-offs are counted in
+    `response_size_aborts_total{kind}`.
+    """
+
+    def __init__(self, response: httpx.Response, max_bytes: int, kind: str) -> None:
+        self.response = response
+        self.max_bytes = max_bytes
+        self.kind = kind
+        self.read = 0
+        self.truncated = False
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        async for chunk in self.response.aiter_bytes():
+            if self.read + len(chunk) > self.max_bytes:
+                if self.max_bytes > self.read:
+                    yield chunk[: self.max_bytes - self.read]
+                self.read = self.max_bytes
+                self.truncated = True
+                get_metrics().increment("response_size_aborts_total", kind=self.kind)
+                logger.warning(
+                    "Stopped reading %s after %s bytes (%s)",
+                    self.response.url,
+                    self.max_bytes,
+                    self.kind,
+                )
+                return
+            self.read += len(chunk)
+            yield chunk
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from enum import IntEnum
+
+from app.config import Settings
+from app.schemas.article import Article
+from app.services.state_store import open_state_db
+from app.services.urls import normalize_url
+
+_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    article_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    final_url TEXT NOT NULL,
+    stage INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    message_id INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_url ON articles (url);
+CREATE INDEX IF NOT EXISTS articles_final_url ON articles (final_url);
+CREATE INDEX IF NOT EXISTS articles_updated_at ON articles (updated_at);
+CREATE TABLE IF NOT EXISTS redirects (
+    url TEXT PRIMARY KEY,
+    final_url TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS redirects_updated_at ON redirects (updated_at);
+"""
+
+
+class ArticleStage(IntEnum):
+    ENRICHED = 1
+    SUMMARIZED = 2
+    DELIVERED = 3
+
+
+def _batched(values: list[str]) -> Iterable[list[str]]:
+    for start in range(0, len(values), _BATCH_SIZE):
+        yield values[start : start + _BATCH_SIZE]
+
+
+class ArticleLedger:
+    """
+    On-disk record of the furthest stage each article reached, keyed by
+    article id and normalized URL, so repeat runs can skip finished work, and
+    of where feed URLs redirect to, so repeat links resolve without a fetch.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+        self.connection.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, settings: Settings) -> ArticleLedger:
+        return cls(open_state_db(settings, "ledger"))
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def filter_delivered(self, articles: list[Article]) -> list[Article]:
+        if not articles:
+            return []
+
+        ids = list({article.id for article in articles})
+        urls = list({normalize_url(article.url) for article in articles})
+        delivered_ids: set[str] = set()
+        delivered_urls: set[str] = set()
+
+        for batch in _batched(ids):
+            placeholders = ",".join("?" for _ in batch)
+            rows = self.connection.execute(
+                "SELECT article_id FROM articles "
+                f"WHERE stage >= ? AND article_id IN ({placeholders})",
+                (int(ArticleStage.DELIVERED), *batch),
+            )
+            delivered_ids.update(row[0] for row in rows)
+
+        for batch in _batched(urls):
+            placeholders = ",".join("?" for _ in batch)
+            rows = self.connection.execute(
+                "SELECT url, final_url FROM articles WHERE stage >= ? "
+                f"AND (url IN ({placeholders}) OR final_url IN ({placeholders}))",
+                (int(ArticleStage.DELIVERED), *batch, *batch),
+            )
+            for url, final_url in rows:
+                delivered_urls.add(url)
+                delivered_urls.add(final_url)
+
+        return [
+            article
+            for article in articles
+            if article.id not in delivered_ids and normalize_url(article.url) not in delivered_urls
+        ]
+
+    def lookup(self, article_ids: list[str], min_stage: ArticleStage) -> dict[str, Article]:
+        found: dict[str, Article] = {}
+        for batch in _batched(list(dict.fromkeys(article_ids))):
+            placeholders = ",".join("?" for _ in batch)
+            rows = self.connection.execute(
+                "SELECT article_id, payload FROM articles "
+                f"WHERE stage >= ? AND article_id IN ({placeholders})",
+                (int(min_stage), *batch),
+            )
+            for article_id, payload in rows:
+                found[article_id] = Article.model_validate(json.loads(payload))
+        return found
+
+    def message_ids(self, article_ids: list[str]) -> dict[str, int | None]:
+        found: dict[str, int | None] = {}
+        for batch in _batched(list(dict.fromkeys(article_ids))):
+            placeholders = ",".join("?" for _ in batch)
+            rows = self.connection.execute(
+                "SELECT article_id, message_id FROM articles "
+                f"WHERE stage >= ? AND article_id IN ({placeholders})",
+                (int(ArticleStage.DELIVERED), *batch),
+            )
+            found.update(rows)
+        return found
+
+    def record(
+        self,
+        articles: list[Article],
+        stage: ArticleStage,
+        source_urls: dict[str, str] | None = None,
+        message_ids: dict[str, int] | None = None,
+    ) -> None:
+        """
+        Upsert articles at `stage`. A row never moves back to an earlier stage;
+        `source_urls` maps article ids to their pre-redirect feed URL.
+        """
+        if not articles:
+            return
+
+        now = time.time()
+        rows = [
+            (
+                article.id,
+                normalize_url((source_urls or {}).get(article.id, article.url)),
+                normalize_url(article.url),
+                int(stage),
+                article.model_dump_json(),
+                (message_ids or {}).get(article.id),
+                now,
+            )
+            for article in articles
+        ]
+        with self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO articles
+                    (article_id, url, final_url, stage, payload, message_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(article_id) DO UPDATE SET
+                    final_url = excluded.final_url,
+                    payload = CASE WHEN excluded.stage >= articles.stage
+                        THEN excluded.payload ELSE articles.payload END,
+                    message_id = COALESCE(excluded.message_id, articles.message_id),
+                    stage = MAX(articles.stage, excluded.stage),
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+
+    def resolve_urls(self, urls: list[str]) -> dict[str, str]:
+        """Map feed URLs to the canonical URL an earlier run found they lead to."""
+        found: dict[str, str] = {}
+        for batch in _batched(list(dict.fromkeys(normalize_url(url) for url in urls))):
+            placeholders = ",".join("?" for _ in batch)
+            rows = self.connection.execute(
+                f"SELECT url, final_url FROM redirects WHERE url IN ({placeholders})",
+                batch,
+            )
+            found.update(rows)
+        return found
+
+    def record_redirects(self, final_urls: dict[str, str]) -> None:
+        """Remember feed URL -> canonical URL pairs that differ, for `resolve_urls`."""
+        now = time.time()
+        rows = [
+            (normalize_url(url), normalize_url(final_url), now)
+            for url, final_url in final_urls.items()
+            if normalize_url(url) != normalize_url(final_url)
+        ]
+        if not rows:
+            return
+        with self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO redirects (url, final_url, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    final_url = excluded.final_url,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+
+    def compact(self, retention_days: int) -> int:
+        cutoff = time.time() - (retention_days * 86400)
+        with self.connection:
+            cursor = self.connection.execute("DELETE FROM articles WHERE updated_at < ?", (cutoff,))
+            redirects = self.connection.execute(
+                "DELETE FROM redirects WHERE updated_at < ?", (cutoff,)
+            )
+        return cursor.rowcount + redirects.rowcount
+
+
+@contextmanager
+def open_ledger(settings: Settings) -> Iterator[ArticleLedger | None]:
+    if not settings.ledger_enabled:
+        yield None
+        return
+
+    ledger = ArticleLedger.open(settings)
+    try:
+        yield ledger
+    finally:
+        ledger.close()
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from app.config import Settings
+from app.services.metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Refills at `per_minute / 60` per second. It holds one second's worth (at least
+    one unit), so requests are spread evenly instead of bursting a minute's budget.
+    A request larger than that waits for a full bucket and leaves it in debt, which
+    later requests wait out, so the long-run rate stays at `per_minute`.
+    """
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate, 1.0)
+        self.available = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> None:
+        needed = min(amount, self.capacity)
+        while True:
+            self._refill()
+            # Tolerance: a wait computed to the exact refill can land a rounding error short.
+            if self.available >= needed - 1e-9:
+                self.available -= amount
+                return
+            await asyncio.sleep((needed - self.available) / self.rate)
+
+
+class _ProviderBudget:
+    def __init__(self, settings: Settings) -> None:
+        self.requests = (
+            TokenBucket(settings.llm_requests_per_minute)
+            if settings.llm_requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(settings.llm_tokens_per_minute) if settings.llm_tokens_per_minute else None
+        )
+        self.paused_until = 0.0
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """The provider's requested wait: `Retry-After` (seconds or HTTP date) or `X-RateLimit-Reset`."""
+    retry_after = response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                return None
+            return max((when - datetime.now(UTC)).total_seconds(), 0.0)
+
+    reset = response.headers.get("x-ratelimit-reset")
+    if reset and reset.isdigit():
+        # OpenRouter sends the reset time as epoch milliseconds.
+        return max(int(reset) / 1000.0 - time.time(), 0.0)
+    return None
+
+
+class LLMScheduler:
+    """
+    Admission control for summary requests: a fixed number of summaries in
+    flight, per-provider request and token budgets, and a shared cooldown when
+    a provider answers 429, so one rate limit pauses every request to it.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self._slots = asyncio.Semaphore(max(settings.llm_concurrency, 1))
+        self._providers: dict[str, _ProviderBudget] = {}
+        self._waiting = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the LLM_CONCURRENCY summary slots."""
+        metrics = get_metrics()
+        self._waiting += 1
+        metrics.gauge_max("llm_queue_depth_max", self._waiting)
+        started = time.perf_counter()
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        metrics.observe("llm_queue_wait_seconds", time.perf_counter() - started, queue="slot")
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def paused_for(self, provider: str) -> float:
+        """Seconds left of `provider`'s rate-limit cooldown."""
+        budget = self._providers.get(provider)
+        return max(budget.paused_until - time.monotonic(), 0.0) if budget is not None else 0.0
+
+    async def admit(self, provider: str, estimated_tokens: int) -> None:
+        """Wait out any cooldown and the request and token budgets of `provider`."""
+        budget = self._providers.get(provider)
+        if budget is None:
+            budget = self._providers[provider] = _ProviderBudget(self.settings)
+
+        started = time.perf_counter()
+        while (pause := budget.paused_until - time.monotonic()) > 0:
+            await asyncio.sleep(pause)
+        if budget.requests is not None:
+            await budget.requests.acquire(1)
+        if budget.tokens is not None:
+            await budget.tokens.acquire(estimated_tokens)
+        get_metrics().observe("llm_queue_wait_seconds", time.perf_counter() - started, queue="rate")
+
+    def backoff(self, provider: str, attempt: int, response: httpx.Response | None) -> float:
+        """
+        Seconds to wait before retry `attempt` (1-based). A 429 with a provider
+        hint pauses every request to `provider` for that long; otherwise it is
+        capped exponential backoff with full jitter.
+        """
+        hinted = retry_after_seconds(response) if response is not None else None
+        if hinted is not None:
+            # A little jitter on top, so waiters released together do not retry in lockstep.
+            delay = min(hinted, self.settings.llm_backoff_max_seconds) + random.uniform(
+                0,
+                self.settings.llm_backoff_base_seconds,
+            )
+        else:
+            ceiling = self.settings.llm_backoff_base_seconds * 2 ** (attempt - 1)
+            delay = random.uniform(0, min(ceiling, self.settings.llm_backoff_max_seconds))
+
+        if response is not None and response.status_code == 429:
+            budget = self._providers.get(provider)
+            if budget is not None:
+                budget.paused_until = max(budget.paused_until, time.monotonic() + delay)
+            get_metrics().increment("llm_rate_limit_pauses_total")
+            logger.info("Rate limited by %s; pausing its requests for %.1fs", provider, delay)
+        return delay
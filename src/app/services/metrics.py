@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Protocol, TypeVar
+
+import httpx
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_Labels = tuple[tuple[str, str], ...]
+_StateT = TypeVar("_StateT")
+_ResultT = TypeVar("_ResultT")
+_StateT_contra = TypeVar("_StateT_contra", contravariant=True)
+_ResultT_co = TypeVar("_ResultT_co", covariant=True)
+
+# (node name, "start" | "end", state going in or coming out)
+NodeHook = Callable[[str, str, Any], None]
+
+
+def _labels(values: dict[str, Any]) -> _Labels:
+    return tuple(sorted((key, str(value)) for key, value in values.items()))
+
+
+@dataclass
+class Histogram:
+    buckets: tuple[float, ...] = LATENCY_BUCKETS
+    counts: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    total: float = 0.0
+    count: int = 0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        cumulative = 0
+        buckets: dict[str, int] = {}
+        for bound, bucket_count in zip((*self.buckets, float("inf")), self.counts):
+            cumulative += bucket_count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {"count": self.count, "sum": round(self.total, 6), "buckets": buckets}
+
+
+class MetricsCollector:
+    """
+    Per-run counters, latency histograms, node timings and notable events.
+    Nodes and service clients report through `get_metrics()`.
+    """
+
+    def __init__(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.started_at = datetime.now(UTC)
+        self.counters: dict[tuple[str, _Labels], float] = defaultdict(float)
+        self.histograms: dict[tuple[str, _Labels], Histogram] = {}
+        self.gauges: dict[tuple[str, _Labels], float] = {}
+        self.node_seconds: dict[str, float] = defaultdict(float)
+        self.node_calls: dict[str, int] = defaultdict(int)
+        # First start and last finish per node (perf_counter), i.e. its wall-clock span
+        # when the node fans out into concurrent branches.
+        self.node_spans: dict[str, tuple[float, float]] = {}
+        self.events: list[dict[str, Any]] = []
+        self.node_hooks: list[NodeHook] = []
+
+    def increment(self, name: str, value: float = 1, **labels: Any) -> None:
+        self.counters[(name, _labels(labels))] += value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = (name, _labels(labels))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def gauge_max(self, name: str, value: float, **labels: Any) -> None:
+        """Keep the highest value seen this run, e.g. a peak queue depth."""
+        key = (name, _labels(labels))
+        self.gauges[key] = max(self.gauges.get(key, value), value)
+
+    def record_node(self, name: str, seconds: float, finished: float | None = None) -> None:
+        self.node_seconds[name] += seconds
+        self.node_calls[name] += 1
+        finished = time.perf_counter() if finished is None else finished
+        first, last = self.node_spans.get(name, (finished - seconds, finished))
+        self.node_spans[name] = (min(first, finished - seconds), max(last, finished))
+
+    def node_wall_seconds(self, name: str) -> float:
+        first, last = self.node_spans.get(name, (0.0, 0.0))
+        return last - first
+
+    def record_event(self, kind: str, **details: Any) -> None:
+        self.events.append({"kind": kind, **details})
+
+    def counter_total(self, name: str, **labels: Any) -> float:
+        wanted = set(_labels(labels))
+        return sum(
+            value
+            for (counter_name, counter_labels), value in self.counters.items()
+            if counter_name == name and wanted.issubset(counter_labels)
+        )
+
+    def cache_hit_rates(self) -> dict[str, float]:
+        caches = {
+            dict(labels).get("cache", "")
+            for name, labels in self.counters
+            if name in {"cache_hits_total", "cache_misses_total"}
+        }
+        rates: dict[str, float] = {}
+        for cache in sorted(caches):
+            hits = self.counter_total("cache_hits_total", cache=cache)
+            misses = self.counter_total("cache_misses_total", cache=cache)
+            if hits + misses:
+                rates[cache] = round(hits / (hits + misses), 4)
+        return rates
+
+    def http_hosts(self) -> dict[str, dict[str, Any]]:
+        hosts: dict[str, dict[str, Any]] = defaultdict(
+            lambda: {"requests": 0, "bytes": 0, "status": {}, "latency": None}
+        )
+        for (name, labels), value in self.counters.items():
+            label_map = dict(labels)
+            if name == "http_requests_total":
+                entry = hosts[label_map["host"]]
+                entry["requests"] += int(value)
+                status = label_map.get("status", "error")
+                entry["status"][status] = entry["status"].get(status, 0) + int(value)
+            elif name == "http_response_bytes_total":
+                hosts[label_map["host"]]["bytes"] += int(value)
+        for (name, labels), histogram in self.histograms.items():
+            if name == "http_request_seconds":
+                hosts[dict(labels)["host"]]["latency"] = histogram.as_dict()
+        return dict(hosts)
+
+    def as_report(self, summary: dict[str, Any] | None = None) -> dict[str, Any]:
+        finished_at = datetime.now(UTC)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": finished_at.isoformat(),
+            "duration_seconds": round((finished_at - self.started_at).total_seconds(), 4),
+            "summary": summary or {},
+            "nodes": {
+                name: {
+                    "seconds": round(seconds, 4),
+                    "wall_seconds": round(self.node_wall_seconds(name), 4),
+                    "calls": self.node_calls[name],
+                }
+                for name, seconds in self.node_seconds.items()
+            },
+            "http_hosts": self.http_hosts(),
+            "cache_hit_rates": self.cache_hit_rates(),
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ],
+            "gauges": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.gauges.items())
+            ],
+            "histograms": [
+                {"name": name, "labels": dict(labels), **histogram.as_dict()}
+                for (name, labels), histogram in sorted(
+                    self.histograms.items(),
+                    key=lambda item: item[0],
+                )
+            ],
+            "events": self.events,
+        }
+
+    def to_prometheus(self) -> str:
+        def render_labels(labels: _Labels, extra: tuple[tuple[str, str], ...] = ()) -> str:
+            pairs = (*labels, *extra)
+            if not pairs:
+                return ""
+            escaped = (f'{key}="{value.replace(chr(34), chr(39))}"' for key, value in pairs)
+            return "{" + ",".join(escaped) + "}"
+
+        lines: list[str] = []
+        typed: set[str] = set()
+
+        def declare(name: str, kind: str) -> None:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE ai_news_{name} {kind}")
+
+        for (name, labels), value in sorted(self.counters.items()):
+            declare(name, "counter")
+            lines.append(f"ai_news_{name}{render_labels(labels)} {value}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            declare(name, "gauge")
+            lines.append(f"ai_news_{name}{render_labels(labels)} {value}")
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+            declare(name, "histogram")
+            for bound, cumulative in histogram.as_dict()["buckets"].items():
+                lines.append(
+                    f"ai_news_{name}_bucket{render_labels(labels, (('le', bound),))} {cumulative}"
+                )
+            lines.append(f"ai_news_{name}_sum{render_labels(labels)} {histogram.total}")
+            lines.append(f"ai_news_{name}_count{render_labels(labels)} {histogram.count}")
+        for name, seconds in sorted(self.node_seconds.items()):
+            declare("node_seconds", "gauge")
+            lines.append(f'ai_news_node_seconds{{node="{name}"}} {seconds}')
+        return "\n".join(lines) + "\n"
+
+
+_current: ContextVar[MetricsCollector | None] = ContextVar("run_metrics", default=None)
+
+
+def get_metrics() -> MetricsCollector:
+    """Return the active run's collector, or a throwaway one outside a run."""
+    return _current.get() or MetricsCollector(run_id="unbound")
+
+
+@contextmanager
+def collect_metrics(run_id: str) -> Iterator[MetricsCollector]:
+    collector = MetricsCollector(run_id)
+    token = _current.set(collector)
+    try:
+        yield collector
+    finally:
+        _current.reset(token)
+
+
+class GraphNode(Protocol[_StateT_contra, _ResultT_co]):
+    """An async graph node; `state` is named as LangGraph's `add_node` expects."""
+
+    def __call__(self, state: _StateT_contra) -> Awaitable[_ResultT_co]: ...
+
+
+def timed_node(name: str, node: GraphNode[_StateT, _ResultT]) -> GraphNode[_StateT, _ResultT]:
+    # No functools.wraps: LangGraph would read the traced node's signature through
+    # __wrapped__ and start passing a `config` argument the wrapper does not take.
+    async def wrapper(state: _StateT) -> _ResultT:
+        metrics = get_metrics()
+        for hook in metrics.node_hooks:
+            hook(name, "start", state)
+        started = time.perf_counter()
+        try:
+            result = await node(state)
+        finally:
+            finished = time.perf_counter()
+            metrics.record_node(name, finished - started, finished)
+        for hook in metrics.node_hooks:
+            hook(name, "end", result)
+        return result
+
+    wrapper.__name__ = f"{name}_node"
+    return wrapper
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, host: str) -> None:
+        self._stream = stream
+        self._host = host
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            get_metrics().increment("http_response_bytes_total", len(chunk), host=self._host)
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class MetricsTransport(httpx.AsyncBaseTransport):
+    """Count requests, status codes, latency and body bytes per host."""
+
+    def __init__(self, wrapped: httpx.AsyncBaseTransport) -> None:
+        self.wrapped = wrapped
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host or "unknown"
+        metrics = get_metrics()
+        started = time.perf_counter()
+        try:
+            response = await self.wrapped.handle_async_request(request)
+        except Exception as exc:
+            metrics.increment("http_requests_total", host=host, status=type(exc).__name__)
+            raise
+
+        metrics.observe("http_request_seconds", time.perf_counter() - started, host=host)
+        metrics.increment("http_requests_total", host=host, status=response.status_code)
+        if isinstance(response.stream, httpx.ByteStream):
+            # Responses built from bytes (mock and replay transports) are read up front
+            # and never streamed; their Content-Length is set from the body.
+            size = int(response.headers.get("Content-Length", 0))
+            metrics.increment("http_response_bytes_total", size, host=host)
+        else:
+            assert isinstance(response.stream, httpx.AsyncByteStream)
+            response.stream = _CountingStream(response.stream, host)
+        return response
+
+    async def aclose(self) -> None:
+        await self.wrapped.aclose()
+
+
+def write_run_report(
+    collector: MetricsCollector,
+    reports_dir: str,
+    summary: dict[str, Any] | None = None,
+    prometheus_file: str | None = None,
+) -> Path:
+    directory = Path(reports_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    report_path = directory / f"{collector.run_id}.json"
+    report_path.write_text(
+        json.dumps(collector.as_report(summary), indent=2) + "\n",
+        encoding="utf-8",
+    )
+
+    if prometheus_file:
+        # Write-then-rename so a node_exporter textfile collector never reads a partial file.
+        target = Path(prometheus_file)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temporary = target.with_suffix(target.suffix + ".tmp")
+        temporary.write_text(collector.to_prometheus(), encoding="utf-8")
+        os.replace(temporary, target)
+
+    return report_path
@@ -1,25 +1,38 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 import re
+import time
+from collections import deque
+from dataclasses import dataclass
 from datetime import timezone
+from typing import Any
 
 import httpx
 
 from app.config import Settings
 from app.schemas.article import Article
+from app.services.deadline import MISSED, gather_within, record_degradation
+from app.services.http import http_client
+from app.services.llm_scheduler import RETRYABLE_STATUSES, LLMScheduler
+from app.services.metrics import get_metrics
+from app.services.text import (
+    budget_context,
+    complete_sentence_count,
+    estimate_tokens,
+    extractive_summary,
+    split_sentences,
+)
 
 logger = logging.getLogger(__name__)
 
-_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
-
-
-def split_sentences(text: str) -> list[str]:
-    cleaned = " ".join(text.strip().split())
-    if not cleaned:
-        return []
-    return [part.strip() for part in _SENTENCE_SPLIT.split(cleaned) if part.strip()]
+_MIN_LATENCY_SAMPLES = 10
+_MIN_HEDGE_DELAY_SECONDS = 0.05
+_MARKUP_PREFIXES = ("#", "```", "{", "<", "|", "- ", "* ")
+_NUMBERED_ITEM = re.compile(r"\d+[.)]\s")
+_MAX_SENTENCE_CHARS = 400
 
 
 def enforce_sentence_count(text: str, count: int = 3) -> str:
@@ -39,22 +52,131 @@ def enforce_sentence_count(text: str, count: int = 3) -> str:
     return " ".join(sentences[:count])
 
 
+def looks_malformed(text: str) -> bool:
+    """
+    Early signs a reply will not be three plain sentences: markup or a list at
+    the start, or a sentence already too long for a concise summary.
+    """
+    stripped = text.lstrip()
+    if stripped.startswith(_MARKUP_PREFIXES) or _NUMBERED_ITEM.match(stripped):
+        return True
+    sentences = split_sentences(stripped)
+    return bool(sentences) and len(sentences[-1]) > _MAX_SENTENCE_CHARS
+
+
+def _prompt_tokens(payload: dict[str, Any]) -> int:
+    return sum(estimate_tokens(message["content"]) for message in payload["messages"])
+
+
+def _estimate_tokens(payload: dict[str, Any]) -> int:
+    """Prompt plus the completion allowance."""
+    return _prompt_tokens(payload) + int(payload.get("max_tokens", 0))
+
+
+def _record_usage(usage: dict[str, Any]) -> None:
+    metrics = get_metrics()
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage.get(kind):
+            metrics.increment("llm_tokens_total", usage[kind], kind=kind.removesuffix("_tokens"))
+
+
+@dataclass(frozen=True)
+class LLMEndpoint:
+    base_url: str
+    api_key: str
+    model: str
+
+
+class LatencyWindow:
+    """The most recent successful request latencies of one endpoint."""
+
+    def __init__(self, size: int = 200) -> None:
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float | None:
+        if len(self.samples) < _MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+# Kept per process, so `serve` keeps learning across poll cycles.
+_latency_windows: dict[tuple[str, str], LatencyWindow] = {}
+
+
+def _latency_window(endpoint: LLMEndpoint) -> LatencyWindow:
+    key = (endpoint.base_url, endpoint.model)
+    window = _latency_windows.get(key)
+    if window is None:
+        window = _latency_windows[key] = LatencyWindow()
+    return window
+
+
+def hedge_delay(settings: Settings, endpoint: LLMEndpoint) -> float:
+    """
+    How long to wait for `endpoint` before hedging: its recent latency at
+    `LLM_HEDGE_PERCENTILE`, or `LLM_HEDGE_INITIAL_DELAY_SECONDS` until there
+    are enough samples.
+    """
+    observed = _latency_window(endpoint).percentile(settings.llm_hedge_percentile)
+    delay = settings.llm_hedge_initial_delay_seconds if observed is None else observed
+    return max(delay, _MIN_HEDGE_DELAY_SECONDS)
+
+
 class OpenRouterClient:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self.generated_ids: set[str] = set()
+        self.scheduler = LLMScheduler(settings)
 
-    async def summarize_articles(self, articles: list[Article], dry_run: bool) -> list[Article]:
-        semaphore = asyncio.Semaphore(min(self.settings.http_concurrency, 4))
-
-        async with httpx.AsyncClient(timeout=self.settings.request_timeout_seconds) as client:
+    async def summarize_articles(
+        self,
+        articles: list[Article],
+        dry_run: bool,
+        remote_ids: set[str] | None = None,
+    ) -> list[Article]:
+        """
+        Summarize `articles`; only those in `remote_ids` (all when None) go to the
+        LLM, the rest get the local extractive summary.
+        """
+        async with http_client(self.settings) as client:
             async def worker(article: Article) -> Article:
-                async with semaphore:
+                if remote_ids is not None and article.id not in remote_ids:
+                    updated = article.model_copy(deep=True)
+                    updated.summary = self._fallback_summary(article)
+                    return updated
+                async with self.scheduler.slot():
                     summary = await self.summarize_article(client, article, dry_run=dry_run)
                     updated = article.model_copy(deep=True)
                     updated.summary = summary
                     return updated
 
-            return await asyncio.gather(*(worker(article) for article in articles))
+            results = await gather_within("summarize", [worker(article) for article in articles])
+
+        summarized: list[Article] = []
+        missed = 0
+        for article, result in zip(articles, results):
+            if result is MISSED:
+                # Not added to generated_ids, so the ledger does not keep the fallback.
+                result = article.model_copy(deep=True)
+                result.summary = self._fallback_summary(article)
+                missed += 1
+            summarized.append(result)
+
+        record_degradation("summarize", missed, fallback="extractive_summary")
+        metrics = get_metrics()
+        for article in articles:
+            if article.id in self.generated_ids:
+                tier = "llm"
+            elif remote_ids is not None and article.id not in remote_ids:
+                tier = "local"
+            else:
+                tier = "fallback"
+            metrics.increment("summaries_total", tier=tier)
+        return summarized
 
     async def summarize_article(
         self,
@@ -65,9 +187,155 @@ class OpenRouterClient:
         if dry_run or not self.settings.openrouter_api_key:
             return self._fallback_summary(article)
 
-        prompt = self._build_prompt(article)
+        messages = [
+            {
+                "role": "system",
+                "content": (
+                    "You summarize AI news for a Telegram digest. "
+                    "Return exactly 3 concise sentences."
+                ),
+            },
+            {"role": "user", "content": self._build_prompt(article)},
+        ]
+
+        try:
+            summary = await self._race(client, messages)
+        except Exception as exc:  # noqa: BLE001 - any failure falls back to a local summary
+            logger.warning("OpenRouter call failed for %s: %s", article.id, exc)
+            return self._fallback_summary(article)
+        if summary is None:
+            logger.warning(
+                "OpenRouter gave no summary for %s within %ss",
+                article.id,
+                self.settings.llm_hard_timeout_seconds,
+            )
+            return self._fallback_summary(article)
+
+        self.generated_ids.add(article.id)
+        return summary
+
+    async def _race(
+        self,
+        client: httpx.AsyncClient,
+        messages: list[dict[str, str]],
+    ) -> str | None:
+        """
+        Run the primary request, hedge it to the second endpoint once it is slower
+        than the usual tail (or fails), and return the first valid summary. None
+        once the hard limit passes without one.
+        """
+        metrics = get_metrics()
+        loop = asyncio.get_running_loop()
+        primary = self._endpoint()
+        hard_limit_at = loop.time() + self.settings.llm_hard_timeout_seconds
+        hedge_at: float | None = None
+        admitted = asyncio.Event()
+        # The hedge timer starts once the primary is admitted: time queued on the
+        # rate budgets says nothing about how slowly the endpoint is generating.
+        admission = (
+            asyncio.ensure_future(admitted.wait()) if self.settings.llm_hedging_enabled else None
+        )
+
+        lanes = {
+            asyncio.ensure_future(self._generate(client, primary, messages, admitted)): "primary"
+        }
+        failure: BaseException | None = None
+        try:
+            while True:
+                wake_at = hard_limit_at if hedge_at is None else min(hedge_at, hard_limit_at)
+                done, _ = await asyncio.wait(
+                    {*lanes, admission} if admission is not None else lanes,
+                    timeout=max(wake_at - loop.time(), 0.0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if admission is not None and admission in done:
+                    admission = None
+                    hedge_at = loop.time() + hedge_delay(self.settings, primary)
+                for task in [lane_task for lane_task in lanes if lane_task in done]:
+                    lane = lanes.pop(task)
+                    if task.exception() is None:
+                        metrics.increment("llm_race_wins_total", lane=lane)
+                        return task.result()
+                    failure = task.exception()
+
+                if loop.time() >= hard_limit_at:
+                    metrics.increment("llm_hard_timeouts_total")
+                    return None
+                if hedge_at is not None and (loop.time() >= hedge_at or not lanes):
+                    hedge = self._endpoint(hedge=True)
+                    paused = self.scheduler.paused_for(hedge.base_url)
+                    if paused and lanes:
+                        # The primary is waiting out a rate limit, not generating slowly;
+                        # a hedge to the same provider would only add to the overload.
+                        hedge_at = loop.time() + paused + hedge_delay(self.settings, primary)
+                        continue
+                    metrics.increment("llm_hedges_total")
+                    lanes[asyncio.ensure_future(self._generate(client, hedge, messages))] = "hedge"
+                    hedge_at = None
+                elif not lanes:
+                    assert failure is not None
+                    raise failure
+        finally:
+            pending: list[asyncio.Future[Any]] = [*lanes]
+            if admission is not None:
+                pending.append(admission)
+            for future in pending:
+                future.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _generate(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: LLMEndpoint,
+        messages: list[dict[str, str]],
+        admitted: asyncio.Event | None = None,
+    ) -> str:
+        payload: dict[str, object] = {
+            "model": endpoint.model,
+            "messages": messages,
+            "temperature": 0.2,
+            "max_tokens": 220,
+        }
+        first_pass = await self._request_summary(client, endpoint, payload, admitted)
+        if len(split_sentences(first_pass)) >= 3:
+            return enforce_sentence_count(first_pass, count=3)
+
+        # Retry once with an explicit output reminder if the first response is malformed.
+        retry_payload = dict(payload)
+        retry_payload["messages"] = [
+            *messages,
+            {
+                "role": "user",
+                "content": "Rewrite your answer as exactly 3 sentences.",
+            },
+        ]
+        second_pass = await self._request_summary(client, endpoint, retry_payload)
+        return enforce_sentence_count(second_pass, count=3)
+
+    def _endpoint(self, hedge: bool = False) -> LLMEndpoint:
+        settings = self.settings
+        if not hedge:
+            return LLMEndpoint(
+                settings.openrouter_base_url,
+                settings.openrouter_api_key or "",
+                settings.openrouter_model,
+            )
+        return LLMEndpoint(
+            settings.openrouter_hedge_base_url or settings.openrouter_base_url,
+            settings.openrouter_hedge_api_key or settings.openrouter_api_key or "",
+            settings.openrouter_hedge_model or settings.openrouter_model,
+        )
+
+    async def _request_summary(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: LLMEndpoint,
+        payload: dict[str, object],
+        admitted: asyncio.Event | None = None,
+    ) -> str:
+        """Send one summary request once the scheduler admits it; `admitted` is set then."""
         headers = {
-            "Authorization": f"Bearer {self.settings.openrouter_api_key}",
+            "Authorization": f"Bearer {endpoint.api_key}",
             "Content-Type": "application/json",
         }
         if self.settings.openrouter_site_url:
@@ -75,55 +343,120 @@ class OpenRouterClient:
         if self.settings.openrouter_app_name:
             headers["X-Title"] = self.settings.openrouter_app_name
 
-        payload = {
-            "model": self.settings.openrouter_model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": (
-                        "You summarize AI news for a Telegram digest. "
-                        "Return exactly 3 concise sentences."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": 0.2,
-            "max_tokens": 220,
-        }
-
-        try:
-            first_pass = await self._request_summary(client, headers, payload)
-            if len(split_sentences(first_pass)) >= 3:
-                return enforce_sentence_count(first_pass, count=3)
-
-            # Retry once with an explicit output reminder if the first response is malformed.
-            retry_payload = dict(payload)
-            retry_payload["messages"] = [
-                *payload["messages"],
-                {
-                    "role": "user",
-                    "content": "Rewrite your answer as exactly 3 sentences.",
-                },
-            ]
-            second_pass = await self._request_summary(client, headers, retry_payload)
-            return enforce_sentence_count(second_pass, count=3)
-        except Exception as exc:
-            logger.warning("OpenRouter call failed for %s: %s", article.id, exc)
-            return self._fallback_summary(article)
+        estimated_tokens = _estimate_tokens(payload)
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.scheduler.admit(endpoint.base_url, estimated_tokens)
+            if admitted is not None:
+                admitted.set()
+            try:
+                if self.settings.llm_streaming:
+                    return await self._stream_summary(client, endpoint, headers, payload)
+                return await self._post_summary(client, endpoint, headers, payload)
+            except (httpx.HTTPStatusError, httpx.TransportError) as exc:
+                response = exc.response if isinstance(exc, httpx.HTTPStatusError) else None
+                retryable = response is None or response.status_code in RETRYABLE_STATUSES
+                if not retryable or attempt > self.settings.llm_max_retries:
+                    raise
+                delay = self.scheduler.backoff(endpoint.base_url, attempt, response)
+                reason = str(response.status_code) if response is not None else type(exc).__name__
+                get_metrics().increment("llm_retries_total", reason=reason)
+                logger.debug("LLM request failed (%s), retrying in %.1fs", reason, delay)
+                await asyncio.sleep(delay)
 
-    async def _request_summary(
+    async def _post_summary(
         self,
         client: httpx.AsyncClient,
+        endpoint: LLMEndpoint,
         headers: dict[str, str],
         payload: dict[str, object],
     ) -> str:
+        metrics = get_metrics()
+        started = time.perf_counter()
         response = await client.post(
-            f"{self.settings.openrouter_base_url}/chat/completions",
+            f"{endpoint.base_url}/chat/completions",
             headers=headers,
             json=payload,
         )
+        elapsed = time.perf_counter() - started
+        metrics.observe("llm_request_seconds", elapsed)
+        metrics.increment("llm_requests_total", status=response.status_code)
         response.raise_for_status()
-        return str(response.json()["choices"][0]["message"]["content"])
+        _latency_window(endpoint).add(elapsed)
+
+        data = response.json()
+        _record_usage(data.get("usage") or {})
+        return str(data["choices"][0]["message"]["content"])
+
+    async def _stream_summary(
+        self,
+        client: httpx.AsyncClient,
+        endpoint: LLMEndpoint,
+        headers: dict[str, str],
+        payload: dict[str, object],
+    ) -> str:
+        """
+        Read the completion as server-sent events and hang up once three sentences
+        are complete or the text is clearly not going to be three plain sentences.
+        Closing the stream stops generation, so the rest is never billed.
+        """
+        metrics = get_metrics()
+        started = time.perf_counter()
+        text = ""
+        chunks = 0
+        usage: dict[str, Any] = {}
+        cutoff: str | None = None
+
+        async with client.stream(
+            "POST",
+            f"{endpoint.base_url}/chat/completions",
+            headers=headers,
+            json={**payload, "stream": True, "stream_options": {"include_usage": True}},
+        ) as response:
+            metrics.increment("llm_requests_total", status=response.status_code)
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                # Other lines are blank separators or keep-alive comments (": PROCESSING").
+                if not line.startswith("data:"):
+                    continue
+                data = line.removeprefix("data:").strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if "error" in event:
+                    raise RuntimeError(f"Stream error: {event['error']}")
+                usage = event.get("usage") or usage
+                for choice in event.get("choices") or []:
+                    delta = (choice.get("delta") or {}).get("content") or ""
+                    if delta and not text:
+                        metrics.observe("llm_first_token_seconds", time.perf_counter() - started)
+                    text += delta
+                    chunks += bool(delta)
+
+                if complete_sentence_count(text) >= 3:
+                    cutoff = "complete"
+                elif looks_malformed(text):
+                    cutoff = "malformed"
+                if cutoff is not None:
+                    metrics.increment("llm_stream_cutoffs_total", reason=cutoff)
+                    break
+
+        elapsed = time.perf_counter() - started
+        metrics.observe("llm_request_seconds", elapsed)
+        if cutoff != "malformed":
+            # A stream cut early for bad output is not a completed reply, and counting
+            # it would pull the hedge delay down.
+            _latency_window(endpoint).add(elapsed)
+        if not usage:
+            # Cut-off streams never get the final usage event; providers send roughly
+            # one token per content chunk.
+            usage = {"prompt_tokens": _prompt_tokens(payload), "completion_tokens": chunks}
+        _record_usage(usage)
+        return text
 
     def _build_prompt(self, article: Article) -> str:
         published = (
@@ -131,7 +464,11 @@ class OpenRouterClient:
             if article.published_at is not None
             else "unknown"
         )
-        context = article.effective_summary_source
+        source = article.effective_summary_source
+        context = budget_context(source, article.effective_title, self.settings.llm_context_max_tokens)
+        metrics = get_metrics()
+        metrics.increment("llm_context_tokens_total", estimate_tokens(source), stage="source")
+        metrics.increment("llm_context_tokens_total", estimate_tokens(context), stage="prompt")
         return (
             f"Title: {article.effective_title}\n"
             f"Source: {article.source_name}\n"
@@ -142,15 +479,11 @@ class OpenRouterClient:
         )
 
     def _fallback_summary(self, article: Article) -> str:
-        context = article.effective_summary_source.strip()
-        title_sentence = f"{article.effective_title} is a notable AI update from {article.source_name}."
-        context_sentence = (
-            f"Key context: {context[:180].rstrip('.')}."
-            if context
-            else "The story appears relevant to current AI research and product developments."
-        )
-        action_sentence = "Open the link to review full details, claims, and technical context."
-        return enforce_sentence_count(
-            f"{title_sentence} {context_sentence} {action_sentence}",
-            count=3,
-        )
+        """Local extractive summary: the most central sentences of the description."""
+        sentences = extractive_summary(article.effective_summary_source, count=3)
+        if len(sentences) < 3:
+            sentences.insert(
+                0,
+                f"{article.effective_title} is a notable AI update from {article.source_name}.",
+            )
+        return enforce_sentence_count(" ".join(sentences), count=3)
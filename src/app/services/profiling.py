@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import json
+import logging
+import pstats
+import time
+import tracemalloc
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.services.metrics import MetricsCollector
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cpu", "mem", "asyncio")
+
+_SLOW_CALLBACK_SECONDS = 0.1
+_STALL_PROBE_SECONDS = 0.05
+
+
+def profile_dir(reports_dir: str, run_id: str) -> Path:
+    return Path(reports_dir) / f"{run_id}-profile"
+
+
+def _write_json(path: Path, payload: Any) -> None:
+    path.write_text(json.dumps(payload, indent=2, default=str) + "\n", encoding="utf-8")
+
+
+def _node_function_rows(stats: pstats.Stats) -> dict[str, dict[str, float]]:
+    """Self and cumulative CPU time of every `*_node` function under app/nodes."""
+    rows: dict[str, dict[str, float]] = {}
+    for (filename, _line, function), (_cc, calls, tottime, cumtime, _callers) in (
+        stats.stats.items()  # type: ignore[attr-defined]
+    ):
+        if "app/nodes/" not in filename.replace("\\", "/") or not function.endswith("_node"):
+            continue
+        rows[function.removesuffix("_node")] = {
+            "cpu_seconds": round(cumtime, 4),
+            "self_seconds": round(tottime, 4),
+            "resumes": calls,
+        }
+    return rows
+
+
+class CpuProfiler:
+    """cProfile over the whole run plus a per-node CPU vs. wall breakdown."""
+
+    def __init__(self, output_dir: Path, metrics: MetricsCollector) -> None:
+        self.output_dir = output_dir
+        self.metrics = metrics
+        self.profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        self.profiler.enable()
+
+    def stop(self) -> None:
+        self.profiler.disable()
+        self.profiler.dump_stats(self.output_dir / "cpu.prof")
+
+        text = io.StringIO()
+        stats = pstats.Stats(self.profiler, stream=text)
+        stats.sort_stats("cumulative").print_stats(40)
+        (self.output_dir / "cpu.txt").write_text(text.getvalue(), encoding="utf-8")
+
+        # A coroutine's cumulative time only covers the stretches it was running,
+        # so wall minus CPU is roughly the time a node spent awaiting I/O.
+        nodes = _node_function_rows(stats)
+        for name, seconds in self.metrics.node_seconds.items():
+            row = nodes.setdefault(name, {"cpu_seconds": 0.0, "self_seconds": 0.0, "resumes": 0})
+            row["wall_seconds"] = round(seconds, 4)
+            row["waiting_seconds"] = round(max(seconds - row["cpu_seconds"], 0.0), 4)
+        _write_json(self.output_dir / "cpu-nodes.json", nodes)
+
+
+def _state_lists(state: Any) -> dict[str, dict[str, int]]:
+    if not isinstance(state, dict):
+        return {}
+    return {
+        key: {"items": len(value), "bytes": len(json.dumps(value, default=str))}
+        for key, value in state.items()
+        if isinstance(value, list)
+    }
+
+
+class MemoryProfiler:
+    """
+    tracemalloc snapshots at node boundaries, plus the size of every AgentState list.
+    Concurrent runs of one node (the per-source branches) are reported as a single
+    entry, from the first one starting to the last one finishing.
+    """
+
+    def __init__(self, output_dir: Path, metrics: MetricsCollector, top: int = 15) -> None:
+        self.output_dir = output_dir
+        self.metrics = metrics
+        self.top = top
+        self.nodes: list[dict[str, Any]] = []
+        self._before: dict[str, tuple[tracemalloc.Snapshot, dict[str, dict[str, int]]]] = {}
+        # Runs of each node currently in flight, and how many started since the first.
+        self._running: dict[str, int] = {}
+        self._calls: dict[str, int] = {}
+
+    def start(self) -> None:
+        tracemalloc.start(25)
+        self.metrics.node_hooks.append(self.on_node)
+
+    def on_node(self, name: str, phase: str, state: Any) -> None:
+        if phase == "start":
+            running = self._running.get(name, 0)
+            self._running[name] = running + 1
+            self._calls[name] = self._calls.get(name, 0) + 1 if running else 1
+            if not running:
+                self._before[name] = (self._snapshot(), _state_lists(state))
+            return
+
+        self._running[name] = max(self._running.get(name, 1) - 1, 0)
+        if self._running[name]:
+            return
+
+        snapshot = self._snapshot()
+        lists = _state_lists(state)
+        before, before_lists = self._before.pop(name, (snapshot, {}))
+        current, peak = tracemalloc.get_traced_memory()
+        self.nodes.append(
+            {
+                "node": name,
+                "calls": self._calls.pop(name, 1),
+                "traced_bytes": current,
+                "peak_bytes": peak,
+                "top_allocations": [
+                    {
+                        "location": str(stat.traceback[0]),
+                        "size_diff_bytes": stat.size_diff,
+                        "count_diff": stat.count_diff,
+                    }
+                    for stat in snapshot.compare_to(before, "lineno")[: self.top]
+                ],
+                "state_lists": {
+                    key: {
+                        **sizes,
+                        "items_delta": sizes["items"] - before_lists.get(key, {}).get("items", 0),
+                        "bytes_delta": sizes["bytes"] - before_lists.get(key, {}).get("bytes", 0),
+                    }
+                    for key, sizes in lists.items()
+                },
+            }
+        )
+        tracemalloc.reset_peak()
+
+    @staticmethod
+    def _snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+
+    def stop(self) -> None:
+        self.metrics.node_hooks.remove(self.on_node)
+        tracemalloc.stop()
+        _write_json(self.output_dir / "mem.json", self.nodes)
+
+
+class _SlowCallbackHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__(level=logging.WARNING)
+        self.records: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        message = record.getMessage()
+        if message.startswith("Executing "):
+            self.records.append(message)
+
+
+class AsyncioProfiler:
+    """Slow callbacks from asyncio debug mode and event-loop stalls seen by a probe task."""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        metrics: MetricsCollector,
+        slow_callback_seconds: float = _SLOW_CALLBACK_SECONDS,
+    ) -> None:
+        self.output_dir = output_dir
+        self.metrics = metrics
+        self.slow_callback_seconds = slow_callback_seconds
+        self.stalls: list[dict[str, Any]] = []
+        self.active_nodes: list[str] = []
+        self._handler = _SlowCallbackHandler()
+        self._probe: asyncio.Task[None] | None = None
+        self._restore: tuple[bool, float] | None = None
+        self._expected = 0.0
+
+    def on_node(self, name: str, phase: str, state: Any) -> None:
+        # Node boundaries run on the loop too; check here so a stall is attributed to
+        # the node that caused it rather than whichever runs when the probe wakes.
+        self._check_lag()
+        if phase == "start":
+            self.active_nodes.append(name)
+        elif name in self.active_nodes:
+            self.active_nodes.remove(name)
+
+    def _check_lag(self) -> None:
+        lag = time.perf_counter() - self._expected
+        if lag >= self.slow_callback_seconds:
+            self.stalls.append({"lag_seconds": round(lag, 4), "nodes": list(self.active_nodes)})
+            self._expected = time.perf_counter() + _STALL_PROBE_SECONDS
+
+    async def _watch(self) -> None:
+        # The deadline is armed in start(), so a stall before the probe first runs still counts.
+        while True:
+            await asyncio.sleep(max(self._expected - time.perf_counter(), 0.0))
+            self._check_lag()
+            self._expected = time.perf_counter() + _STALL_PROBE_SECONDS
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._restore = (loop.get_debug(), loop.slow_callback_duration)
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback_seconds
+        logging.getLogger("asyncio").addHandler(self._handler)
+        self.metrics.node_hooks.append(self.on_node)
+        self._expected = time.perf_counter() + _STALL_PROBE_SECONDS
+        self._probe = loop.create_task(self._watch())
+
+    async def astop(self) -> None:
+        if self._probe is not None:
+            self._check_lag()
+            self._probe.cancel()
+            try:
+                await self._probe
+            except asyncio.CancelledError:
+                pass
+        self.metrics.node_hooks.remove(self.on_node)
+        logging.getLogger("asyncio").removeHandler(self._handler)
+        if self._restore is not None:
+            loop = asyncio.get_running_loop()
+            loop.set_debug(self._restore[0])
+            loop.slow_callback_duration = self._restore[1]
+
+        _write_json(
+            self.output_dir / "asyncio.json",
+            {
+                "slow_callback_threshold_seconds": self.slow_callback_seconds,
+                "slow_callbacks": self._handler.records,
+                "stalls": self.stalls,
+                "max_stall_seconds": max(
+                    (stall["lag_seconds"] for stall in self.stalls),
+                    default=0.0,
+                ),
+            },
+        )
+
+
+@asynccontextmanager
+async def profile_run(
+    mode: str | None,
+    metrics: MetricsCollector,
+    reports_dir: str,
+) -> AsyncIterator[Path | None]:
+    """Profile the enclosed run in `mode`; yields the output directory (None when off)."""
+    if mode is None:
+        yield None
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+
+    output_dir = profile_dir(reports_dir, metrics.run_id)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if mode == "asyncio":
+        asyncio_profiler = AsyncioProfiler(output_dir, metrics)
+        asyncio_profiler.start()
+        try:
+            yield output_dir
+        finally:
+            await asyncio_profiler.astop()
+        return
+
+    profiler: CpuProfiler | MemoryProfiler = (
+        CpuProfiler(output_dir, metrics) if mode == "cpu" else MemoryProfiler(output_dir, metrics)
+    )
+    profiler.start()
+    try:
+        yield output_dir
+    finally:
+        profiler.stop()
+        logger.info("%s profile written to %s", mode, output_dir)
@@ -3,39 +3,29 @@ from __future__ import annotations
 import asyncio
 import hashlib
 import logging
-from datetime import datetime, timezone
+import time
+from datetime import UTC, datetime
 from email.utils import parsedate_to_datetime
 from typing import Any
-from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 import feedparser
 import httpx
 import yaml
+from lxml import etree
 
 from app.config import Settings
 from app.schemas.article import Article, FetchRules, SourceConfig, SourcesFile
+from app.services.feed_parser import FeedItemParser
+from app.services.http import CappedBody, http_client, request_slots
+from app.services.metrics import get_metrics
+from app.services.text import clean_text
+from app.services.urls import normalize_url, set_url_rules, url_key
 
 logger = logging.getLogger(__name__)
 
-_TRACKING_PARAMS = {
-    "utm_source",
-    "utm_medium",
-    "utm_campaign",
-    "utm_term",
-    "utm_content",
-    "utm_id",
-    "gclid",
-    "fbclid",
-    "mc_cid",
-    "mc_eid",
-}
-
-
-def normalize_url(url: str) -> str:
-    parsed = urlparse(url.strip())
-    cleaned_query = [(k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if k not in _TRACKING_PARAMS]
-    normalized = parsed._replace(fragment="", query=urlencode(cleaned_query, doseq=True))
-    return urlunparse(normalized)
+# Consecutive entries at or before the watermark before the rest of the feed is skipped;
+# more than one, so a single out-of-order entry does not end the read.
+_STALE_ENTRIES_BEFORE_STOP = 3
 
 
 def parse_entry_datetime(entry: dict[str, Any]) -> datetime | None:
@@ -49,7 +39,7 @@ def parse_entry_datetime(entry: dict[str, Any]) -> datetime | None:
                 parsed_struct.tm_hour,
                 parsed_struct.tm_min,
                 parsed_struct.tm_sec,
-                tzinfo=timezone.utc,
+                tzinfo=UTC,
             )
         except Exception:
             pass
@@ -59,9 +49,13 @@ def parse_entry_datetime(entry: dict[str, Any]) -> datetime | None:
         return None
     try:
         parsed = parsedate_to_datetime(str(date_text))
-        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
     except Exception:
-        return None
+        # Atom and dc:date use ISO 8601.
+        try:
+            parsed = datetime.fromisoformat(str(date_text).strip())
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
 
 
 def extract_entry_image(entry: dict[str, Any]) -> str | None:
@@ -101,14 +95,14 @@ def build_article_id(source_name: str, url: str, title: str) -> str:
 def dedupe_articles(articles: list[Article]) -> list[Article]:
     deduped: dict[str, Article] = {}
     for article in articles:
-        key = normalize_url(article.url)
+        key = url_key(article.url)
         existing = deduped.get(key)
         if existing is None:
             deduped[key] = article
             continue
 
-        existing_published = existing.published_at or datetime.min.replace(tzinfo=timezone.utc)
-        incoming_published = article.published_at or datetime.min.replace(tzinfo=timezone.utc)
+        existing_published = existing.published_at or datetime.min.replace(tzinfo=UTC)
+        incoming_published = article.published_at or datetime.min.replace(tzinfo=UTC)
         if incoming_published > existing_published:
             article.duplicate_count = existing.duplicate_count + 1
             deduped[key] = article
@@ -121,31 +115,105 @@ def dedupe_articles(articles: list[Article]) -> list[Article]:
 class RSSClient:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
+        self.fetch_seconds: dict[str, float] = {}
+        self.fetch_bytes: dict[str, int] = {}
 
     def load_sources(self) -> tuple[FetchRules, list[SourceConfig]]:
         with open(self.settings.sources_file, "r", encoding="utf-8") as source_file:
             data = yaml.safe_load(source_file) or {}
         parsed = SourcesFile.model_validate(data)
+        set_url_rules(parsed.url_rules)
         return parsed.fetch_defaults, parsed.sources
 
-    async def fetch_source(self, client: httpx.AsyncClient, source: SourceConfig) -> list[Article]:
+    async def _read_entries(
+        self,
+        body: CappedBody,
+        source: SourceConfig,
+        since: datetime | None,
+    ) -> list[dict[str, Any]]:
+        """
+        Parse the feed while it downloads and hang up once MAX_FEED_ITEMS_PER_SOURCE
+        entries are in, or once entries run past `since` (feeds list newest first).
+        Reading stops at the byte cap, keeping the entries completed by then.
+        Feeds lxml cannot parse go to feedparser, which is slower but lenient.
+        """
+        limit = self.settings.max_feed_items_per_source
+        metrics = get_metrics()
+        parser = FeedItemParser()
+        chunks = body.chunks()
+        received = bytearray()
+        entries: list[dict[str, Any]] = []
+        stale = 0
+        try:
+            async for chunk in chunks:
+                received += chunk
+                for entry in parser.feed(chunk):
+                    entries.append(entry)
+                    published_at = parse_entry_datetime(entry)
+                    if since is not None and published_at is not None:
+                        stale = stale + 1 if published_at <= since else 0
+                    reason = (
+                        "limit"
+                        if len(entries) >= limit
+                        else "window"
+                        if stale >= _STALE_ENTRIES_BEFORE_STOP
+                        else None
+                    )
+                    if reason is not None:
+                        metrics.increment("feed_early_stops_total", reason=reason)
+                        metrics.increment("feed_parses_total", parser="stream")
+                        return entries
+            if not body.truncated:
+                entries.extend(parser.close())
+        except etree.XMLSyntaxError as exc:
+            logger.debug("Streaming parse failed for %s: %s", source.name, exc)
+            entries = []
+
+        if entries:
+            metrics.increment("feed_parses_total", parser="stream")
+            return entries[:limit]
+
+        async for chunk in chunks:
+            received += chunk
+        metrics.increment("feed_parses_total", parser="feedparser")
+        parsed = feedparser.parse(bytes(received))
+        return [dict(entry) for entry in parsed.entries[:limit]]
+
+    async def fetch_source(
+        self,
+        client: httpx.AsyncClient,
+        source: SourceConfig,
+        since: datetime | None = None,
+        rules: FetchRules | None = None,
+        timeout: float | None = None,
+    ) -> list[Article]:
         headers = {"User-Agent": self.settings.user_agent}
-        response = await client.get(source.rss, headers=headers)
-        response.raise_for_status()
-
-        parsed = feedparser.parse(response.text)
-        entries = parsed.entries[: self.settings.max_feed_items_per_source]
+        async with client.stream(
+            "GET",
+            source.rss,
+            headers=headers,
+            follow_redirects=True,
+            timeout=httpx.Timeout(timeout) if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        ) as response:
+            response.raise_for_status()
+            body = CappedBody(response, (rules or FetchRules()).max_feed_bytes, "feed")
+            try:
+                entries = await self._read_entries(body, source, since)
+            finally:
+                self.fetch_bytes[source.name] = body.read
 
         articles: list[Article] = []
-        for raw_entry in entries:
-            entry = dict(raw_entry)
+        for entry in entries:
             raw_url = str(entry.get("link") or "").strip()
             if not raw_url:
                 continue
 
             url = normalize_url(raw_url)
             title = str(entry.get("title") or "Untitled Article").strip()
-            description = str(entry.get("summary") or entry.get("description") or "").strip() or None
+            description = clean_text(
+                str(entry.get("summary") or entry.get("description") or ""),
+                self.settings.description_max_chars,
+            )
             published_at = parse_entry_datetime(entry)
             rss_image_url = extract_entry_image(entry)
 
@@ -164,18 +232,47 @@ class RSSClient:
 
         return articles
 
-    async def fetch_all(self, sources: list[SourceConfig]) -> tuple[list[Article], list[str]]:
-        timeout = httpx.Timeout(self.settings.request_timeout_seconds)
-        semaphore = asyncio.Semaphore(self.settings.http_concurrency)
-
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
+    async def fetch_all(
+        self,
+        sources: list[SourceConfig],
+        watermarks: dict[str, str] | None = None,
+        fetch_defaults: FetchRules | None = None,
+        timeouts: dict[str, float] | None = None,
+    ) -> tuple[list[Article], list[str]]:
+        semaphore = request_slots(self.settings)
+        since: dict[str, datetime] = {}
+        for name, value in (watermarks or {}).items():
+            mark = datetime.fromisoformat(value)
+            since[name] = mark if mark.tzinfo else mark.replace(tzinfo=UTC)
+
+        async with http_client(self.settings) as client:
             async def worker(source: SourceConfig) -> tuple[list[Article], str | None]:
+                timeout = (timeouts or {}).get(source.name)
                 try:
                     async with semaphore:
-                        source_articles = await self.fetch_source(client, source)
+                        started = time.perf_counter()
+                        source_articles = await self.fetch_source(
+                            client,
+                            source,
+                            since.get(source.name),
+                            source.merged_rules(fetch_defaults or FetchRules()),
+                            timeout,
+                        )
+                        self.fetch_seconds[source.name] = time.perf_counter() - started
                     logger.info("Fetched %s items from %s", len(source_articles), source.name)
                     return source_articles, None
-                except Exception as exc:
+                except Exception as exc:  # noqa: BLE001 - one bad source must not stop the run
+                    # A feed timeout is a censored sample: the feed needs at least the timeout
+                    # it was given, so a feed that always times out still earns a longer one.
+                    # Refused connections, error statuses and pool waits say nothing about
+                    # how long the feed takes to serve.
+                    if isinstance(exc, httpx.TimeoutException) and not isinstance(
+                        exc, httpx.PoolTimeout
+                    ):
+                        self.fetch_seconds[source.name] = (
+                            timeout or self.settings.request_timeout_seconds
+                        )
+                    get_metrics().increment("source_fetch_failures_total", source=source.name)
                     error = f"Source fetch failed ({source.name}): {exc}"
                     logger.warning(error)
                     return [], error
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import re
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import UTC, datetime
 from difflib import SequenceMatcher
 
 from app.schemas.article import Article
@@ -54,6 +54,8 @@ _STOPWORDS = {
 
 _WORD_RE = re.compile(r"[a-z0-9]+")
 
+_REPEAT_STORY_FACTOR = 0.5
+
 _PRODUCT_LAUNCH_KEYWORDS = {
     "launch",
     "launches",
@@ -229,7 +231,8 @@ def _normalize_text(value: str) -> str:
     return " ".join(_WORD_RE.findall(value.lower()))
 
 
-def _tokenize(value: str) -> set[str]:
+def tokenize(value: str) -> set[str]:
+    """Lowercased title/content words without stopwords."""
     return {token for token in _WORD_RE.findall(value.lower()) if token not in _STOPWORDS}
 
 
@@ -253,7 +256,7 @@ def _relevance_score(article: Article) -> float:
     if not normalized_content:
         return 0.2
 
-    tokens = _tokenize(normalized_content)
+    tokens = tokenize(normalized_content)
     score = 0.15
 
     product_hits = len(tokens & _PRODUCT_LAUNCH_KEYWORDS)
@@ -285,11 +288,11 @@ def _relevance_score(article: Article) -> float:
     return max(0.0, min(score, 1.0))
 
 
-def _recency_score(published_at: datetime | None) -> float:
+def _recency_score(published_at: datetime | None, now: datetime | None = None) -> float:
     if published_at is None:
         return 0.3
 
-    now = datetime.now(timezone.utc)
+    now = now or datetime.now(UTC)
     hours_old = max((now - published_at).total_seconds() / 3600.0, 0.0)
     if hours_old <= 6:
         return 1.0
@@ -315,8 +318,8 @@ def _title_similarity(left: str, right: str) -> float:
     if not left_norm or not right_norm:
         return 0.0
 
-    left_tokens = _tokenize(left_norm)
-    right_tokens = _tokenize(right_norm)
+    left_tokens = tokenize(left_norm)
+    right_tokens = tokenize(right_norm)
     union = left_tokens | right_tokens
     if not union:
         return 0.0
@@ -334,33 +337,48 @@ def _is_time_aligned(left: datetime | None, right: datetime | None, max_hours: i
     return delta <= max_hours
 
 
-def _same_story(left: Article, right: Article) -> bool:
-    left_tokens = _tokenize(left.effective_title)
-    right_tokens = _tokenize(right.effective_title)
+def same_story_titles(
+    left_title: str,
+    left_published_at: datetime | None,
+    right_title: str,
+    right_published_at: datetime | None,
+) -> bool:
+    """Whether two titles cover the same story, by shared words, similarity and timing."""
+    left_tokens = tokenize(left_title)
+    right_tokens = tokenize(right_title)
     overlap_count = len(left_tokens & right_tokens)
     if overlap_count < 2:
         return False
 
     min_token_count = max(min(len(left_tokens), len(right_tokens)), 1)
     overlap_ratio = overlap_count / min_token_count
-    title_similarity = _title_similarity(left.effective_title, right.effective_title)
+    title_similarity = _title_similarity(left_title, right_title)
     if title_similarity >= 0.78 and overlap_ratio >= 0.5:
         return True
 
     if (
         title_similarity >= 0.62
         and overlap_ratio >= 0.7
-        and _is_time_aligned(left.published_at, right.published_at)
+        and _is_time_aligned(left_published_at, right_published_at)
     ):
         return True
 
     return False
 
 
+def _same_story(left: Article, right: Article) -> bool:
+    return same_story_titles(
+        left.effective_title,
+        left.published_at,
+        right.effective_title,
+        right.published_at,
+    )
+
+
 def cluster_articles(articles: list[Article]) -> list[StoryCluster]:
     ordered = sorted(
         articles,
-        key=lambda item: item.published_at or datetime.min.replace(tzinfo=timezone.utc),
+        key=lambda item: item.published_at or datetime.min.replace(tzinfo=UTC),
         reverse=True,
     )
 
@@ -381,9 +399,9 @@ def cluster_articles(articles: list[Article]) -> list[StoryCluster]:
     return clusters
 
 
-def score_article(article: Article, cluster_size: int = 1) -> float:
+def score_article(article: Article, cluster_size: int = 1, now: datetime | None = None) -> float:
     relevance = _relevance_score(article)
-    recency = _recency_score(article.published_at)
+    recency = _recency_score(article.published_at, now=now)
     source_weight = _source_weight(article.source_name)
     duplication_signal = min(article.duplicate_count / 5.0, 1.0)
     cluster_signal = min(max(cluster_size, 1) / 5.0, 1.0)
@@ -397,10 +415,16 @@ def score_article(article: Article, cluster_size: int = 1) -> float:
         + 0.09 * cluster_signal
         + 0.05 * novelty
     )
+    if article.repeat_of is not None:
+        score *= _REPEAT_STORY_FACTOR
     return round(score, 5)
 
 
-def rank_articles(articles: list[Article], limit: int) -> list[Article]:
+def rank_articles(
+    articles: list[Article],
+    limit: int,
+    now: datetime | None = None,
+) -> list[Article]:
     candidates = [article.model_copy(deep=True) for article in articles]
     story_clusters = cluster_articles(candidates)
 
@@ -410,13 +434,13 @@ def rank_articles(articles: list[Article], limit: int) -> list[Article]:
         for member in cluster.members:
             member.cluster_id = cluster.id
             member.cluster_size = cluster_size
-            member.score = score_article(member, cluster_size=cluster_size)
+            member.score = score_article(member, cluster_size=cluster_size, now=now)
 
         representative = max(
             cluster.members,
             key=lambda item: (
                 item.score or 0.0,
-                item.published_at or datetime.min.replace(tzinfo=timezone.utc),
+                item.published_at or datetime.min.replace(tzinfo=UTC),
             ),
         )
         representatives.append(representative)
@@ -424,7 +448,7 @@ def rank_articles(articles: list[Article], limit: int) -> list[Article]:
     representatives.sort(
         key=lambda a: (
             a.score or 0.0,
-            a.published_at or datetime.min.replace(tzinfo=timezone.utc),
+            a.published_at or datetime.min.replace(tzinfo=UTC),
         ),
         reverse=True,
     )
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import math
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from app.config import Settings
+from app.services.state_store import open_state_db
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_fetches (
+    source_name TEXT PRIMARY KEY,
+    seconds REAL NOT NULL,
+    bytes REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source_polls (
+    source_name TEXT PRIMARY KEY,
+    polled_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source_items (
+    source_name TEXT NOT NULL,
+    published_at REAL NOT NULL,
+    PRIMARY KEY (source_name, published_at)
+);
+"""
+
+# Weight of the newest fetch in the moving averages.
+_ALPHA = 0.3
+# Fetches needed before a source's history changes its timeout.
+_MIN_TIMEOUT_SAMPLES = 3
+# Publish times kept per source, and needed before a source may be skipped.
+_PUBLISH_HISTORY = 20
+_MIN_PUBLISH_SAMPLES = 5
+
+
+@dataclass
+class SourceHistory:
+    seconds: float
+    bytes: float
+    samples: int
+
+
+@dataclass
+class PublishHistory:
+    polled_at: float
+    # Epoch seconds, oldest first.
+    published: list[float]
+
+
+class SourceStats:
+    """
+    Exponentially weighted fetch time and size per source, kept across runs so
+    ingest can start the slowest feeds first and size their timeouts.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+        self.connection.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, settings: Settings) -> SourceStats:
+        return cls(open_state_db(settings, "sources"))
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def history(self) -> dict[str, SourceHistory]:
+        rows = self.connection.execute(
+            "SELECT source_name, seconds, bytes, samples FROM source_fetches"
+        )
+        return {
+            name: SourceHistory(seconds=seconds, bytes=size, samples=samples)
+            for name, seconds, size, samples in rows
+        }
+
+    def record(self, source_name: str, seconds: float, size: int) -> None:
+        with self.connection:
+            self.connection.execute(
+                """
+                INSERT INTO source_fetches (source_name, seconds, bytes, samples, updated_at)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(source_name) DO UPDATE SET
+                    seconds = seconds + ? * (excluded.seconds - seconds),
+                    bytes = bytes + ? * (excluded.bytes - bytes),
+                    samples = samples + 1,
+                    updated_at = excluded.updated_at
+                """,
+                (source_name, seconds, size, time.time(), _ALPHA, _ALPHA),
+            )
+
+    def publish_history(self) -> dict[str, PublishHistory]:
+        """Last poll and recent item publish times of every source polled before."""
+        history = {
+            name: PublishHistory(polled_at=polled_at, published=[])
+            for name, polled_at in self.connection.execute(
+                "SELECT source_name, polled_at FROM source_polls"
+            )
+        }
+        rows = self.connection.execute(
+            "SELECT source_name, published_at FROM source_items ORDER BY source_name, published_at"
+        )
+        for name, published_at in rows:
+            if name in history:
+                history[name].published.append(published_at)
+        return history
+
+    def record_poll(
+        self,
+        source_name: str,
+        published: Iterable[datetime],
+        polled_at: float | None = None,
+    ) -> None:
+        """Mark `source_name` as polled and keep its newest item publish times."""
+        stamps = {
+            (value if value.tzinfo else value.replace(tzinfo=UTC)).timestamp()
+            for value in published
+        }
+        polled_at = time.time() if polled_at is None else polled_at
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO source_polls (source_name, polled_at) VALUES (?, ?)",
+                (source_name, polled_at),
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO source_items (source_name, published_at) VALUES (?, ?)",
+                [(source_name, stamp) for stamp in stamps if stamp <= polled_at],
+            )
+            self.connection.execute(
+                """
+                DELETE FROM source_items
+                WHERE source_name = ? AND published_at NOT IN (
+                    SELECT published_at FROM source_items
+                    WHERE source_name = ?
+                    ORDER BY published_at DESC
+                    LIMIT ?
+                )
+                """,
+                (source_name, source_name, _PUBLISH_HISTORY),
+            )
+
+
+def schedule_sources(
+    sources: list[dict[str, Any]],
+    history: dict[str, SourceHistory],
+) -> list[str]:
+    """
+    Source names longest expected fetch first (LPT), so slow feeds are not left
+    to start last. Sources without history go first, in file order.
+    """
+
+    def expected(source: dict[str, Any]) -> float:
+        known = history.get(source["name"])
+        return known.seconds if known is not None else float("inf")
+
+    return [source["name"] for source in sorted(sources, key=expected, reverse=True)]
+
+
+def source_timeouts(settings: Settings, history: dict[str, SourceHistory]) -> dict[str, float]:
+    """
+    Own timeouts for chronically slow feeds: three times their usual fetch time
+    once that nears REQUEST_TIMEOUT_SECONDS, capped at SOURCE_TIMEOUT_MAX_SECONDS.
+    """
+    default = float(settings.request_timeout_seconds)
+    timeouts: dict[str, float] = {}
+    for name, known in history.items():
+        if known.samples >= _MIN_TIMEOUT_SAMPLES and known.seconds * 2 > default:
+            timeouts[name] = min(
+                max(known.seconds * 3, default), settings.source_timeout_max_seconds
+            )
+    return timeouts
+
+
+def new_item_probability(history: PublishHistory, now: float) -> float:
+    """
+    Chance that the source published something since its last poll, taking its
+    items as a Poisson process at the rate of its recent publish times. Sources
+    with too little history count as certain.
+    """
+    published = history.published[-_PUBLISH_HISTORY:]
+    if len(published) < _MIN_PUBLISH_SAMPLES or published[-1] <= published[0]:
+        return 1.0
+    rate = (len(published) - 1) / (published[-1] - published[0])
+    return 1.0 - math.exp(-rate * max(now - history.polled_at, 0.0))
+
+
+def sources_to_skip(
+    settings: Settings,
+    sources: list[dict[str, Any]],
+    history: dict[str, PublishHistory],
+    now: float,
+) -> list[str]:
+    """
+    Names of sources unlikely to have new items (below SOURCE_SKIP_BELOW_PROBABILITY)
+    that were polled within SOURCE_MAX_STALENESS_HOURS.
+    """
+    max_staleness = settings.source_max_staleness_hours * 3600
+    skipped = []
+    for source in sources:
+        known = history.get(source["name"])
+        if known is None or now - known.polled_at >= max_staleness:
+            continue
+        if new_item_probability(known, now) < settings.source_skip_below_probability:
+            skipped.append(source["name"])
+    return skipped
+
+
+@contextmanager
+def open_source_stats(settings: Settings) -> Iterator[SourceStats | None]:
+    if not (settings.source_scheduling_enabled or settings.source_skipping_enabled):
+        yield None
+        return
+
+    stats = SourceStats.open(settings)
+    try:
+        yield stats
+    finally:
+        stats.close()
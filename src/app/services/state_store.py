@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from app.config import Settings
+
+
+def state_path(settings: Settings, filename: str) -> Path:
+    directory = Path(settings.state_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / filename
+
+
+def open_state_db(settings: Settings, name: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(state_path(settings, f"{name}.sqlite3"))
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
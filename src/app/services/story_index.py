@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+
+from app.config import Settings
+from app.schemas.article import Article
+from app.services.scoring import same_story_titles, tokenize
+from app.services.state_store import open_state_db
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    cluster_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    tokens TEXT NOT NULL,
+    published_at TEXT,
+    delivered_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stories_delivered_at ON stories (delivered_at);
+"""
+
+
+@dataclass
+class DeliveredStory:
+    cluster_id: str
+    title: str
+    tokens: set[str]
+    published_at: datetime | None
+
+
+class StoryIndex:
+    """
+    Rolling window of delivered cluster representatives, used to recognise
+    follow-up coverage of stories that already went out in an earlier run.
+    """
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self.connection = connection
+        self.connection.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, settings: Settings) -> StoryIndex:
+        return cls(open_state_db(settings, "stories"))
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def record(self, articles: list[Article]) -> None:
+        now = time.time()
+        rows = [
+            (
+                article.cluster_id or article.id,
+                article.effective_title,
+                " ".join(sorted(tokenize(article.effective_title))),
+                article.published_at.isoformat() if article.published_at is not None else None,
+                now,
+            )
+            for article in articles
+        ]
+        with self.connection:
+            self.connection.executemany(
+                """
+                INSERT INTO stories (cluster_id, title, tokens, published_at, delivered_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(cluster_id) DO UPDATE SET delivered_at = excluded.delivered_at
+                """,
+                rows,
+            )
+
+    def prune(self, window_hours: int) -> int:
+        cutoff = time.time() - (window_hours * 3600)
+        with self.connection:
+            cursor = self.connection.execute(
+                "DELETE FROM stories WHERE delivered_at < ?", (cutoff,)
+            )
+        return cursor.rowcount
+
+    def recent(self, window_hours: int) -> list[DeliveredStory]:
+        cutoff = time.time() - (window_hours * 3600)
+        rows = self.connection.execute(
+            "SELECT cluster_id, title, tokens, published_at FROM stories WHERE delivered_at >= ?",
+            (cutoff,),
+        )
+        return [
+            DeliveredStory(
+                cluster_id=cluster_id,
+                title=title,
+                tokens=set(tokens.split()),
+                published_at=datetime.fromisoformat(published_at) if published_at else None,
+            )
+            for cluster_id, title, tokens, published_at in rows
+        ]
+
+    def match(self, articles: list[Article], window_hours: int) -> dict[str, str]:
+        """Map article ids to the delivered cluster they repeat."""
+        stories = self.recent(window_hours)
+        if not stories:
+            return {}
+
+        by_token: dict[str, list[int]] = defaultdict(list)
+        for position, story in enumerate(stories):
+            for token in story.tokens:
+                by_token[token].append(position)
+
+        matches: dict[str, str] = {}
+        for article in articles:
+            title = article.effective_title
+            overlap: dict[int, int] = defaultdict(int)
+            for token in tokenize(title):
+                for position in by_token.get(token, ()):
+                    overlap[position] += 1
+
+            # `same_story_titles` needs at least two shared tokens, so skip the rest.
+            candidates = sorted(
+                (position for position, count in overlap.items() if count >= 2),
+                key=lambda position: overlap[position],
+                reverse=True,
+            )
+            for position in candidates:
+                story = stories[position]
+                if same_story_titles(title, article.published_at, story.title, story.published_at):
+                    matches[article.id] = story.cluster_id
+                    break
+
+        return matches
+
+
+def apply_repeat_policy(
+    articles: list[Article],
+    matches: dict[str, str],
+    policy: str,
+) -> list[Article]:
+    if not matches:
+        return articles
+    if policy == "suppress":
+        return [article for article in articles if article.id not in matches]
+
+    demoted: list[Article] = []
+    for article in articles:
+        if article.id in matches:
+            article = article.model_copy()
+            article.repeat_of = matches[article.id]
+        demoted.append(article)
+    return demoted
+
+
+@contextmanager
+def open_story_index(settings: Settings) -> Iterator[StoryIndex | None]:
+    if not settings.story_index_enabled:
+        yield None
+        return
+
+    index = StoryIndex.open(settings)
+    try:
+        yield index
+    finally:
+        index.close()
@@ -3,12 +3,16 @@ from __future__ import annotations
 import asyncio
 import html
 import logging
+from collections.abc import Callable
 from typing import Any
 
 import httpx
 
 from app.config import Settings
 from app.schemas.article import Article
+from app.services.deadline import record_degradation, stage_remaining
+from app.services.http import http_client
+from app.services.metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -52,13 +56,29 @@ class TelegramClient:
     def __init__(self, settings: Settings) -> None:
         self.settings = settings
 
-    async def send_articles(self, articles: list[Article], dry_run: bool) -> list[dict[str, Any]]:
-        timeout = httpx.Timeout(self.settings.request_timeout_seconds)
-        async with httpx.AsyncClient(timeout=timeout) as client:
+    async def send_articles(
+        self,
+        articles: list[Article],
+        dry_run: bool,
+        on_result: Callable[[Article, dict[str, Any]], None] | None = None,
+    ) -> list[dict[str, Any]]:
+        async with http_client(self.settings) as client:
             results: list[dict[str, Any]] = []
-            for article in articles:
+            for index, article in enumerate(articles):
+                if stage_remaining("deliver") == 0:
+                    # A send in flight is never cancelled (Telegram may already have
+                    # posted it); the rest stay undelivered for the next run.
+                    deferred = articles[index:]
+                    results.extend(
+                        {"article_id": item.id, "status": "deferred", "error": "Run deadline reached."}
+                        for item in deferred
+                    )
+                    record_degradation("deliver", len(deferred), fallback="deferred")
+                    break
                 result = await self.send_article(client, article, dry_run=dry_run)
                 results.append(result)
+                if on_result is not None:
+                    on_result(article, result)
             return results
 
     async def send_article(
@@ -137,27 +157,39 @@ class TelegramClient:
         if not token:
             return {"ok": False, "description": "Missing bot token."}
 
-        url = f"https://api.telegram.org/bot{token}/{method}"
+        url = f"{self.settings.telegram_api_base_url}/bot{token}/{method}"
         attempts = 3
 
+        metrics = get_metrics()
+
         for attempt in range(1, attempts + 1):
+            if attempt > 1:
+                metrics.increment("telegram_retries_total", method=method)
             try:
                 response = await client.post(url, json=payload)
                 data = response.json()
                 if response.status_code == 429:
                     retry_after = int(data.get("parameters", {}).get("retry_after", 2))
+                    if not self._can_wait(retry_after):
+                        return {"ok": False, "description": "Run deadline reached while rate limited."}
+                    metrics.increment("telegram_rate_limit_sleeps_total", method=method)
+                    metrics.increment("telegram_rate_limit_sleep_seconds_total", retry_after)
                     await asyncio.sleep(retry_after)
                     continue
                 if response.is_success and data.get("ok"):
                     return data
-                if attempt < attempts:
+                if attempt < attempts and self._can_wait(attempt):
                     await asyncio.sleep(attempt)
                     continue
                 return data
-            except Exception as exc:
-                if attempt < attempts:
+            except Exception as exc:  # noqa: BLE001 - reported back as a failed send
+                if attempt < attempts and self._can_wait(attempt):
                     await asyncio.sleep(attempt)
                     continue
                 return {"ok": False, "description": str(exc)}
 
         return {"ok": False, "description": "Unknown send failure."}
+
+    def _can_wait(self, seconds: float) -> bool:
+        remaining = stage_remaining("deliver")
+        return remaining is None or seconds < remaining
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import html
+import math
+import re
+
+from bs4 import BeautifulSoup
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+_SPACE_BEFORE_PUNCTUATION = re.compile(r"\s+([.,;:!?])")
+_NUMBER = re.compile(r"\d")
+_CAPITALIZED = re.compile(r"\b[A-Z][a-zA-Z0-9]+")
+# Feed footers and teasers that carry nothing a summary could use.
+_BOILERPLATE = re.compile(
+    r"appeared first on|continue reading|read more|read the full|click here|subscribe|"
+    r"sign up for|\[(?:…|\.\.\.)\]",
+    re.IGNORECASE,
+)
+_STOPWORDS = frozenset(
+    {
+        "a",
+        "an",
+        "and",
+        "are",
+        "as",
+        "at",
+        "be",
+        "by",
+        "for",
+        "from",
+        "has",
+        "have",
+        "in",
+        "into",
+        "is",
+        "it",
+        "its",
+        "new",
+        "of",
+        "on",
+        "or",
+        "that",
+        "the",
+        "this",
+        "to",
+        "was",
+        "were",
+        "will",
+        "with",
+    }
+)
+
+CHARS_PER_TOKEN = 4
+
+
+def split_sentences(text: str) -> list[str]:
+    cleaned = " ".join(text.strip().split())
+    if not cleaned:
+        return []
+    return [part.strip() for part in _SENTENCE_SPLIT.split(cleaned) if part.strip()]
+
+
+def complete_sentence_count(text: str) -> int:
+    """Sentences in streamed text that are followed by whitespace, i.e. definitely finished."""
+    return len(_SENTENCE_SPLIT.findall(text.lstrip()))
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for English text (about four characters per token)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def clean_text(value: str | None, max_chars: int | None = None) -> str | None:
+    """
+    Plain text from a feed or meta field: tags and entities resolved, whitespace
+    collapsed, cut at the last sentence (or word) that fits in `max_chars`.
+    """
+    if not value:
+        return None
+    text = BeautifulSoup(value, "lxml").get_text(" ") if "<" in value else html.unescape(value)
+    # get_text(" ") also separates inline tags from the punctuation that follows them.
+    text = _SPACE_BEFORE_PUNCTUATION.sub(r"\1", " ".join(text.split()))
+    if max_chars is not None and len(text) > max_chars:
+        cut = text[: max_chars + 1]
+        boundary = max(cut.rfind(". "), cut.rfind("! "), cut.rfind("? "))
+        text = cut[: boundary + 1] if boundary > 0 else cut.rsplit(" ", 1)[0]
+    return text or None
+
+
+def _terms(text: str) -> set[str]:
+    return {word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS}
+
+
+def _name_count(sentence: str) -> int:
+    """Capitalized words after the first one, a cheap stand-in for named entities."""
+    names = len(_CAPITALIZED.findall(sentence))
+    return names - 1 if sentence[:1].isupper() else names
+
+
+def _informativeness(sentence: str, position: int, title_terms: set[str]) -> float:
+    terms = _terms(sentence)
+    if not terms:
+        return 0.0
+    return (
+        2.0 * len(terms & title_terms)
+        + min(len(_NUMBER.findall(sentence)), 3)
+        + 0.5 * min(_name_count(sentence), 4)
+        + 1.5 / (position + 1)
+    )
+
+
+def budget_context(text: str, title: str, max_tokens: int) -> str:
+    """
+    The most informative sentences of `text` that fit in `max_tokens`, in their
+    original order. Sentences sharing words with the title, carrying figures or
+    names, and opening the text score highest; feed boilerplate is dropped.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    sentences = [
+        sentence for sentence in split_sentences(text) if not _BOILERPLATE.search(sentence)
+    ]
+    title_terms = _terms(title)
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda index: _informativeness(sentences[index], index, title_terms),
+        reverse=True,
+    )
+
+    chosen: list[int] = []
+    used = 0
+    for index in ranked:
+        cost = estimate_tokens(sentences[index]) + 1
+        if used + cost <= max_tokens:
+            chosen.append(index)
+            used += cost
+
+    if not chosen:
+        if not ranked:
+            return ""
+        # Even the best sentence is over budget: keep its opening words.
+        return clean_text(sentences[ranked[0]], max_tokens * CHARS_PER_TOKEN) or ""
+    return " ".join(sentences[index] for index in sorted(chosen))
+
+
+def _similarity(left: set[str], right: set[str]) -> float:
+    overlap = len(left & right)
+    if not overlap:
+        return 0.0
+    return overlap / (math.log(len(left) + 1) + math.log(len(right) + 1))
+
+
+def textrank(sentences: list[str], damping: float = 0.85, iterations: int = 50) -> list[float]:
+    """
+    TextRank scores: PageRank over the graph of sentences, weighted by their
+    word overlap normalised for sentence length.
+    """
+    terms = [_terms(sentence) for sentence in sentences]
+    count = len(sentences)
+    weights = [
+        [_similarity(terms[i], terms[j]) if i != j else 0.0 for j in range(count)]
+        for i in range(count)
+    ]
+    totals = [sum(row) for row in weights]
+    scores = [1.0] * count
+    for _ in range(iterations):
+        updated = [
+            (1 - damping)
+            + damping
+            * sum(weights[j][i] / totals[j] * scores[j] for j in range(count) if weights[j][i])
+            for i in range(count)
+        ]
+        converged = max((abs(a - b) for a, b in zip(updated, scores)), default=0.0) < 1e-4
+        scores = updated
+        if converged:
+            break
+    return scores
+
+
+def extractive_summary(text: str, count: int = 3, max_sentence_chars: int = 300) -> list[str]:
+    """
+    Up to `count` central sentences of `text` by TextRank, in their original
+    order. Feed boilerplate is skipped and long sentences are shortened.
+    """
+    sentences = [
+        sentence for sentence in split_sentences(text) if not _BOILERPLATE.search(sentence)
+    ]
+    scores = textrank(sentences)
+    # Ties (e.g. sentences sharing no words) go to the earlier sentence.
+    ranked = sorted(range(len(sentences)), key=lambda index: (-scores[index], index))
+    chosen = sorted(ranked[:count])
+
+    summary: list[str] = []
+    for index in chosen:
+        sentence = sentences[index]
+        if len(sentence) > max_sentence_chars:
+            sentence = sentence[:max_sentence_chars].rsplit(" ", 1)[0].rstrip(",;:") + "..."
+        elif not sentence.rstrip("\"')”’").endswith((".", "!", "?")):
+            sentence += "."
+        summary.append(sentence)
+    return summary
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
-from typing import Any, Callable
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar, cast
 
+from app.config import Settings
 
 try:
+    from langsmith import Client as _Client
     from langsmith import traceable as _traceable
-except Exception:  # pragma: no cover
+    from langsmith.run_helpers import tracing_context as _tracing_context
+except Exception:  # noqa: BLE001  # pragma: no cover - any import failure disables tracing
+    _Client = None  # type: ignore[assignment,misc]
+    _tracing_context = None  # type: ignore[assignment]
+
     def _traceable(*_args: Any, **_kwargs: Any) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
         def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
             return func
@@ -13,5 +22,91 @@ except Exception:  # pragma: no cover
         return decorator
 
 
-def traceable(*args: Any, **kwargs: Any) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
-    return _traceable(*args, **kwargs)
+_F = TypeVar("_F", bound=Callable[..., Any])
+
+TRACE_VERBOSITY_LEVELS = ("counts", "summary", "full")
+
+_SAMPLE_SIZE = 3
+_MAX_IDS = 100
+_SAMPLE_FIELDS = ("id", "article_id", "source_name", "title", "url", "score", "status", "mode")
+_FLUSH_TIMEOUT_SECONDS = 10.0
+
+
+def traceable(*args: Any, **kwargs: Any) -> Callable[[_F], _F]:
+    """`langsmith.traceable`, typed to keep the decorated function's signature."""
+    return cast(Callable[[_F], _F], _traceable(*args, **kwargs))
+
+
+def _reduce_list(values: list[Any], verbosity: str) -> dict[str, Any]:
+    reduced: dict[str, Any] = {"count": len(values)}
+    if verbosity == "counts":
+        return reduced
+
+    records = [value for value in values if isinstance(value, dict)]
+    if not records:
+        # Plain lists (errors, source names) are short strings; keep the tail.
+        reduced["last"] = [str(value)[:300] for value in values[-_SAMPLE_SIZE:]]
+        return reduced
+
+    ids = [record.get("id") or record.get("article_id") or record.get("name") for record in records]
+    reduced["ids"] = [item for item in ids if item][:_MAX_IDS]
+    reduced["sample"] = [
+        {key: record[key] for key in _SAMPLE_FIELDS if key in record}
+        for record in records[:_SAMPLE_SIZE]
+    ]
+    return reduced
+
+
+def reduce_state(state: Any, verbosity: str) -> Any:
+    """
+    Replace every list in an AgentState with counts, IDs and a few sampled entries.
+    Nested dicts that hold lists (e.g. traceable's `{"state": ...}` inputs) are
+    reduced the same way; other dicts collapse to their size.
+    """
+    if verbosity == "full" or not isinstance(state, dict):
+        return state
+
+    reduced: dict[str, Any] = {}
+    for key, value in state.items():
+        if isinstance(value, list):
+            reduced[key] = _reduce_list(value, verbosity)
+        elif isinstance(value, dict):
+            if any(isinstance(item, list) for item in value.values()):
+                reduced[key] = reduce_state(value, verbosity)
+            else:
+                reduced[key] = {"count": len(value)}
+        else:
+            reduced[key] = value
+    return reduced
+
+
+@asynccontextmanager
+async def trace_uploads(settings: Settings) -> AsyncIterator[None]:
+    """
+    Route traces in the enclosed block through one batching client. Runs are queued
+    and uploaded from the client's background thread; on exit the remaining queue is
+    flushed off the event loop.
+    """
+    if not settings.langsmith_tracing or _Client is None or _tracing_context is None:
+        yield
+        return
+
+    verbosity = settings.langsmith_trace_verbosity
+    if verbosity == "full":
+        client = _Client(auto_batch_tracing=True)
+    else:
+        # Reduced on the client so LangGraph's own graph/node runs are covered too,
+        # not just the functions decorated with `traceable`.
+        def reduce_payload(payload: dict[str, Any]) -> Any:
+            return reduce_state(payload, verbosity)
+
+        client = _Client(
+            auto_batch_tracing=True,
+            hide_inputs=reduce_payload,
+            hide_outputs=reduce_payload,
+        )
+    try:
+        with _tracing_context(client=client, enabled=True):
+            yield
+    finally:
+        await asyncio.to_thread(client.flush, _FLUSH_TIMEOUT_SECONDS)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from urllib.parse import ParseResult, parse_qsl, urlencode, urlparse, urlunparse
+
+from app.schemas.article import DomainUrlRule, UrlRules
+
+_CACHE_SIZE = 16384
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+_AMP_PATH = re.compile(r"/amp(?:/|\.html)?$|/amp(?=/)")
+_AMP_PARAMS = {"amp", "outputtype", "output"}
+
+
+def _param_matcher(names: list[str] | None) -> re.Pattern[str] | None:
+    """Case-insensitive matcher for query param names; a trailing `*` matches a prefix."""
+    if names is None:
+        return None
+    alternatives = [
+        re.escape(name[:-1]) + ".*" if name.endswith("*") else re.escape(name) for name in names
+    ]
+    # An empty list matches nothing.
+    pattern = "(?:" + "|".join(alternatives) + ")" if alternatives else "(?!)"
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _netloc(parsed: ParseResult, scheme: str, host: str) -> str:
+    """Lower-cased netloc without the scheme's default port; malformed ports are left as-is."""
+    try:
+        port = parsed.port
+    except ValueError:
+        return parsed.netloc
+    netloc = f"[{host}]" if ":" in host else host
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+    if parsed.username is not None:
+        userinfo = parsed.username
+        if parsed.password is not None:
+            userinfo = f"{userinfo}:{parsed.password}"
+        netloc = f"{userinfo}@{netloc}"
+    return netloc
+
+
+class UrlCanonicalizer:
+    """
+    Applies the `url_rules` of the sources file. `normalize` gives the URL to
+    fetch and store; `key` is a looser identity used only to spot duplicates.
+    Both are memoized, so each distinct URL is parsed once.
+    """
+
+    def __init__(self, rules: UrlRules) -> None:
+        self.rules = rules
+        self._strip = _param_matcher(rules.strip_params)
+        self._domains = [
+            (rule, _param_matcher(rule.strip_params), _param_matcher(rule.keep_params))
+            for rule in rules.domains
+        ]
+        self.normalize = lru_cache(maxsize=_CACHE_SIZE)(self._normalize)
+        self.key = lru_cache(maxsize=_CACHE_SIZE)(self._key)
+
+    def _domain_rule(
+        self,
+        host: str,
+    ) -> tuple[DomainUrlRule, re.Pattern[str] | None, re.Pattern[str] | None] | None:
+        for entry in self._domains:
+            domain = entry[0].domain.lower()
+            if host == domain or host.endswith(f".{domain}"):
+                return entry
+        return None
+
+    def _normalize(self, url: str) -> str:
+        parsed = urlparse(url.strip())
+        scheme = parsed.scheme.lower()
+        host = (parsed.hostname or "").lower()
+        netloc = _netloc(parsed, scheme, host)
+
+        domain = self._domain_rule(host)
+        query = [
+            (name, value)
+            for name, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if not self._dropped(name, domain)
+        ]
+        if self.rules.sort_query:
+            query.sort()
+        return urlunparse(
+            parsed._replace(
+                scheme=scheme, netloc=netloc, fragment="", query=urlencode(query, doseq=True)
+            )
+        )
+
+    def _dropped(
+        self,
+        name: str,
+        domain: tuple[DomainUrlRule, re.Pattern[str] | None, re.Pattern[str] | None] | None,
+    ) -> bool:
+        if self._strip is not None and self._strip.fullmatch(name):
+            return True
+        if domain is None:
+            return False
+        _, strip, keep = domain
+        if keep is not None:
+            return not keep.fullmatch(name)
+        return strip is not None and bool(strip.fullmatch(name))
+
+    def _key(self, url: str) -> str:
+        parsed = urlparse(self.normalize(url))
+        host = parsed.netloc
+        for prefix in _HOST_PREFIXES:
+            if host.startswith(prefix) and host.count(".") > 1:
+                host = host[len(prefix) :]
+                break
+
+        path = parsed.path
+        query = parsed.query
+        if self.rules.collapse_amp:
+            path = _AMP_PATH.sub("", path)
+            query = urlencode(
+                [
+                    (name, value)
+                    for name, value in parse_qsl(query, keep_blank_values=True)
+                    if name.lower() not in _AMP_PARAMS
+                ]
+            )
+        path = path.rstrip("/") or "/"
+        # Scheme is left out: http and https links to a page are the same story.
+        return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+_canonicalizer = UrlCanonicalizer(UrlRules())
+
+
+def set_url_rules(rules: UrlRules) -> None:
+    """Switch to `rules`; the memo caches are kept while the rules are unchanged."""
+    global _canonicalizer
+    if rules != _canonicalizer.rules:
+        _canonicalizer = UrlCanonicalizer(rules)
+
+
+def normalize_url(url: str) -> str:
+    """The URL to fetch and store: tracking and junk params and the fragment removed."""
+    return _canonicalizer.normalize(url)
+
+
+def url_key(url: str) -> str:
+    """
+    Dedupe identity of `url`: its normalized form without scheme, `www.`/`m.`
+    host prefixes, AMP markers and trailing slash.
+    """
+    return _canonicalizer.key(url)
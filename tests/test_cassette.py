@@ -0,0 +1,36 @@
+import gzip
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.services.cassette import RecordingTransport, ReplayTransport
+
+
+async def test_cassette_round_trip_replays_recorded_responses(tmp_path: Path) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=f"served {request.url.path}")
+
+    recorder = RecordingTransport(tmp_path, wrapped=httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=recorder) as client:
+        live = await client.get("https://example.com/feed")
+        await client.post("https://api.telegram.org/botSECRET/sendMessage", json={"text": "hi"})
+
+    with gzip.open(tmp_path / "cassette.jsonl.gz", "rt", encoding="utf-8") as cassette:
+        recorded = cassette.read()
+    assert "/bot<redacted>/sendMessage" in recorded
+    assert "SECRET" not in recorded
+
+    replay = ReplayTransport(tmp_path)
+    assert replay.recorded_at is not None
+    async with httpx.AsyncClient(transport=replay) as client:
+        replayed = await client.get("https://example.com/feed")
+        sent = await client.post(
+            "https://api.telegram.org/botOTHER/sendMessage",
+            json={"text": "hi"},
+        )
+        assert replayed.text == live.text
+        assert sent.status_code == 200
+
+        with pytest.raises(httpx.ConnectError):
+            await client.get("https://example.com/unrecorded")
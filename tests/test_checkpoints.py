@@ -0,0 +1,147 @@
+import json
+import re
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.main import build_parser, run_pipeline
+from app.schemas.article import Article
+from app.services.checkpoints import load_checkpoint_values, open_checkpointer
+from app.services.telegram_client import TelegramClient
+
+_TITLES = [
+    "Chipmaker unveils faster accelerator",
+    "Lab publishes open robotics dataset",
+    "Startup raises funds for speech models",
+]
+
+
+def _feed() -> str:
+    now = datetime.now(UTC)
+    items = "".join(
+        f"<item><title>{title}</title><link>https://news.example.com/{index}</link>"
+        f"<pubDate>{format_datetime(now - timedelta(seconds=30 * (index + 1)))}</pubDate></item>"
+        for index, title in enumerate(_TITLES)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+
+def _settings(tmp_path: Path, **overrides: Any) -> Settings:
+    sources_file = tmp_path / "sources.yaml"
+    sources_file.write_text(
+        "sources:\n"
+        '  - name: "News"\n'
+        '    url: "https://news.example.com"\n'
+        '    rss: "https://news.example.com/feed"\n',
+        encoding="utf-8",
+    )
+    return Settings(
+        _env_file=None,
+        state_dir=str(tmp_path / "state"),
+        reports_dir=str(tmp_path / "reports"),
+        sources_file=str(sources_file),
+        telegram_bot_token="token",
+        telegram_chat_id="chat",
+        langgraphics_enabled=False,
+        langsmith_tracing=False,
+        **overrides,
+    )
+
+
+@pytest.fixture
+def use_settings(monkeypatch: pytest.MonkeyPatch) -> Any:
+    # configure_langsmith_env writes these; keep them out of the other tests.
+    monkeypatch.setenv("LANGSMITH_PROJECT", "test")
+    monkeypatch.setenv("LANGSMITH_TRACING", "false")
+
+    def use(settings: Settings) -> None:
+        for module in [
+            "config",
+            "graph.workflow",
+            "nodes.ingest",
+            "nodes.rank",
+            "nodes.summarize",
+            "nodes.deliver",
+        ]:
+            monkeypatch.setattr(f"app.{module}.get_settings", lambda: settings)
+
+    return use
+
+
+async def test_resumed_run_sends_only_unacknowledged_messages_and_drops_its_checkpoint(
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    use_settings: Any,
+) -> None:
+    settings = _settings(tmp_path)
+    use_settings(settings)
+    feed = _feed()
+    sent: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/sendMessage"):
+            sent.append(json.loads(request.content)["text"])
+            return httpx.Response(200, json={"ok": True, "result": {"message_id": len(sent)}})
+        if request.url.path == "/feed":
+            return httpx.Response(200, headers={"content-type": "application/rss+xml"}, text=feed)
+        return httpx.Response(200, headers={"content-type": "text/html"}, text="<head></head>")
+
+    monkeypatch.setattr(
+        "app.services.http.network_transport",
+        lambda _settings: httpx.MockTransport(handler),
+    )
+
+    send_article = TelegramClient.send_article
+    crash = True
+
+    async def crash_after_first_send(
+        self: TelegramClient,
+        client: httpx.AsyncClient,
+        article: Article,
+        dry_run: bool,
+    ) -> dict[str, Any]:
+        if crash and sent:
+            raise RuntimeError("process killed mid-delivery")
+        return await send_article(self, client, article, dry_run=dry_run)
+
+    monkeypatch.setattr(TelegramClient, "send_article", crash_after_first_send)
+
+    assert await run_pipeline(build_parser().parse_args(["run", "--headless"])) == 1
+    assert len(sent) == 1
+    match = re.search(r"--resume (\S+)", capsys.readouterr().out)
+    assert match is not None
+    run_id = match.group(1)
+
+    crash = False
+    resume_args = build_parser().parse_args(["run", "--headless", "--resume", run_id])
+    assert await run_pipeline(resume_args) == 0
+
+    # Every story reached the chat exactly once across the crash and the resume.
+    assert len(sent) == len(_TITLES)
+    for title in _TITLES:
+        assert sum(title in text for text in sent) == 1
+    async with open_checkpointer(settings) as checkpointer:
+        assert checkpointer is not None
+        assert await load_checkpoint_values(checkpointer, run_id) is None
+
+
+async def test_resume_is_refused_without_a_checkpoint(
+    capsys: pytest.CaptureFixture[str],
+    tmp_path: Path,
+    use_settings: Any,
+) -> None:
+    args = build_parser().parse_args(["run", "--headless", "--resume", "no-such-run"])
+
+    use_settings(_settings(tmp_path))
+    assert await run_pipeline(args) == 2
+    assert "No checkpoint found for run no-such-run" in capsys.readouterr().out
+
+    use_settings(_settings(tmp_path, checkpoints_enabled=False))
+    assert await run_pipeline(args) == 2
+    assert "checkpoints are disabled" in capsys.readouterr().out
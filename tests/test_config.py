@@ -0,0 +1,50 @@
+import io
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+
+
+class _Terminal(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+def test_auto_profile_is_headless_without_a_terminal(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("sys.stdin", io.StringIO())
+    monkeypatch.setattr("sys.stdout", io.StringIO())
+    settings = Settings(_env_file=None, execution_profile="auto", langgraphics_enabled=True)
+
+    assert settings.is_headless()
+    assert not settings.visualization_enabled()
+
+    monkeypatch.setattr("sys.stdout", _Terminal())
+    assert settings.visualization_enabled()
+
+
+def test_explicit_profiles_override_terminal_detection(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("sys.stdout", _Terminal())
+
+    assert Settings(_env_file=None, execution_profile="headless").is_headless()
+    assert not Settings(_env_file=None, execution_profile="interactive").is_headless()
+    assert not Settings(
+        _env_file=None,
+        execution_profile="interactive",
+        langgraphics_enabled=False,
+    ).visualization_enabled()
+
+
+def test_unknown_story_repeat_policy_is_rejected() -> None:
+    with pytest.raises(ValidationError):
+        Settings(story_repeat_policy="supress")
+
+
+def test_unknown_trace_verbosity_is_rejected() -> None:
+    with pytest.raises(ValidationError):
+        Settings(langsmith_trace_verbosity="verbose")
+
+
+def test_unknown_execution_profile_is_rejected() -> None:
+    with pytest.raises(ValidationError):
+        Settings(execution_profile="headles")
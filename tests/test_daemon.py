@@ -0,0 +1,132 @@
+import json
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.daemon import SourcePoller, run_daemon
+from app.graph.workflow import build_workflow
+from app.main import build_initial_state
+from app.schemas.article import SourceConfig
+from app.services.http import shared_http_client
+
+
+def _source(name: str, interval: int | None = None) -> SourceConfig:
+    return SourceConfig(
+        name=name,
+        url=f"https://example.com/{name}",
+        rss=f"https://example.com/{name}/feed",
+        poll_interval_seconds=interval,
+    )
+
+
+def test_source_poller_honours_per_source_intervals() -> None:
+    poller = SourcePoller(default_interval_seconds=300)
+    poller.sync([_source("fast", 60), _source("slow")], now=0.0)
+
+    due = poller.due(now=0.0)
+    assert sorted(due) == ["fast", "slow"]
+    poller.mark_polled(due, now=0.0)
+
+    assert poller.due(now=59.0) == []
+    assert poller.due(now=60.0) == ["fast"]
+    assert poller.seconds_until_next(now=30.0) == 30.0
+
+
+def test_source_poller_forgets_removed_sources() -> None:
+    poller = SourcePoller(default_interval_seconds=300)
+    poller.sync([_source("a"), _source("b")], now=0.0)
+    poller.sync([_source("a")], now=0.0)
+    assert poller.due(now=0.0) == ["a"]
+
+
+_STORIES = [
+    ("Chipmaker unveils faster accelerator", "chip"),
+    ("Lab publishes open robotics dataset", "robots"),
+]
+
+
+def _feed(published: list[datetime]) -> str:
+    items = "".join(
+        f"<item><title>{title}</title><link>https://news.example.com/{slug}</link>"
+        f"<pubDate>{format_datetime(when)}</pubDate></item>"
+        for (title, slug), when in zip(_STORIES, published)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+
+async def test_serve_delivers_an_item_deferred_by_the_deadline_next_cycle(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    sources_file = tmp_path / "sources.yaml"
+    sources_file.write_text(
+        "sources:\n"
+        '  - name: "News"\n'
+        '    url: "https://news.example.com"\n'
+        '    rss: "https://news.example.com/feed"\n',
+        encoding="utf-8",
+    )
+    settings = Settings(
+        _env_file=None,
+        state_dir=str(tmp_path / "state"),
+        reports_dir=str(tmp_path / "reports"),
+        sources_file=str(sources_file),
+        telegram_bot_token="token",
+        telegram_chat_id="chat",
+        langgraphics_enabled=False,
+        langsmith_tracing=False,
+        poll_interval_seconds=1,
+        source_skipping_enabled=False,
+    )
+    for module in [
+        "graph.workflow",
+        "nodes.ingest",
+        "nodes.rank",
+        "nodes.summarize",
+        "nodes.deliver",
+    ]:
+        monkeypatch.setattr(f"app.{module}.get_settings", lambda: settings)
+
+    now = datetime.now(UTC)
+    feed = _feed([now - timedelta(seconds=30), now - timedelta(seconds=60)])
+    sent: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/sendMessage"):
+            sent.append(json.loads(request.content)["text"])
+            return httpx.Response(200, json={"ok": True, "result": {"message_id": len(sent)}})
+        if request.url.path == "/feed":
+            return httpx.Response(200, headers={"content-type": "application/rss+xml"}, text=feed)
+        return httpx.Response(200, headers={"content-type": "text/html"}, text="<head></head>")
+
+    # The first cycle's deadline runs out after one message; the second has time for all.
+    cycle_results: list[list[dict[str, Any]]] = []
+    monkeypatch.setattr(
+        "app.services.telegram_client.stage_remaining",
+        lambda stage: 0 if not cycle_results and sent else None,
+    )
+
+    async with shared_http_client(settings, transport=httpx.MockTransport(handler)):
+        await run_daemon(
+            settings,
+            build_workflow(),
+            build_state=lambda: build_initial_state(dry_run=False, limit=10),
+            on_cycle_complete=lambda state, _metrics: cycle_results.append(
+                state["delivery_results"]
+            ),
+            max_cycles=2,
+        )
+
+    assert [[item["status"] for item in results] for results in cycle_results] == [
+        ["sent", "deferred"],
+        ["sent"],
+    ]
+    assert cycle_results[1][0]["article_id"] == cycle_results[0][1]["article_id"]
+    # Each story reached the chat exactly once across both cycles.
+    for title, _ in _STORIES:
+        assert sum(title in text for text in sent) == 1
@@ -0,0 +1,72 @@
+import asyncio
+
+import httpx
+
+from app.config import Settings
+from app.schemas.article import Article, FetchRules
+from app.services.deadline import run_deadline
+from app.services.extractor import OpenGraphExtractor
+from app.services.http import shared_http_client
+from app.services.metrics import collect_metrics
+from app.services.openrouter_client import OpenRouterClient
+from app.services.telegram_client import TelegramClient
+
+
+def _article(article_id: str, url: str) -> Article:
+    return Article(
+        id=article_id,
+        source_name="Source",
+        source_rss="https://source.example.com/feed",
+        title=f"Story {article_id}",
+        url=url,
+        description="Feed description.",
+        rss_image_url="https://source.example.com/rss.jpg",
+    )
+
+
+async def _slow_handler(request: httpx.Request) -> httpx.Response:
+    if "slow" in request.url.path or request.url.path.endswith("/chat/completions"):
+        await asyncio.sleep(5)
+    html = '<meta property="og:title" content="Page title" />'
+    return httpx.Response(200, headers={"content-type": "text/html"}, text=html)
+
+
+async def test_enrichment_past_deadline_falls_back_to_rss_fields() -> None:
+    settings = Settings(_env_file=None)
+    articles = [
+        _article("fast", "https://news.example.com/fast"),
+        _article("slow", "https://news.example.com/slow"),
+    ]
+    extractor = OpenGraphExtractor(settings)
+    rules = {"Source": FetchRules(image_fallback_rss_enclosure=True)}
+
+    with collect_metrics("run-1") as metrics, run_deadline(0.4):
+        async with shared_http_client(settings, transport=httpx.MockTransport(_slow_handler)):
+            enriched, errors = await extractor.enrich_articles(articles, rules)
+
+    assert enriched[0].og_title == "Page title"
+    assert enriched[1].og_title is None
+    assert enriched[1].image_url == "https://source.example.com/rss.jpg"
+    assert errors == []
+    assert extractor.failed_ids == {"slow"}
+    assert extractor.deferred_ids == {"slow"}
+    assert metrics.events == [
+        {"kind": "deadline_degraded", "stage": "enrich", "articles": 1, "fallback": "rss_fields"}
+    ]
+
+
+async def test_summaries_and_delivery_degrade_past_deadline() -> None:
+    settings = Settings(_env_file=None, openrouter_api_key="key")
+    article = _article("a1", "https://news.example.com/slow")
+
+    with collect_metrics("run-2") as metrics, run_deadline(0.2):
+        async with shared_http_client(settings, transport=httpx.MockTransport(_slow_handler)):
+            client = OpenRouterClient(settings)
+            [summarized] = await client.summarize_articles([article], dry_run=False)
+            await asyncio.sleep(0.1)
+            results = await TelegramClient(settings).send_articles([summarized], dry_run=True)
+
+    assert summarized.summary == client._fallback_summary(article)
+    assert client.generated_ids == set()
+    assert results == [{"article_id": "a1", "status": "deferred", "error": "Run deadline reached."}]
+    assert [event["stage"] for event in metrics.events] == ["summarize", "deliver"]
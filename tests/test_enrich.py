@@ -1,4 +1,18 @@
-from app.services.extractor import extract_open_graph_fields
+from collections.abc import AsyncIterator
+
+import httpx
+from bs4 import BeautifulSoup
+
+from app.config import Settings
+from app.schemas.article import Article, FetchRules
+from app.services.extractor import (
+    OpenGraphExtractor,
+    extract_canonical_url,
+    extract_open_graph_fields,
+    shared_page_fetches,
+)
+from app.services.http import shared_http_client
+from app.services.metrics import collect_metrics
 
 
 def test_extract_open_graph_fields() -> None:
@@ -15,3 +29,110 @@ def test_extract_open_graph_fields() -> None:
     assert title == "AI Title"
     assert description == "AI Description"
     assert image == "https://example.com/image.jpg"
+
+
+def test_extract_canonical_url_resolves_and_skips_front_pages() -> None:
+    def canonical(head: str) -> str | None:
+        soup = BeautifulSoup(f"<html><head>{head}</head></html>", "lxml")
+        return extract_canonical_url(soup, "https://news.example.com/amp/story?utm_source=x")
+
+    assert canonical('<link rel="canonical" href="/story?utm_source=feed" />') == (
+        "https://news.example.com/story"
+    )
+    assert canonical('<meta property="og:url" content="https://origin.example.org/s/1" />') == (
+        "https://origin.example.org/s/1"
+    )
+    assert canonical('<link rel="canonical" href="https://news.example.com/" />') is None
+    assert canonical('<link rel="canonical" href="javascript:void(0)" />') is None
+    assert canonical("") is None
+
+
+async def test_page_read_stops_after_head_and_at_byte_cap() -> None:
+    head = (
+        '<html><head><meta property="og:title" content="Capped" />'
+        '<link rel="canonical" href="https://example.com/canonical-story" /></head>'
+    )
+    pages = {
+        "/story": head.encode() + b"<body>" + b"x" * 1_000_000 + b"</body></html>",
+        "/endless": b"<html><head><title>t</title>" + b"<!-- padding -->" * 100_000,
+    }
+
+    async def body(path: str) -> AsyncIterator[bytes]:
+        content = pages[path]
+        for start in range(0, len(content), 4096):
+            sent.append(path)
+            yield content[start : start + 4096]
+
+    sent: list[str] = []
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(
+            200,
+            headers={"content-type": "text/html; charset=utf-8"},
+            content=body(request.url.path),
+        )
+    )
+    settings = Settings(_env_file=None)
+    articles = [
+        Article(
+            id=path,
+            source_name="Source",
+            source_rss="https://example.com/feed",
+            title=path,
+            url=f"https://example.com{path}",
+        )
+        for path in pages
+    ]
+    rules = FetchRules(max_page_bytes=64_000)
+    with collect_metrics("run-1") as metrics:
+        async with shared_http_client(settings, transport=transport):
+            enriched, errors = await OpenGraphExtractor(settings).enrich_articles(
+                articles,
+                {"Source": rules},
+            )
+
+    assert errors == []
+    assert enriched[0].og_title == "Capped"
+    assert enriched[0].url == "https://example.com/canonical-story"
+    assert sent.count("/story") == 1
+    assert sent.count("/endless") == 64_000 // 4096 + 1
+    assert metrics.counter_total("response_size_aborts_total", kind="page") == 1
+
+
+async def test_shared_page_fetches_only_merge_branches_with_the_same_rules() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/html"},
+            content=b'<html><head><meta property="og:title" content="Shared" /></head>',
+        )
+
+    settings = Settings(_env_file=None)
+    source_rules = {
+        "A": FetchRules(),
+        "B": FetchRules(),
+        "NoAgent": FetchRules(requires_user_agent=False),
+        "Small": FetchRules(max_page_bytes=1_000),
+    }
+    articles = [
+        Article(
+            id=name,
+            source_name=name,
+            source_rss="https://example.com/feed",
+            title=name,
+            url="https://www.example.com/story/" if name == "B" else "https://example.com/story",
+        )
+        for name in source_rules
+    ]
+    with shared_page_fetches():
+        async with shared_http_client(settings, transport=httpx.MockTransport(handler)):
+            extractor = OpenGraphExtractor(settings)
+            for article in articles:
+                await extractor.enrich_articles([article], source_rules)
+
+    # A and B share a download; the other two sources fetch under their own rules.
+    assert len(requests) == 3
+    agents = [request.headers.get("User-Agent") for request in requests]
+    assert agents.count(settings.user_agent) == 2
@@ -1,7 +1,16 @@
-from datetime import datetime, timezone
+from datetime import UTC, datetime
+from pathlib import Path
 
-from app.schemas.article import Article
-from app.services.rss_client import dedupe_articles, normalize_url
+import httpx
+import pytest
+
+from app.config import Settings
+from app.graph.state import merge_source_results
+from app.nodes.ingest import collect_node, filter_new_articles, source_node
+from app.schemas.article import Article, FetchRules, SourceConfig, serialize_articles
+from app.services.metrics import collect_metrics
+from app.services.rss_client import RSSClient, dedupe_articles, normalize_url
+from app.services.source_stats import SourceStats, source_timeouts
 
 
 def test_normalize_url_removes_tracking_params() -> None:
@@ -16,7 +25,7 @@ def test_dedupe_articles_keeps_newest_and_counts_duplicates() -> None:
         source_rss="https://example.com/feed",
         title="Hello",
         url="https://example.com/story?utm_source=x",
-        published_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+        published_at=datetime(2026, 1, 1, tzinfo=UTC),
     )
     newer = Article(
         id="a2",
@@ -24,10 +33,242 @@ def test_dedupe_articles_keeps_newest_and_counts_duplicates() -> None:
         source_rss="https://example.com/feed",
         title="Hello Updated",
         url="https://example.com/story",
-        published_at=datetime(2026, 1, 2, tzinfo=timezone.utc),
+        published_at=datetime(2026, 1, 2, tzinfo=UTC),
     )
 
     deduped = dedupe_articles([older, newer])
     assert len(deduped) == 1
     assert deduped[0].id == "a2"
     assert deduped[0].duplicate_count == 2
+
+
+def test_filter_new_articles_drops_entries_at_or_before_watermark() -> None:
+    def article(article_id: str, published_at: datetime | None) -> Article:
+        return Article(
+            id=article_id,
+            source_name="Test",
+            source_rss="https://example.com/feed",
+            title=article_id,
+            url=f"https://example.com/{article_id}",
+            published_at=published_at,
+        )
+
+    mark = datetime(2026, 1, 2, tzinfo=UTC)
+    items = [
+        article("old", datetime(2026, 1, 1, tzinfo=UTC)),
+        article("same", mark),
+        article("undated", None),
+        article("new", datetime(2026, 1, 3, tzinfo=UTC)),
+    ]
+
+    fresh, watermarks = filter_new_articles(items, {"Test": mark.isoformat()})
+    assert [item.id for item in fresh] == ["new"]
+    assert watermarks["Test"] == datetime(2026, 1, 3, tzinfo=UTC).isoformat()
+
+
+def test_merge_source_results_is_idempotent_and_clears_on_none() -> None:
+    merged = merge_source_results({"A": {"raw": []}}, {"B": {"raw": []}})
+    assert set(merged) == {"A", "B"}
+    assert merge_source_results(merged, merged) == merged
+    assert merge_source_results(merged, None) == {}
+
+
+async def test_collect_node_dedupes_across_sources_in_source_order() -> None:
+    def article(article_id: str, source: str, url: str, day: int) -> Article:
+        return Article(
+            id=article_id,
+            source_name=source,
+            source_rss=f"https://{source}.example.com/feed",
+            title=article_id,
+            url=url,
+            published_at=datetime(2026, 1, day, tzinfo=UTC),
+        )
+
+    shared_a = article("a-shared", "A", "https://news.example.com/story", 1)
+    shared_b = article("b-shared", "B", "https://news.example.com/story?utm_source=b", 2)
+    only_b = article("b-only", "B", "https://b.example.com/other", 1)
+
+    def result(items: list[Article], watermark: str) -> dict:
+        enriched = [item.model_copy(update={"og_title": f"OG {item.id}"}) for item in items]
+        return {
+            "raw": serialize_articles(items),
+            "enriched": serialize_articles(enriched),
+            "watermark": watermark,
+            "errors": [f"{items[0].source_name} warning"],
+        }
+
+    state = await collect_node(
+        {
+            "sources": [{"name": "A"}, {"name": "B"}],
+            "source_results": {
+                "B": result([shared_b, only_b], "2026-01-02T00:00:00+00:00"),
+                "A": result([shared_a], "2026-01-01T00:00:00+00:00"),
+            },
+            "errors": [],
+        }
+    )
+
+    enriched = state["articles_enriched"]
+    assert [item["id"] for item in enriched] == ["b-shared", "b-only"]
+    assert enriched[0]["og_title"] == "OG b-shared"
+    assert enriched[0]["duplicate_count"] == 2
+    assert state["errors"] == ["A warning", "B warning"]
+    assert state["source_watermarks"]["B"] == "2026-01-02T00:00:00+00:00"
+
+
+async def test_collect_node_dedupes_redirected_links_by_final_url() -> None:
+    def article(article_id: str, url: str) -> Article:
+        return Article(
+            id=article_id,
+            source_name=article_id,
+            source_rss=f"https://{article_id}.example.com/feed",
+            title=article_id,
+            url=url,
+            published_at=datetime(2026, 1, 1, tzinfo=UTC),
+        )
+
+    direct = article("direct", "https://news.example.com/story")
+    tracked = article("tracked", "https://tracking.example.com/click?id=9")
+    enriched_tracked = tracked.model_copy(update={"url": "https://news.example.com/story"})
+
+    state = await collect_node(
+        {
+            "sources": [{"name": "direct"}, {"name": "tracked"}],
+            "source_results": {
+                "direct": {
+                    "raw": serialize_articles([direct]),
+                    "enriched": serialize_articles([direct]),
+                    "errors": [],
+                },
+                "tracked": {
+                    "raw": serialize_articles([tracked]),
+                    "enriched": serialize_articles([enriched_tracked]),
+                    "errors": [],
+                },
+            },
+            "errors": [],
+        }
+    )
+
+    assert [item["id"] for item in state["articles_enriched"]] == ["direct"]
+    assert state["articles_enriched"][0]["duplicate_count"] == 2
+    assert [item["url"] for item in state["articles_raw"]] == ["https://news.example.com/story"]
+
+
+def _rss(count: int) -> bytes:
+    items = "".join(
+        f"<item><title>Story {index}</title><link>https://example.com/{index}</link>"
+        f"<description>&lt;p&gt;Body {index}.&lt;/p&gt;</description>"
+        f"<pubDate>Mon, {20 - index:02d} Jan 2026 10:00:00 +0000</pubDate>"
+        f"<enclosure url='https://example.com/{index}.png' type='image/png' /></item>"
+        for index in range(count)
+    )
+    return f"<?xml version='1.0'?><rss><channel><title>Feed</title>{items}</channel></rss>".encode()
+
+
+async def _fetch(
+    body: bytes,
+    since: datetime | None = None,
+    rules: FetchRules | None = None,
+    **overrides,
+) -> tuple[list, dict]:
+    settings = Settings(_env_file=None, **overrides)
+    source = SourceConfig(name="Feed", url="https://example.com", rss="https://example.com/feed")
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    with collect_metrics("run-1") as metrics:
+        async with httpx.AsyncClient(transport=transport) as client:
+            articles = await RSSClient(settings).fetch_source(client, source, since, rules)
+    return articles, dict(metrics.counters)
+
+
+async def test_streaming_parser_stops_at_item_limit_and_watermark() -> None:
+    articles, counters = await _fetch(_rss(40), max_feed_items_per_source=5)
+    assert [article.title for article in articles] == [f"Story {index}" for index in range(5)]
+    assert articles[0].description == "Body 0."
+    assert articles[0].rss_image_url == "https://example.com/0.png"
+    assert articles[0].published_at == datetime(2026, 1, 20, 10, tzinfo=UTC)
+    assert counters[("feed_early_stops_total", (("reason", "limit"),))] == 1
+
+    # Entries are newest first: everything past the third stale one is skipped.
+    articles, counters = await _fetch(_rss(40), since=datetime(2026, 1, 18, 10, tzinfo=UTC))
+    assert len(articles) == 5
+    assert counters[("feed_early_stops_total", (("reason", "window"),))] == 1
+
+
+async def test_malformed_feed_falls_back_to_feedparser() -> None:
+    body = _rss(3).replace(b"Story 1", b"Story & 1")
+
+    articles, counters = await _fetch(body)
+
+    assert len(articles) == 3
+    assert counters[("feed_parses_total", (("parser", "feedparser"),))] == 1
+
+
+async def test_feed_read_stops_at_byte_cap_and_keeps_parsed_entries() -> None:
+    body = _rss(40)
+
+    articles, counters = await _fetch(body, rules=FetchRules(max_feed_bytes=len(body) // 4))
+
+    assert 0 < len(articles) < 40
+    assert counters[("response_size_aborts_total", (("kind", "feed"),))] == 1
+    assert counters[("feed_parses_total", (("parser", "stream"),))] == 1
+
+
+async def test_failed_fetch_is_not_recorded_as_a_fetch_or_poll(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    settings = Settings(state_dir=str(tmp_path), ledger_enabled=False, story_index_enabled=False)
+    monkeypatch.setattr("app.nodes.ingest.get_settings", lambda: settings)
+
+    async def refuse(*_args: object, **_kwargs: object) -> list[Article]:
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(RSSClient, "fetch_source", refuse)
+    source = SourceConfig(
+        name="Down", url="https://down.example.com", rss="https://down.example.com/feed"
+    )
+
+    result = await source_node({"source": source.model_dump(mode="json"), "fetch_defaults": {}})
+
+    assert result["source_results"]["Down"]["errors"]
+    stats = SourceStats.open(settings)
+    try:
+        assert stats.history() == {}
+        # Not a poll either, so the next run cannot skip the source that just failed.
+        assert stats.publish_history() == {}
+    finally:
+        stats.close()
+
+
+async def test_feed_that_keeps_timing_out_earns_a_longer_timeout(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    settings = Settings(
+        state_dir=str(tmp_path),
+        ledger_enabled=False,
+        story_index_enabled=False,
+        request_timeout_seconds=20,
+    )
+    monkeypatch.setattr("app.nodes.ingest.get_settings", lambda: settings)
+
+    async def time_out(*_args: object, **_kwargs: object) -> list[Article]:
+        raise httpx.ReadTimeout("read timed out")
+
+    monkeypatch.setattr(RSSClient, "fetch_source", time_out)
+    source = SourceConfig(
+        name="Slow", url="https://slow.example.com", rss="https://slow.example.com/feed"
+    )
+
+    for _ in range(3):
+        result = await source_node({"source": source.model_dump(mode="json"), "fetch_defaults": {}})
+        assert result["source_results"]["Slow"]["errors"]
+
+    stats = SourceStats.open(settings)
+    try:
+        assert stats.history()["Slow"].samples == 3
+        assert source_timeouts(settings, stats.history())["Slow"] > 20
+        assert stats.publish_history() == {}
+    finally:
+        stats.close()
@@ -0,0 +1,86 @@
+import sqlite3
+import time
+
+from app.schemas.article import Article
+from app.services.ledger import ArticleLedger, ArticleStage
+
+
+def _article(article_id: str, url: str) -> Article:
+    return Article(
+        id=article_id,
+        source_name="Test",
+        source_rss="https://example.com/feed",
+        title=f"Title {article_id}",
+        url=url,
+    )
+
+
+def _ledger() -> ArticleLedger:
+    return ArticleLedger(sqlite3.connect(":memory:"))
+
+
+def test_ledger_filters_delivered_by_id_and_redirected_url() -> None:
+    ledger = _ledger()
+    delivered = _article("a1", "https://example.com/final")
+    ledger.record(
+        [delivered],
+        ArticleStage.DELIVERED,
+        source_urls={"a1": "https://tracker.example.com/a1"},
+    )
+
+    incoming = [
+        _article("a1", "https://example.com/other"),
+        _article("b2", "https://example.com/final?utm_source=x"),
+        _article("c3", "https://tracker.example.com/a1"),
+        _article("d4", "https://example.com/new"),
+    ]
+    assert [item.id for item in ledger.filter_delivered(incoming)] == ["d4"]
+
+
+def test_ledger_never_moves_back_a_stage() -> None:
+    ledger = _ledger()
+    article = _article("a1", "https://example.com/a1")
+    ledger.record([article], ArticleStage.SUMMARIZED)
+    ledger.record([article], ArticleStage.ENRICHED)
+
+    assert "a1" in ledger.lookup(["a1"], ArticleStage.SUMMARIZED)
+    assert ledger.lookup(["a1"], ArticleStage.DELIVERED) == {}
+
+
+def test_ledger_compact_removes_old_rows() -> None:
+    ledger = _ledger()
+    ledger.record([_article("a1", "https://example.com/a1")], ArticleStage.ENRICHED)
+    ledger.connection.execute("UPDATE articles SET updated_at = ?", (time.time() - 30 * 86400,))
+    ledger.record([_article("b2", "https://example.com/b2")], ArticleStage.ENRICHED)
+
+    assert ledger.compact(retention_days=14) == 1
+    assert list(ledger.lookup(["a1", "b2"], ArticleStage.ENRICHED)) == ["b2"]
+
+
+def test_ledger_message_ids_only_cover_delivered_rows() -> None:
+    ledger = _ledger()
+    ledger.record([_article("a1", "https://example.com/a1")], ArticleStage.SUMMARIZED)
+    ledger.record(
+        [_article("b2", "https://example.com/b2")],
+        ArticleStage.DELIVERED,
+        message_ids={"b2": 42},
+    )
+
+    assert ledger.message_ids(["a1", "b2"]) == {"b2": 42}
+
+
+def test_ledger_redirect_map_resolves_known_feed_urls() -> None:
+    ledger = _ledger()
+    ledger.record_redirects(
+        {
+            "https://tracking.example.com/click?id=1&utm_source=x": "https://example.com/story",
+            "https://example.com/same": "https://example.com/same",
+        }
+    )
+
+    assert ledger.resolve_urls(
+        [
+            "https://tracking.example.com/click?id=1",
+            "https://example.com/same",
+        ]
+    ) == {"https://tracking.example.com/click?id=1": "https://example.com/story"}
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.config import Settings
+from app.schemas.article import Article
+from app.services.http import shared_http_client
+from app.services.llm_scheduler import TokenBucket, retry_after_seconds
+from app.services.metrics import collect_metrics
+from app.services.openrouter_client import OpenRouterClient
+
+
+def _article(article_id: str) -> Article:
+    return Article(
+        id=article_id,
+        source_name="Source",
+        source_rss="https://source.example.com/feed",
+        title=f"Story {article_id}",
+        url=f"https://news.example.com/{article_id}",
+        description="A lab shipped a model.",
+    )
+
+
+async def test_rate_limited_requests_back_off_and_are_retried() -> None:
+    calls: list[float] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0.2"}, json={"error": "slow down"})
+        content = "One sentence. Two sentences. Three sentences."
+        return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+    settings = Settings(
+        _env_file=None,
+        openrouter_api_key="key",
+        llm_streaming=False,
+        llm_hedging_enabled=False,
+        llm_concurrency=1,
+        llm_backoff_base_seconds=0.01,
+    )
+    client = OpenRouterClient(settings)
+    with collect_metrics("run-1") as metrics:
+        async with shared_http_client(settings, transport=httpx.MockTransport(handler)):
+            summarized = await client.summarize_articles(
+                [_article("a1"), _article("a2"), _article("a3")],
+                dry_run=False,
+            )
+
+    assert [article.summary for article in summarized] == [
+        "One sentence. Two sentences. Three sentences."
+    ] * 3
+    assert client.generated_ids == {"a1", "a2", "a3"}
+    assert calls[1] - calls[0] >= 0.2
+    assert metrics.counter_total("llm_retries_total", reason="429") == 1
+    assert metrics.counter_total("llm_rate_limit_pauses_total") == 1
+    assert metrics.gauges[("llm_queue_depth_max", ())] == 2
+
+
+async def test_token_bucket_waits_for_refill() -> None:
+    bucket = TokenBucket(per_minute=600)
+    await bucket.acquire(10)
+
+    started = time.monotonic()
+    await bucket.acquire(2)
+
+    assert time.monotonic() - started >= 0.15
+
+
+async def test_token_bucket_holds_large_requests_to_the_configured_rate(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clock = [0.0]
+
+    async def fake_sleep(seconds: float) -> None:
+        clock[0] += seconds
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    bucket = TokenBucket(per_minute=10_000, clock=lambda: clock[0])
+    admitted_at = []
+    for _ in range(40):
+        await bucket.acquire(450)
+        admitted_at.append(clock[0])
+
+    # Tokens admitted before the last request, over the time it took to admit them.
+    per_minute = 39 * 450 / admitted_at[-1] * 60
+    assert 9_500 <= per_minute <= 10_000
+
+
+def test_retry_after_accepts_seconds_and_openrouter_reset() -> None:
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "3"})) == 3.0
+    reset_ms = str(int((time.time() + 10) * 1000))
+    hinted = retry_after_seconds(httpx.Response(429, headers={"X-RateLimit-Reset": reset_ms}))
+    assert hinted is not None and 9 < hinted <= 10
+    assert retry_after_seconds(httpx.Response(503)) is None
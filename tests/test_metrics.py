@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import httpx
+
+from app.services.metrics import (
+    MetricsTransport,
+    collect_metrics,
+    get_metrics,
+    timed_node,
+    write_run_report,
+)
+
+
+async def test_metrics_transport_counts_requests_bytes_and_status_per_host() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = 404 if request.url.path == "/missing" else 200
+        return httpx.Response(status, content=b"x" * 10)
+
+    transport = MetricsTransport(httpx.MockTransport(handler))
+    with collect_metrics("run-1") as metrics:
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("https://feeds.example.com/a")
+            await client.get("https://feeds.example.com/missing")
+
+    host = metrics.http_hosts()["feeds.example.com"]
+    assert host["requests"] == 2
+    assert host["bytes"] == 20
+    assert host["status"] == {"200": 1, "404": 1}
+    assert host["latency"]["count"] == 2
+
+
+async def test_timed_node_records_duration_without_exposing_config() -> None:
+    async def node(state: dict) -> dict:
+        get_metrics().increment("cache_hits_total", 3, cache="ledger")
+        get_metrics().increment("cache_misses_total", 1, cache="ledger")
+        return state
+
+    with collect_metrics("run-2") as metrics:
+        await timed_node("ingest", node)({})
+        metrics.record_node("source", 2.0, finished=10.0)
+        metrics.record_node("source", 3.0, finished=11.0)
+
+    assert metrics.node_calls["ingest"] == 1
+    assert metrics.node_seconds["source"] == 5.0
+    assert metrics.node_wall_seconds("source") == 3.0
+    assert metrics.cache_hit_rates() == {"ledger": 0.75}
+
+
+def test_write_run_report_emits_json_and_prometheus(tmp_path: Path) -> None:
+    with collect_metrics("run-3") as metrics:
+        metrics.record_node("rank", 0.2)
+        metrics.observe("llm_request_seconds", 0.3)
+        metrics.increment("llm_requests_total", status="ok")
+
+    prom_file = tmp_path / "textfile" / "ai_news.prom"
+    report_path = write_run_report(metrics, str(tmp_path), {"sent": 1}, str(prom_file))
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert report["summary"] == {"sent": 1}
+    assert report["nodes"]["rank"]["calls"] == 1
+
+    exposition = prom_file.read_text(encoding="utf-8")
+    assert 'ai_news_llm_requests_total{status="ok"} 1' in exposition
+    assert exposition.count("# TYPE ai_news_llm_requests_total counter") == 1
+    assert "# TYPE ai_news_llm_request_seconds histogram" in exposition
+    assert 'ai_news_llm_request_seconds_bucket{le="0.5"} 1' in exposition
+    assert 'ai_news_node_seconds{node="rank"}' in exposition
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from app.services.metrics import collect_metrics, timed_node
+from app.services.profiling import profile_run
+
+
+async def _growing_node(state: dict) -> dict:
+    return {**state, "articles_raw": [{"id": str(index)} for index in range(50)]}
+
+
+async def _blocking_node(state: dict) -> dict:
+    time.sleep(0.3)  # noqa: ASYNC251 - the stall under test
+    return state
+
+
+async def test_mem_profile_reports_state_list_growth_per_node(tmp_path: Path) -> None:
+    with collect_metrics("run-mem") as metrics:
+        async with profile_run("mem", metrics, str(tmp_path)) as output_dir:
+            await timed_node("ingest", _growing_node)({"articles_raw": []})
+
+    assert output_dir is not None
+    nodes = json.loads((output_dir / "mem.json").read_text(encoding="utf-8"))
+    assert nodes[0]["node"] == "ingest"
+    assert nodes[0]["state_lists"]["articles_raw"]["items_delta"] == 50
+
+
+async def _branch_node(state: dict) -> dict:
+    await asyncio.sleep(0.01)
+    return {"source_results": [state]}
+
+
+async def test_mem_profile_reports_concurrent_branches_as_one_entry(tmp_path: Path) -> None:
+    with collect_metrics("run-branches") as metrics:
+        async with profile_run("mem", metrics, str(tmp_path)) as output_dir:
+            branch = timed_node("source", _branch_node)
+            await asyncio.gather(*(branch({"name": str(index)}) for index in range(3)))
+
+    assert output_dir is not None
+    nodes = json.loads((output_dir / "mem.json").read_text(encoding="utf-8"))
+    assert [(node["node"], node["calls"]) for node in nodes] == [("source", 3)]
+
+
+async def test_asyncio_profile_attributes_event_loop_stalls_to_node(tmp_path: Path) -> None:
+    with collect_metrics("run-loop") as metrics:
+        async with profile_run("asyncio", metrics, str(tmp_path)) as output_dir:
+            await timed_node("rank", _blocking_node)({})
+
+    assert output_dir is not None
+    report = json.loads((output_dir / "asyncio.json").read_text(encoding="utf-8"))
+    assert report["max_stall_seconds"] >= 0.1
+    assert report["stalls"][0]["nodes"] == ["rank"]
@@ -144,3 +144,12 @@ def test_filter_articles_published_today_excludes_missing_dates() -> None:
 
     filtered = filter_articles_published_today([undated], now=now)
     assert filtered == []
+
+
+def test_rank_articles_demotes_repeat_stories() -> None:
+    repeat = _article("repeat", "OpenAI Blog", 1, title="OpenAI launches new reasoning model")
+    repeat.repeat_of = "cluster-1"
+    fresh = _article("fresh", "Unknown", 6, title="Startup raises seed funding for AI agent tools")
+
+    ranked = rank_articles([repeat, fresh], limit=20)
+    assert ranked[0].id == "fresh"
@@ -0,0 +1,77 @@
+import sqlite3
+from datetime import UTC, datetime, timedelta
+
+from app.config import Settings
+from app.services.source_stats import (
+    PublishHistory,
+    SourceHistory,
+    SourceStats,
+    schedule_sources,
+    source_timeouts,
+    sources_to_skip,
+)
+
+HOUR = 3600.0
+
+
+def test_source_stats_keep_a_moving_average() -> None:
+    stats = SourceStats(sqlite3.connect(":memory:"))
+    stats.record("Slow", 10.0, 1000)
+    stats.record("Slow", 20.0, 2000)
+
+    history = stats.history()["Slow"]
+    assert history.samples == 2
+    assert abs(history.seconds - 13.0) < 1e-9
+    assert abs(history.bytes - 1300.0) < 1e-9
+
+
+def test_schedule_sources_starts_unknown_then_slowest() -> None:
+    sources = [{"name": "Fast"}, {"name": "New"}, {"name": "Slow"}, {"name": "Newer"}]
+    history = {
+        "Fast": SourceHistory(seconds=0.2, bytes=1000, samples=5),
+        "Slow": SourceHistory(seconds=4.0, bytes=9000, samples=5),
+    }
+
+    assert schedule_sources(sources, history) == ["New", "Newer", "Slow", "Fast"]
+
+
+def test_source_timeouts_only_for_chronically_slow_sources() -> None:
+    settings = Settings(request_timeout_seconds=20, source_timeout_max_seconds=45)
+    history = {
+        "Fast": SourceHistory(seconds=1.0, bytes=1000, samples=5),
+        "Slow": SourceHistory(seconds=12.0, bytes=1000, samples=5),
+        "Glacial": SourceHistory(seconds=30.0, bytes=1000, samples=5),
+        "Unproven": SourceHistory(seconds=30.0, bytes=1000, samples=1),
+    }
+
+    assert source_timeouts(settings, history) == {"Slow": 36.0, "Glacial": 45.0}
+
+
+def test_record_poll_keeps_recent_past_publish_times() -> None:
+    stats = SourceStats(sqlite3.connect(":memory:"))
+    now = datetime(2026, 1, 10, tzinfo=UTC)
+    published = [now - timedelta(hours=hours) for hours in range(30)]
+    stats.record_poll("Blog", [*published, now + timedelta(hours=1)], polled_at=now.timestamp())
+    stats.record_poll("Blog", published[:5], polled_at=now.timestamp() + HOUR)
+
+    history = stats.publish_history()["Blog"]
+    assert history.polled_at == now.timestamp() + HOUR
+    assert len(history.published) == 20
+    assert history.published[-1] == now.timestamp()
+    assert history.published[0] == (now - timedelta(hours=19)).timestamp()
+
+
+def test_sources_to_skip_only_rare_recently_polled_sources() -> None:
+    settings = Settings(source_skip_below_probability=0.1, source_max_staleness_hours=6)
+    now = 100 * 24 * HOUR
+    every_two_days = [now - day * 48 * HOUR for day in range(1, 8)][::-1]
+    hourly = [now - hours * HOUR for hours in range(1, 8)][::-1]
+    sources = [{"name": name} for name in ("Blog", "Wire", "StaleBlog", "Sparse", "New")]
+    history = {
+        "Blog": PublishHistory(polled_at=now - HOUR, published=every_two_days),
+        "Wire": PublishHistory(polled_at=now - HOUR, published=hourly),
+        "StaleBlog": PublishHistory(polled_at=now - 6 * HOUR, published=every_two_days),
+        "Sparse": PublishHistory(polled_at=now - HOUR, published=every_two_days[-2:]),
+    }
+
+    assert sources_to_skip(settings, sources, history, now) == ["Blog"]
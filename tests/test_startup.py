@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Pulled in only by the run/serve code paths, never by `import app.main`.
+HEAVY_MODULES = [
+    "bs4",
+    "feedparser",
+    "httpx",
+    "langchain_core",
+    "langgraph",
+    "langgraphics",
+    "langsmith",
+    "lxml",
+    "pydantic_settings",
+]
+
+
+def _loaded_after(code: str) -> set[str]:
+    probe = f"{code}\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))"
+    completed = subprocess.run(
+        [sys.executable, "-c", probe],
+        env={"PYTHONPATH": str(SRC)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+
+def test_importing_cli_does_not_load_heavy_dependencies() -> None:
+    loaded = _loaded_after("import app.main")
+
+    assert sorted(loaded.intersection(HEAVY_MODULES)) == []
+
+
+def test_building_workflow_without_visualization_skips_langgraphics() -> None:
+    loaded = _loaded_after(
+        "import os\n"
+        "os.environ['LANGGRAPHICS_ENABLED'] = 'false'\n"
+        "from app.graph.workflow import build_workflow\n"
+        "build_workflow()"
+    )
+
+    assert "langgraph" in loaded
+    assert "langgraphics" not in loaded
+    assert "app.services.langgraphics_assets" not in loaded
@@ -0,0 +1,39 @@
+import sqlite3
+from datetime import UTC, datetime
+
+from app.schemas.article import Article
+from app.services.story_index import StoryIndex, apply_repeat_policy
+
+
+def _article(article_id: str, title: str) -> Article:
+    return Article(
+        id=article_id,
+        source_name="Test",
+        source_rss="https://example.com/feed",
+        title=title,
+        url=f"https://example.com/{article_id}",
+        published_at=datetime(2026, 3, 2, 12, 0, tzinfo=UTC),
+    )
+
+
+def test_story_index_matches_follow_up_coverage() -> None:
+    index = StoryIndex(sqlite3.connect(":memory:"))
+    delivered = _article("sent", "OpenAI launches new multimodal model for developers")
+    delivered.cluster_id = "cluster-1"
+    index.record([delivered])
+
+    follow_up = _article("later", "OpenAI launches a new multimodal model for developers")
+    unrelated = _article("other", "NVIDIA unveils next generation AI accelerator chips")
+
+    matches = index.match([follow_up, unrelated], window_hours=72)
+    assert matches == {"later": "cluster-1"}
+
+
+def test_apply_repeat_policy_suppresses_or_demotes() -> None:
+    articles = [_article("a", "First"), _article("b", "Second")]
+    matches = {"a": "cluster-1"}
+
+    assert [item.id for item in apply_repeat_policy(articles, matches, "suppress")] == ["b"]
+
+    demoted = apply_repeat_policy(articles, matches, "demote")
+    assert [item.repeat_of for item in demoted] == ["cluster-1", None]
@@ -1,4 +1,19 @@
-from app.services.openrouter_client import enforce_sentence_count
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+import httpx
+
+from app.config import Settings
+from app.schemas.article import Article
+from app.services.http import shared_http_client
+from app.services.metrics import collect_metrics
+from app.services.openrouter_client import (
+    LLMEndpoint,
+    OpenRouterClient,
+    _latency_window,
+    enforce_sentence_count,
+)
 
 
 def test_enforce_sentence_count_exact_three() -> None:
@@ -6,3 +21,159 @@ def test_enforce_sentence_count_exact_three() -> None:
     output = enforce_sentence_count(text, count=3)
     assert output.count(".") >= 3
     assert output.endswith(".")
+
+
+def _article() -> Article:
+    return Article(
+        id="a1",
+        source_name="Source",
+        source_rss="https://source.example.com/feed",
+        title="Lab ships a model",
+        url="https://news.example.com/a1",
+        description="The lab shipped a model.",
+    )
+
+
+def _sse(*pieces: str, stall_after: int | None = None) -> AsyncIterator[bytes]:
+    async def events() -> AsyncIterator[bytes]:
+        for index, piece in enumerate(pieces):
+            if index == stall_after:
+                await asyncio.sleep(5)
+            event = {"choices": [{"delta": {"content": piece}}]}
+            yield f"data: {json.dumps(event)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    return events()
+
+
+async def _llm_handler(request: httpx.Request) -> httpx.Response:
+    payload = json.loads(request.content)
+    model = payload["model"]
+    if model == "slow-model":
+        await asyncio.sleep(5)
+    content = f"{model} wrote this. It has three sentences. This is the last one."
+    if payload.get("stream"):
+        return httpx.Response(200, content=_sse(content))
+    return httpx.Response(200, json={"choices": [{"message": {"content": content}}]})
+
+
+async def _summarize(settings: Settings) -> tuple[OpenRouterClient, str, dict]:
+    client = OpenRouterClient(settings)
+    with collect_metrics("run-1") as metrics:
+        async with shared_http_client(
+            settings, transport=httpx.MockTransport(_llm_handler)
+        ) as http:
+            summary = await client.summarize_article(http, _article(), dry_run=False)
+    return client, summary, dict(metrics.counters)
+
+
+async def test_slow_request_is_hedged_to_the_second_model() -> None:
+    settings = Settings(
+        _env_file=None,
+        openrouter_api_key="key",
+        openrouter_model="slow-model",
+        openrouter_hedge_model="fast-model",
+        llm_hedge_initial_delay_seconds=0.05,
+    )
+
+    client, summary, counters = await _summarize(settings)
+
+    assert summary.startswith("fast-model wrote this.")
+    assert client.generated_ids == {"a1"}
+    assert counters[("llm_hedges_total", ())] == 1
+    assert counters[("llm_race_wins_total", (("lane", "hedge"),))] == 1
+
+
+async def test_request_queued_on_the_rate_budget_is_not_hedged() -> None:
+    settings = Settings(
+        _env_file=None,
+        openrouter_api_key="key",
+        openrouter_model="queued-model",
+        openrouter_hedge_model="fast-model",
+        llm_hedge_initial_delay_seconds=0.05,
+        llm_requests_per_minute=120,
+    )
+    client = OpenRouterClient(settings)
+    # Drain the request bucket, so the primary waits about 0.5 s to be admitted.
+    for _ in range(2):
+        await client.scheduler.admit(settings.openrouter_base_url, 0)
+
+    with collect_metrics("run-queued") as metrics:
+        async with shared_http_client(
+            settings, transport=httpx.MockTransport(_llm_handler)
+        ) as http:
+            summary = await client.summarize_article(http, _article(), dry_run=False)
+
+    assert summary.startswith("queued-model wrote this.")
+    assert metrics.counter_total("llm_hedges_total") == 0
+
+
+async def test_hard_limit_falls_back_to_extractive_summary() -> None:
+    settings = Settings(
+        _env_file=None,
+        openrouter_api_key="key",
+        openrouter_model="slow-model",
+        llm_hedge_initial_delay_seconds=0.05,
+        llm_hard_timeout_seconds=0.2,
+    )
+
+    client, summary, counters = await _summarize(settings)
+
+    assert summary == client._fallback_summary(_article())
+    assert client.generated_ids == set()
+    assert counters[("llm_hard_timeouts_total", ())] == 1
+
+
+async def test_stream_is_cut_after_three_sentences_and_on_malformed_output() -> None:
+    replies = iter(
+        [
+            # Markup up front: hang up and retry without waiting for the rest.
+            _sse("# Heading", "\n\nNever read.", stall_after=1),
+            _sse("One. ", "Two. ", "Three. ", "Four never read.", stall_after=3),
+        ]
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, content=next(replies))
+
+    settings = Settings(_env_file=None, openrouter_api_key="key", llm_hedging_enabled=False)
+    window = _latency_window(
+        LLMEndpoint(settings.openrouter_base_url, "key", settings.openrouter_model)
+    )
+    samples = len(window.samples)
+    client = OpenRouterClient(settings)
+    with collect_metrics("run-2") as metrics:
+        async with shared_http_client(settings, transport=httpx.MockTransport(handler)) as http:
+            summary = await asyncio.wait_for(
+                client.summarize_article(http, _article(), dry_run=False),
+                timeout=2,
+            )
+
+    assert summary == "One. Two. Three."
+    assert metrics.counter_total("llm_stream_cutoffs_total", reason="malformed") == 1
+    assert metrics.counter_total("llm_stream_cutoffs_total", reason="complete") == 1
+    assert metrics.counter_total("llm_tokens_total", kind="completion") == 4
+    # Only the completed reply counts towards the hedge delay.
+    assert len(window.samples) == samples + 1
+
+
+async def test_only_top_ranked_articles_go_to_the_llm() -> None:
+    settings = Settings(_env_file=None, openrouter_api_key="key", llm_hedging_enabled=False)
+    client = OpenRouterClient(settings)
+    local = _article().model_copy(
+        update={"id": "a2", "description": "Local one. Local two. Local three."}
+    )
+    with collect_metrics("run-3") as metrics:
+        async with shared_http_client(settings, transport=httpx.MockTransport(_llm_handler)):
+            summarized = await client.summarize_articles(
+                [_article(), local],
+                dry_run=False,
+                remote_ids={"a1"},
+            )
+
+    assert summarized[0].summary.endswith("This is the last one.")
+    assert summarized[1].summary == "Local one. Local two. Local three."
+    assert client.generated_ids == {"a1"}
+    assert metrics.counter_total("summaries_total", tier="llm") == 1
+    assert metrics.counter_total("summaries_total", tier="local") == 1
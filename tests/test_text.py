@@ -0,0 +1,54 @@
+from app.services.text import budget_context, clean_text, estimate_tokens, extractive_summary
+
+
+def test_clean_text_strips_markup_and_cuts_at_a_sentence() -> None:
+    body = (
+        "<p>OpenAI&#8217;s model   ships <b>today</b>.</p>\n<p>It costs less.</p>"
+        "<div><img src='x.png'/>A third sentence that is long.</div>"
+    )
+
+    assert (
+        clean_text(body)
+        == "OpenAI’s model ships today. It costs less. A third sentence that is long."
+    )
+    assert clean_text(body, max_chars=50) == "OpenAI’s model ships today. It costs less."
+    assert clean_text("Tom &amp; Jerry") == "Tom & Jerry"
+    assert clean_text("   ") is None
+
+
+def test_budget_context_keeps_informative_sentences_in_order() -> None:
+    text = (
+        "Mistral released Codestral 2 on Tuesday. "
+        "The weather was pleasant in Paris. "
+        "Codestral 2 scores 86% on HumanEval and supports 80 languages. "
+        "Our team enjoyed the event and the food was good. "
+        "The post Mistral ships Codestral 2 appeared first on AI Weekly."
+    )
+
+    context = budget_context(text, "Mistral releases Codestral 2 coding model", max_tokens=35)
+
+    assert context == (
+        "Mistral released Codestral 2 on Tuesday. "
+        "Codestral 2 scores 86% on HumanEval and supports 80 languages."
+    )
+    assert estimate_tokens(context) <= 35
+    assert budget_context("Short text.", "Title", max_tokens=35) == "Short text."
+
+
+def test_extractive_summary_picks_central_sentences_in_order() -> None:
+    text = (
+        "Anthropic released a new Claude model for coding agents. "
+        "The weather in San Francisco was mild. "
+        "The Claude model leads coding benchmarks and runs agents for hours. "
+        "Pricing for the new model matches the previous Claude release. "
+        "Lunch was served at noon. "
+        "The post Claude ships appeared first on AI Weekly."
+    )
+
+    assert extractive_summary(text, count=3) == [
+        "Anthropic released a new Claude model for coding agents.",
+        "The Claude model leads coding benchmarks and runs agents for hours.",
+        "Pricing for the new model matches the previous Claude release.",
+    ]
+    assert extractive_summary("A lab shipped a model", count=3) == ["A lab shipped a model."]
+    assert extractive_summary("", count=3) == []
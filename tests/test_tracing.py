@@ -0,0 +1,34 @@
+from app.services.tracing import reduce_state
+
+
+def _state() -> dict:
+    return {
+        "run_id": "run-1",
+        "dry_run": True,
+        "source_watermarks": {"A": "2026-01-01T00:00:00+00:00"},
+        "articles_raw": [
+            {"id": f"a{index}", "title": f"Title {index}", "description": "x" * 500}
+            for index in range(40)
+        ],
+        "delivery_results": [{"article_id": "a1", "status": "sent", "message_id": 9}],
+        "errors": ["feed A failed", "feed B failed"],
+    }
+
+
+def test_summary_verbosity_keeps_counts_ids_and_a_small_sample() -> None:
+    reduced = reduce_state(_state(), "summary")
+
+    assert reduced["run_id"] == "run-1"
+    assert reduced["source_watermarks"] == {"count": 1}
+    assert reduced["articles_raw"]["count"] == 40
+    assert reduced["articles_raw"]["ids"][:2] == ["a0", "a1"]
+    assert reduced["articles_raw"]["sample"][0] == {"id": "a0", "title": "Title 0"}
+    assert reduced["delivery_results"]["sample"] == [{"article_id": "a1", "status": "sent"}]
+    assert reduced["errors"]["last"] == ["feed A failed", "feed B failed"]
+
+
+def test_counts_and_full_verbosity() -> None:
+    state = _state()
+
+    assert reduce_state(state, "counts")["articles_raw"] == {"count": 40}
+    assert reduce_state(state, "full") is state
@@ -0,0 +1,50 @@
+from app.schemas.article import DomainUrlRule, UrlRules
+from app.services.urls import UrlCanonicalizer
+
+
+def test_url_key_collapses_host_amp_and_slash_variants() -> None:
+    canonicalizer = UrlCanonicalizer(UrlRules())
+    variants = [
+        "https://www.example.com/2026/story/?utm_source=feed#comments",
+        "http://m.example.com/2026/story",
+        "https://example.com/2026/story/amp/",
+        "https://amp.example.com/amp/2026/story?amp=1",
+    ]
+
+    assert {canonicalizer.key(url) for url in variants} == {"example.com/2026/story"}
+    assert canonicalizer.normalize(variants[0]) == "https://www.example.com/2026/story/"
+    assert canonicalizer.key("https://example.com/a?b=2&a=1") == canonicalizer.key(
+        "https://EXAMPLE.com/a?a=1&b=2"
+    )
+
+
+def test_domain_rules_strip_junk_params_or_keep_only_listed_ones() -> None:
+    canonicalizer = UrlCanonicalizer(
+        UrlRules(
+            domains=[
+                DomainUrlRule(domain="news.example", strip_params=["ref*"]),
+                DomainUrlRule(domain="papers.example", keep_params=["id"]),
+            ]
+        )
+    )
+
+    assert canonicalizer.normalize("https://www.news.example/s?ref_src=x&page=2") == (
+        "https://www.news.example/s?page=2"
+    )
+    assert canonicalizer.normalize("https://papers.example/abs?context=cs&id=7") == (
+        "https://papers.example/abs?id=7"
+    )
+    assert (
+        canonicalizer.normalize("https://other.example/s?ref=x") == "https://other.example/s?ref=x"
+    )
+
+
+def test_normalize_keeps_ipv6_hosts_credentials_and_malformed_ports() -> None:
+    canonicalizer = UrlCanonicalizer(UrlRules())
+
+    assert canonicalizer.normalize("http://[::1]:8080/a#top") == "http://[::1]:8080/a"
+    assert canonicalizer.normalize("http://[::1]:80/a") == "http://[::1]/a"
+    assert canonicalizer.normalize("https://user:pw@Ex.com/a") == "https://user:pw@ex.com/a"
+    assert canonicalizer.normalize("http://example.com:abc/x?utm_source=feed") == (
+        "http://example.com:abc/x"
+    )